@@ -0,0 +1,29 @@
+"""buildings coordinates index
+
+Revision ID: d44495dc664b
+Revises: d6cd0e2114df
+Create Date: 2026-10-17 17:31:07.320144
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd44495dc664b'
+down_revision: Union[str, Sequence[str], None] = 'd6cd0e2114df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (latitude, longitude) is already indexed by latitude_longitude_uc
+    op.create_index('ix_buildings_longitude_latitude', 'buildings', ['longitude', 'latitude'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_buildings_longitude_latitude', table_name='buildings')
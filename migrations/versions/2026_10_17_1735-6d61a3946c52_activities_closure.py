@@ -0,0 +1,51 @@
+"""activities closure
+
+Revision ID: 6d61a3946c52
+Revises: d44495dc664b
+Create Date: 2026-10-17 17:35:33.274973
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d61a3946c52'
+down_revision: Union[str, Sequence[str], None] = 'd44495dc664b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activities_closure',
+    sa.Column('ancestor_uuid', sa.UUID(), nullable=False),
+    sa.Column('descendant_uuid', sa.UUID(), nullable=False),
+    sa.Column('depth', sa.BIGINT(), nullable=False),
+    sa.Column('create_date', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('update_date', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_uuid'], ['activities.uuid'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_uuid'], ['activities.uuid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_uuid', 'descendant_uuid')
+    )
+    op.create_index('ix_activities_closure_descendant_uuid', 'activities_closure', ['descendant_uuid'], unique=False)
+    op.execute(
+        """
+        INSERT INTO activities_closure (ancestor_uuid, descendant_uuid, depth)
+        WITH RECURSIVE tree AS (
+            SELECT uuid AS ancestor_uuid, uuid AS descendant_uuid, 0 AS depth FROM activities
+            UNION ALL
+            SELECT tree.ancestor_uuid, activities.uuid, tree.depth + 1
+            FROM tree JOIN activities ON activities.parent_uuid = tree.descendant_uuid
+        )
+        SELECT ancestor_uuid, descendant_uuid, depth FROM tree
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activities_closure_descendant_uuid', table_name='activities_closure')
+    op.drop_table('activities_closure')
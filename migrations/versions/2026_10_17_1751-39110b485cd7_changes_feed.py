@@ -0,0 +1,43 @@
+"""changes feed
+
+Revision ID: 39110b485cd7
+Revises: 774e1666ed80
+Create Date: 2026-10-17 17:51:40.453294
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '39110b485cd7'
+down_revision: Union[str, Sequence[str], None] = '774e1666ed80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tombstones',
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('record_uuid', sa.UUID(), nullable=False),
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('create_date', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('update_date', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('uuid')
+    )
+    op.create_index('ix_tombstones_entity_update_date', 'tombstones', ['entity', 'update_date', 'uuid'], unique=False)
+    op.create_index('ix_activities_update_date', 'activities', ['update_date', 'uuid'], unique=False)
+    op.create_index('ix_buildings_update_date', 'buildings', ['update_date', 'uuid'], unique=False)
+    op.create_index('ix_organizations_update_date', 'organizations', ['update_date', 'uuid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organizations_update_date', table_name='organizations')
+    op.drop_index('ix_buildings_update_date', table_name='buildings')
+    op.drop_index('ix_activities_update_date', table_name='activities')
+    op.drop_index('ix_tombstones_entity_update_date', table_name='tombstones')
+    op.drop_table('tombstones')
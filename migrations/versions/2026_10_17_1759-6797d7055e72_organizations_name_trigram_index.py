@@ -0,0 +1,32 @@
+"""organizations name trigram index
+
+Revision ID: 6797d7055e72
+Revises: 39110b485cd7
+Create Date: 2026-10-17 17:59:47.892300
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6797d7055e72'
+down_revision: Union[str, Sequence[str], None] = '39110b485cd7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_organizations_name_trgm', 'organizations', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organizations_name_trgm', table_name='organizations', postgresql_using='gin')
@@ -0,0 +1,40 @@
+"""organizations counters
+
+Revision ID: e424af2f6bf0
+Revises: 6797d7055e72
+Create Date: 2026-10-17 18:09:45.386500
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e424af2f6bf0'
+down_revision: Union[str, Sequence[str], None] = '6797d7055e72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('buildings', sa.Column('organizations_count', sa.BIGINT(), server_default='0', nullable=False))
+    op.add_column('activities', sa.Column('organizations_count', sa.BIGINT(), server_default='0', nullable=False))
+    op.execute(
+        'UPDATE buildings SET organizations_count = '
+        '(SELECT count(*) FROM organizations WHERE organizations.building_uuid = buildings.uuid)'
+    )
+    op.execute(
+        'UPDATE activities SET organizations_count = '
+        '(SELECT count(DISTINCT organizations_activities.organization_uuid) FROM organizations_activities '
+        'JOIN activities_closure ON activities_closure.descendant_uuid = organizations_activities.activity_uuid '
+        'WHERE activities_closure.ancestor_uuid = activities.uuid)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('activities', 'organizations_count')
+    op.drop_column('buildings', 'organizations_count')
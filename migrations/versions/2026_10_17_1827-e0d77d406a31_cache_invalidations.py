@@ -0,0 +1,40 @@
+"""cache invalidations
+
+Revision ID: e0d77d406a31
+Revises: e424af2f6bf0
+Create Date: 2026-10-17 18:27:45.775689
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e0d77d406a31'
+down_revision: Union[str, Sequence[str], None] = 'e424af2f6bf0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cache_invalidations',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BIGINT(), nullable=False),
+    sa.Column('record_uuid', sa.UUID(), nullable=False),
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('create_date', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('update_date', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('uuid')
+    )
+    op.create_index(
+        'ix_cache_invalidations_name_version', 'cache_invalidations', ['name', 'version'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cache_invalidations_name_version', table_name='cache_invalidations')
+    op.drop_table('cache_invalidations')
@@ -0,0 +1,71 @@
+"""changes commit order
+
+Revision ID: 9ed59d2906fe
+Revises: e0d77d406a31
+Create Date: 2026-10-17 18:45:52.518870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9ed59d2906fe'
+down_revision: Union[str, Sequence[str], None] = 'e0d77d406a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('activities', sa.Column('change_id', sa.BIGINT(), server_default='0', nullable=False))
+    op.add_column('buildings', sa.Column('change_id', sa.BIGINT(), server_default='0', nullable=False))
+    op.add_column('organizations', sa.Column('change_id', sa.BIGINT(), server_default='0', nullable=False))
+    op.add_column('tombstones', sa.Column('change_id', sa.BIGINT(), server_default='0', nullable=False))
+    op.alter_column('activities', 'change_id', server_default=None)
+    op.alter_column('buildings', 'change_id', server_default=None)
+    op.alter_column('organizations', 'change_id', server_default=None)
+    op.alter_column('tombstones', 'change_id', server_default=None)
+    # Existing changes keep the order of update_date below any transaction id
+    op.execute(
+        'CREATE TEMPORARY TABLE change_ids AS '
+        'SELECT uuid, row_number() OVER (ORDER BY update_date, uuid) - count(*) OVER () - 1 AS change_id FROM ('
+        'SELECT uuid, update_date FROM activities UNION ALL SELECT uuid, update_date FROM buildings UNION ALL '
+        'SELECT uuid, update_date FROM organizations UNION ALL SELECT uuid, update_date FROM tombstones'
+        ') AS changes'
+    )
+    op.execute(
+        'UPDATE activities SET change_id = change_ids.change_id '
+        'FROM change_ids WHERE change_ids.uuid = activities.uuid'
+    )
+    op.execute(
+        'UPDATE buildings SET change_id = change_ids.change_id '
+        'FROM change_ids WHERE change_ids.uuid = buildings.uuid'
+    )
+    op.execute(
+        'UPDATE organizations SET change_id = change_ids.change_id '
+        'FROM change_ids WHERE change_ids.uuid = organizations.uuid'
+    )
+    op.execute(
+        'UPDATE tombstones SET change_id = change_ids.change_id '
+        'FROM change_ids WHERE change_ids.uuid = tombstones.uuid'
+    )
+    op.execute('DROP TABLE change_ids')
+    op.create_index('ix_tombstones_entity_change_id', 'tombstones', ['entity', 'change_id', 'uuid'], unique=False)
+    op.create_index('ix_activities_change_id', 'activities', ['change_id', 'uuid'], unique=False)
+    op.create_index('ix_buildings_change_id', 'buildings', ['change_id', 'uuid'], unique=False)
+    op.create_index('ix_organizations_change_id', 'organizations', ['change_id', 'uuid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organizations_change_id', table_name='organizations')
+    op.drop_index('ix_buildings_change_id', table_name='buildings')
+    op.drop_index('ix_activities_change_id', table_name='activities')
+    op.drop_index('ix_tombstones_entity_change_id', table_name='tombstones')
+    op.drop_column('tombstones', 'change_id')
+    op.drop_column('organizations', 'change_id')
+    op.drop_column('buildings', 'change_id')
+    op.drop_column('activities', 'change_id')
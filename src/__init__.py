@@ -1,3 +1,3 @@
 from src.buildings.models import BuildingDB
-from src.activities.models import ActivityDB, OrganizationActivityDB
+from src.activities.models import ActivityDB, OrganizationActivityDB, ActivityClosureDB
 from src.organizations.models import OrganizationDB, PhoneDB
\ No newline at end of file
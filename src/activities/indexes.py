@@ -0,0 +1,165 @@
+from typing import Any, Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import ActivityDB
+from src.activities.schemas import ActivityTreeItemSchema, ActivityListItemSchema, ActivityDetailSchema, \
+    ActivityOutSchema
+from src.base.indexes import BaseMemoryIndex, NamePrefixIndex
+
+
+class ActivityTreeIndex(BaseMemoryIndex):
+    """In-memory copy of the whole activity tree as a parent/children adjacency structure."""
+    version_name = 'activities'
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.clear()
+
+    async def fetch(self, session: AsyncSession) -> Sequence[Any]:
+        """Fetch all activities."""
+        query = select(ActivityDB.uuid, ActivityDB.name, ActivityDB.parent_uuid).order_by(ActivityDB.name)
+        return list(await session.execute(query))
+
+    def build(self, rows: Sequence[Any]) -> None:
+        """Build adjacency structure, children are ordered by name."""
+        for activity_uuid, name, parent_uuid in rows:
+            self.names[activity_uuid] = name
+            self.parents[activity_uuid] = parent_uuid
+            self.children.setdefault(parent_uuid, []).append(activity_uuid)
+
+    def clear(self) -> None:
+        """Clear index data."""
+        self.names: dict[UUID, str] = {}
+        self.parents: dict[UUID, UUID | None] = {}
+        self.children: dict[UUID | None, list[UUID]] = {}
+
+    def get_path(self, activity_uuid: UUID) -> list[UUID]:
+        """Get uuids from the root activity down to the activity."""
+        path = []
+        while activity_uuid is not None:
+            path.append(activity_uuid)
+            activity_uuid = self.parents.get(activity_uuid)
+        return path[::-1]
+
+    def get_descendants(self, activity_uuids: Iterable[UUID]) -> set[UUID]:
+        """Get the activities with all their descendants."""
+        result = set()
+        stack = [activity_uuid for activity_uuid in activity_uuids if activity_uuid in self.names]
+        while stack:
+            activity_uuid = stack.pop()
+            if activity_uuid not in result:
+                result.add(activity_uuid)
+                stack.extend(self.children.get(activity_uuid, []))
+        return result
+
+    def search(self, name: str) -> set[UUID]:
+        """Get activities whose name contains the text with all their descendants."""
+        name = name.casefold()
+        return self.get_descendants(a for a, activity_name in self.names.items() if name in activity_name.casefold())
+
+    def get_tree(self, activity_uuids: Iterable[UUID]) -> list[ActivityTreeItemSchema]:
+        """Get tree of the activities completed with their ancestors."""
+        included = set()
+        for activity_uuid in activity_uuids:
+            if activity_uuid in self.names:
+                included.update(self.get_path(activity_uuid))
+
+        def convert_to_schema(activity_uuid: UUID) -> ActivityTreeItemSchema:
+            children = [convert_to_schema(a) for a in self.children.get(activity_uuid, []) if a in included]
+            return ActivityTreeItemSchema(uuid=activity_uuid, name=self.names[activity_uuid], activities=children)
+
+        return [convert_to_schema(a) for a in self.children.get(None, []) if a in included]
+
+    def get_trees(self, activity_uuids: dict[UUID, Iterable[UUID]]) -> dict[UUID, list[ActivityTreeItemSchema]]:
+        """Get trees of several activity sets completed with their ancestors in one pass over the hierarchy."""
+        included: dict[UUID, set[UUID]] = {}
+        for key, uuids in activity_uuids.items():
+            for activity_uuid in uuids:
+                if activity_uuid in self.names:
+                    for path_uuid in self.get_path(activity_uuid):
+                        included.setdefault(path_uuid, set()).add(key)
+        trees = {key: [] for key in activity_uuids}
+        items: dict[tuple[UUID, UUID], ActivityTreeItemSchema] = {}
+        stack = [a for a in reversed(self.children.get(None, [])) if a in included]
+        while stack:
+            activity_uuid = stack.pop()
+            parent_uuid = self.parents[activity_uuid]
+            for key in included[activity_uuid]:
+                item = ActivityTreeItemSchema(uuid=activity_uuid, name=self.names[activity_uuid], activities=[])
+                siblings = trees[key] if parent_uuid is None else items[key, parent_uuid].activities
+                siblings.append(item)
+                items[key, activity_uuid] = item
+            stack.extend(a for a in reversed(self.children.get(activity_uuid, [])) if a in included)
+        return trees
+
+    def get_list_item(self, activity_uuid: UUID, counts: dict[UUID, int]) -> ActivityListItemSchema:
+        """Get activity with all its children and organization counters."""
+        children = [self.get_list_item(a, counts) for a in self.children.get(activity_uuid, [])]
+        return ActivityListItemSchema(
+            uuid=activity_uuid, name=self.names[activity_uuid], organizations_count=counts.get(activity_uuid, 0),
+            children=children
+        )
+
+    def get_list(self, counts: dict[UUID, int]) -> list[ActivityListItemSchema]:
+        """Get root activities with all their children and organization counters."""
+        return [self.get_list_item(a, counts) for a in self.children.get(None, [])]
+
+    def get_out(self, activity_uuid: UUID | None) -> ActivityOutSchema | None:
+        """Get activity with its parents."""
+        if activity_uuid is None:
+            return None
+        parent = self.get_out(self.parents[activity_uuid])
+        return ActivityOutSchema(uuid=activity_uuid, name=self.names[activity_uuid], parent=parent)
+
+    def get_detail(self, activity_uuid: UUID, counts: dict[UUID, int]) -> ActivityDetailSchema | None:
+        """Get activity with its parents and children with organization counters."""
+        if activity_uuid not in self.names:
+            return None
+        return ActivityDetailSchema(
+            **self.get_out(activity_uuid).model_dump(),
+            children=self.get_list_item(activity_uuid, counts).children
+        )
+
+
+class ActivityCountIndex(BaseMemoryIndex):
+    """In-memory organization counters of activity subtrees, versioned apart from the tree structure."""
+    version_name = 'activity_counts'
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.clear()
+
+    async def fetch(self, session: AsyncSession) -> Sequence[Any]:
+        """Fetch activity counters."""
+        return list(await session.execute(select(ActivityDB.uuid, ActivityDB.organizations_count)))
+
+    def build(self, rows: Sequence[Any]) -> None:
+        """Build counters."""
+        self.counts.update(rows)
+
+    def clear(self) -> None:
+        """Clear index data."""
+        self.counts: dict[UUID, int] = {}
+
+    def add(self, deltas: dict[UUID, int], version: int) -> None:
+        """Add organization counter deltas of the activities."""
+        if self.touch(version):
+            for activity_uuid, delta in deltas.items():
+                self.counts[activity_uuid] = self.counts.get(activity_uuid, 0) + delta
+
+
+class ActivityNameIndex(NamePrefixIndex):
+    """In-memory sorted array of activity names for suggestions."""
+    version_name = 'activity_names'
+
+    async def fetch(self, session: AsyncSession) -> Sequence[Any]:
+        """Fetch activity names."""
+        return list(await session.execute(select(ActivityDB.uuid, ActivityDB.name)))
+
+
+activity_tree = ActivityTreeIndex()
+activity_count_index = ActivityCountIndex()
+activity_name_index = ActivityNameIndex()
@@ -1,8 +1,9 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UUID
+from sqlalchemy import UUID, Index
 from sqlalchemy.orm import Mapped, relationship
 
+from src.base.functions import transaction_id
 from src.base.models import BaseDBModel, mc, FK
 
 if TYPE_CHECKING:
@@ -12,9 +13,15 @@ if TYPE_CHECKING:
 class ActivityDB(BaseDBModel):
     """Activity database model."""
     __tablename__: str = 'activities'
+    __table_args__ = (
+        Index('ix_activities_update_date', 'update_date', 'uuid'),
+        Index('ix_activities_change_id', 'change_id', 'uuid'),
+    )
 
     name: Mapped[str] = mc(nullable=False, unique=True)
     parent_uuid: Mapped[UUID] = mc(FK('activities.uuid', ondelete='CASCADE'), nullable=True, unique=False)
+    organizations_count: Mapped[int] = mc(nullable=False, default=0, server_default='0')
+    change_id: Mapped[int] = mc(nullable=False, default=transaction_id(), onupdate=transaction_id())
 
     parent: Mapped['ActivityDB'] = relationship(foreign_keys=[parent_uuid], remote_side='ActivityDB.uuid')
     children: Mapped[list['ActivityDB']] = relationship(back_populates='parent')
@@ -31,3 +38,14 @@ class OrganizationActivityDB(BaseDBModel):
     uuid = None
     organization_uuid: Mapped[UUID] = mc(FK('organizations.uuid', ondelete='CASCADE'), primary_key=True)
     activity_uuid: Mapped[UUID] = mc(FK('activities.uuid', ondelete='RESTRICT'), primary_key=True)
+
+
+class ActivityClosureDB(BaseDBModel):
+    """Activity closure database model, one row per ancestor and descendant pair including the activity itself."""
+    __tablename__: str = 'activities_closure'
+    __table_args__ = (Index('ix_activities_closure_descendant_uuid', 'descendant_uuid'),)
+
+    uuid = None
+    ancestor_uuid: Mapped[UUID] = mc(FK('activities.uuid', ondelete='CASCADE'), primary_key=True)
+    descendant_uuid: Mapped[UUID] = mc(FK('activities.uuid', ondelete='CASCADE'), primary_key=True)
+    depth: Mapped[int] = mc(nullable=False)
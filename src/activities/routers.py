@@ -1,18 +1,20 @@
+from datetime import datetime
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends
-from fastapi_pagination.ext.sqlalchemy import apaginate
+from fastapi import Depends, Query
+from fastapi_pagination import paginate
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from src.activities.schemas import ActivityCreateSchema, ActivityOutSchema, ActivityListItemSchema, \
-    ActivityDetailSchema, ActivityUpdateSchema
+    ActivityDetailSchema, ActivityUpdateSchema, ActivityChangeSchema
 from src.activities.sessions import ActivitySession
 from src.activities.urls import activity_url
 from src.auth.auth import BaseAuth
-from src.base.paginators import PaginatePage
+from src.base.paginators import PaginatePage, CursorPaginatePage, paginate_by_key
 from src.base.routers import FastAPIRouter
-from src.base.schemas import responses
+from src.base.schemas import responses, ChangesSchema, UUIDNameSchema
 from src.config.session import get_async_session
 
 activity_router = FastAPIRouter()
@@ -54,7 +56,64 @@ async def activity_list(
 ) -> PaginatePage[ActivityListItemSchema]:
     """Activity list."""
     activities = await ActivitySession(session).activity_list()
-    result = await apaginate(session, activities)
+    result = paginate(activities, safe=True, additional_data={'estimated_total': len(activities)})
+    return result
+
+
+@activity_router.get(
+    activity_url.activity_list_cursor,
+    response_model=CursorPaginatePage[ActivityListItemSchema],
+    responses=responses(
+        CursorPaginatePage[ActivityListItemSchema],
+        exclude=[status.HTTP_422_UNPROCESSABLE_CONTENT]
+    ),
+    description='Activity list with cursor pagination ordered by name',
+)
+async def activity_list_cursor(
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> CursorPaginatePage[ActivityListItemSchema]:
+    """Activity list cursor."""
+    activities = await ActivitySession(session).activity_list()
+    result = paginate_by_key(activities, key=lambda activity: activity.name)
+    return result
+
+
+@activity_router.get(
+    activity_url.activity_suggest,
+    response_model=list[UUIDNameSchema],
+    responses=responses(list[UUIDNameSchema]),
+    description='Activity names starting with the text ignoring case, ordered by name',
+)
+async def activity_suggest(
+        q: Annotated[str, Query(min_length=1, max_length=255, description='Beginning of the activity name')],
+        limit: Annotated[int, Query(ge=1, le=50, description='Number of suggestions')] = 10,
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> list[UUIDNameSchema]:
+    """Activity suggest."""
+    result = await ActivitySession(session).activity_suggest(q, limit)
+    return result
+
+
+@activity_router.get(
+    activity_url.activity_changes,
+    response_model=ChangesSchema[ActivityChangeSchema],
+    responses=responses(
+        ChangesSchema[ActivityChangeSchema],
+        statuses=[status.HTTP_400_BAD_REQUEST]
+    ),
+    description='Activities changed or deleted after the timestamp or the cursor in the order of changes',
+)
+async def activity_changes(
+        since: Annotated[datetime, Query(description='Changes after the timestamp')] = None,
+        cursor: Annotated[str, Query(description='next_cursor of the previous response')] = None,
+        size: Annotated[int, Query(ge=1, le=1000, description='Number of changes')] = 100,
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> ChangesSchema[ActivityChangeSchema]:
+    """Activities changes."""
+    result = await ActivitySession(session).activity_changes(since, cursor, size)
     return result
 
 
@@ -17,6 +17,13 @@ class ActivityCreateSchema(BaseSchema):
     parent_uuid: UUID | None = None
 
 
+class ActivityChangeSchema(BaseSchema):
+    """Activity change schema."""
+    uuid: UUID
+    name: str
+    parent_uuid: UUID | None
+
+
 class ActivityOutSchema(BaseSchema):
     """Activity out schema."""
     uuid: UUID
@@ -28,6 +35,7 @@ class ActivityListItemSchema(BaseSchema):
     """Activity out schema."""
     uuid: UUID
     name: str
+    organizations_count: int
     children: list['ActivityListItemSchema']
 
 
@@ -1,15 +1,24 @@
+from datetime import datetime
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import insert, Select, select, update, delete
+from sqlalchemy import insert, update, delete, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from starlette import status
 
-from src import ActivityDB
-from src.activities.schemas import ActivityCreateSchema, ActivityOutSchema, ActivityDetailSchema, ActivityUpdateSchema
+from src import ActivityDB, ActivityClosureDB
+from src.activities.indexes import activity_tree, activity_name_index, activity_count_index
+from src.activities.schemas import ActivityCreateSchema, ActivityOutSchema, ActivityDetailSchema, \
+    ActivityUpdateSchema, ActivityListItemSchema, ActivityChangeSchema
+from src.activities.services import add_activity_closure, move_activity_closure
+from src.base.changes import get_changes, add_tombstones
+from src.base.indexes import bump_indexes, reload_indexes
+from src.base.schemas import ChangesSchema, UUIDNameSchema
 from src.base.sessions import BaseSession
 from src.base.utils import handle_error
+from src.counters.services import recount_activities
+from src.organizations.indexes import organization_detail_cache, organization_bitmap_index
 
 
 class ActivitySession(BaseSession):
@@ -32,36 +41,43 @@ class ActivitySession(BaseSession):
                 if activity.parent and activity.parent.parent and activity.parent.parent.parent_uuid:
                     detail = 'Not possible to choice parent activity with third level depth'
                     raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
+                await add_activity_closure(self.session, activity.uuid, activity.parent_uuid)
+                versions = await bump_indexes(
+                    self.session, activity_tree, organization_bitmap_index, activity_name_index
+                )
         except IntegrityError as err:
             return handle_error(err)
+        activity_name_index.upsert([(activity.uuid, activity.name)], versions.pop(activity_name_index))
+        reload_indexes(versions)
         return activity
 
-    async def activity_list(self) -> Select:
+    async def activity_list(self) -> list[ActivityListItemSchema]:
         """Activity list."""
-        query = (
-            select(ActivityDB)
-            .where(ActivityDB.parent_uuid.is_(None))
-            .options(
-                selectinload(ActivityDB.children, recursion_depth=2)
-            )
-        )
-        return query
+        await activity_tree.ensure_loaded(self.session)
+        await activity_count_index.ensure_loaded(self.session)
+        return activity_tree.get_list(activity_count_index.counts)
 
-    async def activity_detail(self, activity_uuid) -> ActivityDB | ActivityDetailSchema:
-        """Activity detail."""
+    async def activity_suggest(self, q: str, limit: int) -> list[UUIDNameSchema]:
+        """Activity names starting with the text."""
+        await activity_name_index.ensure_loaded(self.session)
+        return activity_name_index.search(q, limit)
+
+    async def activity_changes(self, since: datetime | None, cursor: str | None, size: int) -> ChangesSchema:
+        """Activity changes."""
         async with self.session.begin():
-            query = (
-                select(ActivityDB)
-                .where(ActivityDB.uuid == activity_uuid)
-                .options(
-                    selectinload(ActivityDB.parent, recursion_depth=2),
-                    selectinload(ActivityDB.children, recursion_depth=2)
-                )
+            return await get_changes(
+                self.session, ActivityDB, ActivityDB.__tablename__, since, cursor, size,
+                ActivityChangeSchema.model_validate
             )
-            activity = await self.session.scalar(query)
-            if not activity:
-                raise HTTPException(status.HTTP_404_NOT_FOUND, 'Activity not found')
-            return activity
+
+    async def activity_detail(self, activity_uuid) -> ActivityDetailSchema:
+        """Activity detail."""
+        await activity_tree.ensure_loaded(self.session)
+        await activity_count_index.ensure_loaded(self.session)
+        activity = activity_tree.get_detail(activity_uuid, activity_count_index.counts)
+        if not activity:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, 'Activity not found')
+        return activity
 
     async def activity_update(self, body: ActivityUpdateSchema, activity_uuid: UUID) -> ActivityDB | ActivityOutSchema:
         """Activity update."""
@@ -75,7 +91,8 @@ class ActivitySession(BaseSession):
                     .values(**data)
                     .returning(ActivityDB)
                     .options(
-                        selectinload(ActivityDB.children)
+                        selectinload(ActivityDB.children),
+                        selectinload(ActivityDB.parent, recursion_depth=2),
                     )
                 )
                 activity = await self.session.scalar(query)
@@ -88,6 +105,11 @@ class ActivitySession(BaseSession):
                     detail = 'Not possible to choice the same activity as a parent'
                     raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
                 if parent_uuid != 'plug':
+                    query = (
+                        select(ActivityClosureDB.ancestor_uuid)
+                        .where(ActivityClosureDB.descendant_uuid == activity_uuid)
+                    )
+                    ancestors_before = set(await self.session.scalars(query))
                     query = (
                         update(ActivityDB)
                         .where(ActivityDB.uuid == activity_uuid)
@@ -96,19 +118,42 @@ class ActivitySession(BaseSession):
                         .options(
                             selectinload(ActivityDB.parent, recursion_depth=2),
                         )
+                        .execution_options(populate_existing=True)
                     )
                     activity = await self.session.scalar(query)
+                    await move_activity_closure(self.session, activity_uuid, parent_uuid)
+                    # Only subtree counters of the ancestors gained or lost by the move change
+                    query = (
+                        select(ActivityClosureDB.ancestor_uuid)
+                        .where(ActivityClosureDB.descendant_uuid == activity_uuid)
+                    )
+                    ancestors_after = set(await self.session.scalars(query))
+                    await recount_activities(self.session, ancestors_before ^ ancestors_after)
                 if activity.parent and activity.parent.parent and activity.parent.parent.parent_uuid:
                     detail = 'Not possible to choice parent activity with third level depth'
                     raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
+                indexes = [activity_tree, organization_bitmap_index, organization_detail_cache]
+                if 'name' in data:
+                    indexes.append(activity_name_index)
+                if parent_uuid != 'plug':
+                    indexes.append(activity_count_index)
+                versions = await bump_indexes(self.session, *indexes)
         except IntegrityError as err:
             return handle_error(err)
+        if 'name' in data:
+            activity_name_index.upsert([(activity_uuid, data['name'])], versions.pop(activity_name_index))
+        reload_indexes(versions)
         return activity
 
     async def activity_delete(self, activity_uuid: UUID) -> None:
         """Activity delete."""
         try:
             async with self.session.begin():
+                query = (
+                    select(ActivityClosureDB.descendant_uuid)
+                    .where(ActivityClosureDB.ancestor_uuid == activity_uuid)
+                )
+                subtree = list(await self.session.scalars(query))
                 query = (
                     delete(ActivityDB)
                     .where(ActivityDB.uuid == activity_uuid)
@@ -117,5 +162,12 @@ class ActivitySession(BaseSession):
                 activity = await self.session.scalar(query)
                 if not activity:
                     raise HTTPException(status.HTTP_404_NOT_FOUND, 'Activity not found')
+                await add_tombstones(self.session, ActivityDB.__tablename__, subtree)
+                versions = await bump_indexes(
+                    self.session, activity_tree, organization_bitmap_index, organization_detail_cache,
+                    activity_name_index
+                )
         except IntegrityError as err:
             return handle_error(err)
+        activity_name_index.remove(subtree, versions.pop(activity_name_index))
+        reload_indexes(versions)
@@ -10,6 +10,9 @@ class ActivityURL(BaseURL):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.activity_list: str = '/'
+        self.activity_list_cursor: str = '/cursor/'
+        self.activity_changes: str = '/changes/'
+        self.activity_suggest: str = '/suggest/'
         self.activity_create: str = '/'
         self.activity_detail: str = '/{activity_uuid}/'
         self.activity_update: str = '/{activity_uuid}/'
@@ -40,7 +40,8 @@ class BaseTestCase:
             if data and method.lower() != 'get':
                 request_data = json.dumps(data)
 
-            response = await client.request(method, url, content=request_data, follow_redirects=True, params=data)
+            params = data if isinstance(data, dict) else None
+            response = await client.request(method, url, content=request_data, follow_redirects=True, params=params)
             assert response is not None
             assert response.status_code == status_code, f'status: {response.status_code}, response: {response.text}'
 
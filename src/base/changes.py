@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Iterable, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import TIMESTAMP, select, or_, and_, insert, type_coerce
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from starlette import status
+
+from src.base.functions import transaction_horizon
+from src.base.models import BaseDBModel, TombstoneDB
+from src.base.schemas import ChangeSchema, ChangesSchema
+
+# SQLite keeps server default timestamps without microseconds, since timestamps are bound in the same format
+SINCE_TIMESTAMP = TIMESTAMP(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format='%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d'),
+    'sqlite'
+)
+
+
+def encode_cursor(change_id: int, uuid: UUID) -> str:
+    """Encode changes cursor."""
+    return base64.urlsafe_b64encode(json.dumps([change_id, f'{uuid}']).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[int, UUID]:
+    """Decode changes cursor."""
+    try:
+        change_id, uuid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(change_id, int):
+            raise ValueError('Change id should be an integer')
+        return change_id, UUID(uuid)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, 'Invalid cursor')
+
+
+def after(change_id: InstrumentedAttribute, uuid: InstrumentedAttribute, position: tuple[int, UUID]) -> Any:
+    """Keyset condition of rows changed after the position."""
+    return or_(change_id > position[0], and_(change_id == position[0], uuid > position[1]))
+
+
+async def get_changes(
+        session: AsyncSession,
+        model: type[BaseDBModel],
+        entity: str,
+        since: datetime | None,
+        cursor: str | None,
+        size: int,
+        convert: Callable[[Any], BaseModel],
+        options: Sequence[Any] = ()
+) -> ChangesSchema:
+    """Get rows and tombstones changed after the cursor or the timestamp in the order of commits.
+
+    Rows are ordered by the id of the transaction that changed them. Rows of transactions from the horizon on are
+    held back until all older transactions finish, so a transaction committed late cannot fall behind the cursor.
+    """
+    horizon = await session.scalar(select(transaction_horizon()))
+    query = (
+        select(model)
+        .options(*options)
+        .where(model.change_id < horizon)
+        .order_by(model.change_id, model.uuid)
+        .limit(size + 1)
+    )
+    tombstones = (
+        select(TombstoneDB.change_id, TombstoneDB.uuid, TombstoneDB.record_uuid, TombstoneDB.update_date)
+        .where(TombstoneDB.entity == entity, TombstoneDB.change_id < horizon)
+        .order_by(TombstoneDB.change_id, TombstoneDB.uuid)
+        .limit(size + 1)
+    )
+    position = None
+    if cursor is not None:
+        position = decode_cursor(cursor)
+        query = query.where(after(model.change_id, model.uuid, position))
+        tombstones = tombstones.where(after(TombstoneDB.change_id, TombstoneDB.uuid, position))
+    elif since is not None:
+        since = type_coerce(since, SINCE_TIMESTAMP)
+        query = query.where(model.update_date > since)
+        tombstones = tombstones.where(TombstoneDB.update_date > since)
+    changes = [(row.change_id, row.uuid, row.uuid, row.update_date, row) for row in await session.scalars(query)]
+    changes.extend((*tombstone, None) for tombstone in await session.execute(tombstones))
+    changes.sort(key=lambda change: (change[0], change[1]))
+    has_more = len(changes) > size
+    changes = changes[:size]
+    if changes:
+        cursor = encode_cursor(changes[-1][0], changes[-1][1])
+    elif position is not None:
+        cursor = encode_cursor(*position)
+    items = [
+        ChangeSchema(
+            uuid=record_uuid, update_date=update_date, deleted=row is None, data=None if row is None else convert(row)
+        )
+        for _, _, record_uuid, update_date, row in changes
+    ]
+    return ChangesSchema(items=items, next_cursor=cursor, has_more=has_more)
+
+
+async def add_tombstones(session: AsyncSession, entity: str, record_uuids: Iterable[UUID]) -> None:
+    """Record deleted records for the changes feed."""
+    rows = [{'entity': entity, 'record_uuid': record_uuid} for record_uuid in record_uuids]
+    if rows:
+        await session.execute(insert(TombstoneDB), rows)
@@ -0,0 +1,15 @@
+import enum
+
+
+class TotalModeEnum(enum.Enum):
+    exact = 'exact'
+    estimate = 'estimate'
+    none = 'none'
+
+
+class SelectivityEnum(enum.IntEnum):
+    """Expected selectivity of a filter, filters with lower values are applied first."""
+    key = 1
+    candidates = 2
+    semi_join = 3
+    pattern = 4
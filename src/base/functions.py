@@ -0,0 +1,82 @@
+from typing import Any
+
+from sqlalchemy import JSON, BIGINT, Float, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+
+class json_agg_objects(GenericFunction):
+    """Aggregate rows into a JSON array of objects: json_agg_objects('uuid', Model.uuid, 'name', Model.name)."""
+    type = JSON()
+    inherit_cache = True
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        args = tuple(literal_column(f"'{arg}'") if isinstance(arg, str) else arg for arg in args)
+        super().__init__(*args, **kwargs)
+
+
+@compiles(json_agg_objects)
+def compile_json_agg_objects(element: json_agg_objects, compiler: Any, **kwargs: Any) -> str:
+    """PostgreSQL json_agg of json_build_object."""
+    return f'json_agg(json_build_object({compiler.process(element.clauses, **kwargs)}))'
+
+
+@compiles(json_agg_objects, 'sqlite')
+def compile_json_agg_objects_sqlite(element: json_agg_objects, compiler: Any, **kwargs: Any) -> str:
+    """SQLite json_group_array of json_object."""
+    return f'json_group_array(json_object({compiler.process(element.clauses, **kwargs)}))'
+
+
+class text_similarity(GenericFunction):
+    """Relevance of the text to the searched string from 0 to 1: text_similarity(Model.name, 'text')."""
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(text_similarity)
+def compile_text_similarity(element: text_similarity, compiler: Any, **kwargs: Any) -> str:
+    """PostgreSQL pg_trgm similarity."""
+    return f'similarity({compiler.process(element.clauses, **kwargs)})'
+
+
+@compiles(text_similarity, 'sqlite')
+def compile_text_similarity_sqlite(element: text_similarity, compiler: Any, **kwargs: Any) -> str:
+    """SQLite share of the text length covered by the searched string."""
+    text, search = (compiler.process(clause, **kwargs) for clause in element.clauses)
+    return f'CAST(length({search}) AS REAL) / length({text})'
+
+
+class transaction_id(GenericFunction):
+    """Id of the writing transaction, ids of transactions finished below transaction_horizon() do not change."""
+    type = BIGINT()
+    inherit_cache = True
+
+
+@compiles(transaction_id)
+def compile_transaction_id(element: transaction_id, compiler: Any, **kwargs: Any) -> str:
+    """PostgreSQL 64-bit id of the current transaction."""
+    return 'CAST(CAST(pg_current_xact_id() AS TEXT) AS BIGINT)'
+
+
+@compiles(transaction_id, 'sqlite')
+def compile_transaction_id_sqlite(element: transaction_id, compiler: Any, **kwargs: Any) -> str:
+    """SQLite count of rows changed on the connection, writing transactions of SQLite do not overlap."""
+    return 'total_changes()'
+
+
+class transaction_horizon(GenericFunction):
+    """Transaction id below which all transactions are committed or rolled back."""
+    type = BIGINT()
+    inherit_cache = True
+
+
+@compiles(transaction_horizon)
+def compile_transaction_horizon(element: transaction_horizon, compiler: Any, **kwargs: Any) -> str:
+    """PostgreSQL id of the oldest transaction running at the snapshot."""
+    return 'CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS TEXT) AS BIGINT)'
+
+
+@compiles(transaction_horizon, 'sqlite')
+def compile_transaction_horizon_sqlite(element: transaction_horizon, compiler: Any, **kwargs: Any) -> str:
+    """SQLite id next to the ids taken on the connection."""
+    return 'total_changes() + 1'
@@ -0,0 +1,181 @@
+from bisect import bisect_left
+from time import monotonic
+from typing import Any, Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.base.models import CacheVersionDB
+from src.base.schemas import UUIDNameSchema
+from src.base.utils import get_upsert
+from src.config.settings import project_config
+
+
+async def get_cache_version(session: AsyncSession, name: str) -> int:
+    """Get shared cache version."""
+    version = await session.scalar(select(CacheVersionDB.version).where(CacheVersionDB.name == name))
+    return version or 0
+
+
+async def bump_cache_version(session: AsyncSession, name: str) -> int:
+    """Bump shared cache version in the current transaction, the missing version row is created."""
+    query = get_upsert(session, CacheVersionDB).values(name=name, version=1)
+    query = (
+        query.on_conflict_do_update(index_elements=[CacheVersionDB.name], set_={'version': CacheVersionDB.version + 1})
+        .returning(CacheVersionDB.version)
+    )
+    return await session.scalar(query)
+
+
+class BaseMemoryIndex:
+    """Base per-process in-memory index lazily loaded from the database.
+
+    Writes bump the shared version in the cache_versions table, so every process reloads its copy
+    on the next access after a write made by another process. The shared version is checked at most
+    once per CACHE_VERSION_CHECK_INTERVAL seconds.
+    """
+    indexes: list['BaseMemoryIndex'] = []
+    version_name: str = ''
+
+    def __init__(self) -> None:
+        self.loaded: bool = False
+        self.version: int = 0
+        self.generation: int = 0
+        self.checked_at: float = 0.0
+        self.indexes.append(self)
+
+    async def fetch(self, session: AsyncSession) -> Sequence[Any]:
+        """Fetch rows the index is built from."""
+        raise NotImplementedError
+
+    def build(self, rows: Sequence[Any]) -> None:
+        """Build index from fetched rows."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Clear index data."""
+        raise NotImplementedError
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        """Load index if it is not loaded yet or changed by another process."""
+        now = monotonic()
+        if self.loaded and now - self.checked_at < project_config.app.CACHE_VERSION_CHECK_INTERVAL:
+            return
+        version = await get_cache_version(session, self.version_name)
+        self.checked_at = now
+        if self.loaded and (version == self.version or await self.apply_changes(session, version)):
+            return
+        generation = self.generation
+        rows = await self.fetch(session)
+        self.clear()
+        self.build(rows)
+        self.version = version
+        # Writes made while rows were fetched are not guaranteed to be in the snapshot, reload next time
+        self.loaded = generation == self.generation
+
+    async def apply_changes(self, session: AsyncSession, version: int) -> bool:
+        """Apply changes made by other processes up to the version in place, return False to reload the index."""
+        return False
+
+    async def bump(self, session: AsyncSession) -> int:
+        """Bump shared version of the index in the current transaction."""
+        return await bump_cache_version(session, self.version_name)
+
+    def touch(self, version: int) -> bool:
+        """Register a committed write, return True if the index should be changed in place."""
+        self.generation += 1
+        if self.loaded and version == self.version + 1:
+            self.version = version
+            return True
+        self.loaded = False
+        return False
+
+    def reset(self) -> None:
+        """Drop index data, it will be reloaded on the next access."""
+        self.clear()
+        self.loaded = False
+
+
+class NamePrefixIndex(BaseMemoryIndex):
+    """Base in-memory sorted array of case-folded names for prefix completion."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.clear()
+
+    def build(self, rows: Sequence[Any]) -> None:
+        """Build sorted array from uuids and names."""
+        for key, record_uuid, name in sorted((name.casefold(), record_uuid, name) for record_uuid, name in rows):
+            self.keys.append(key)
+            self.uuids.append(record_uuid)
+            self.names[record_uuid] = name
+
+    def clear(self) -> None:
+        """Clear index data."""
+        self.keys: list[str] = []
+        self.uuids: list[UUID] = []
+        self.names: dict[UUID, str] = {}
+
+    def _add(self, record_uuid: UUID, name: str) -> None:
+        key = name.casefold()
+        position = bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.uuids.insert(position, record_uuid)
+        self.names[record_uuid] = name
+
+    def _remove(self, record_uuid: UUID) -> None:
+        name = self.names.pop(record_uuid, None)
+        if name is None:
+            return
+        key = name.casefold()
+        position = bisect_left(self.keys, key)
+        while self.uuids[position] != record_uuid:
+            position += 1
+        del self.keys[position]
+        del self.uuids[position]
+
+    def upsert(self, items: Iterable[tuple[UUID, str]], version: int) -> None:
+        """Add or rename records in the index."""
+        if self.touch(version):
+            for record_uuid, name in items:
+                self._remove(record_uuid)
+                self._add(record_uuid, name)
+
+    def remove(self, record_uuids: Iterable[UUID], version: int) -> None:
+        """Remove records from the index."""
+        if self.touch(version):
+            for record_uuid in record_uuids:
+                self._remove(record_uuid)
+
+    def search(self, prefix: str, limit: int) -> list[UUIDNameSchema]:
+        """Get records whose name starts with the prefix ignoring case, ordered by name."""
+        prefix = prefix.casefold()
+        position = bisect_left(self.keys, prefix)
+        result = []
+        while position < len(self.keys) and len(result) < limit and self.keys[position].startswith(prefix):
+            record_uuid = self.uuids[position]
+            result.append(UUIDNameSchema(uuid=record_uuid, name=self.names[record_uuid]))
+            position += 1
+        return result
+
+
+async def bump_indexes(session: AsyncSession, *indexes: BaseMemoryIndex) -> dict[BaseMemoryIndex, int]:
+    """Bump shared versions of the indexes ordered by name, so concurrent writes lock version rows in one order."""
+    versions = {}
+    for index in sorted(set(indexes), key=lambda i: i.version_name):
+        versions[index] = await index.bump(session)
+    return versions
+
+
+def reload_indexes(versions: dict[BaseMemoryIndex, int]) -> None:
+    """Register committed writes bumping the indexes and drop their data, they are reloaded on the next access."""
+    for index, version in versions.items():
+        index.touch(version)
+        index.reset()
+
+
+def reset_indexes() -> None:
+    """Reset all in-memory indexes."""
+    for index in BaseMemoryIndex.indexes:
+        index.reset()
@@ -0,0 +1,44 @@
+from typing import Any, get_args
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstrumentedAttribute, joinedload, load_only, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+
+def get_nested_schema(annotation: Any) -> type[BaseModel] | None:
+    """Get pydantic schema of the field annotation like Schema, list[Schema] or Schema | None."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = get_nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+def get_schema_options(
+        model: type, schema: type[BaseModel], *columns: InstrumentedAttribute
+) -> list[LoaderOption]:
+    """Get loader options loading only the columns and relationships serialized by the schema.
+
+    Many-to-one relationships are joined, collections are loaded by selectin, nested schemas are projected
+    recursively. Extra columns needed besides the schema fields can be given explicitly.
+    """
+    mapper = inspect(model)
+    attributes = list(columns)
+    relationships = []
+    for name, field in schema.model_fields.items():
+        if name in mapper.relationships:
+            relationship = mapper.relationships[name]
+            attributes.extend(
+                getattr(model, mapper.get_property_by_column(column).key) for column in relationship.local_columns
+            )
+            loader = (selectinload if relationship.uselist else joinedload)(getattr(model, name))
+            nested = get_nested_schema(field.annotation)
+            if nested is not None:
+                loader = loader.options(*get_schema_options(relationship.mapper.class_, nested))
+            relationships.append(loader)
+        elif name in mapper.column_attrs:
+            attributes.append(getattr(model, name))
+    return [load_only(*attributes), *relationships]
@@ -6,9 +6,11 @@ from uuid import UUID
 from typing import Any
 
 import sqlalchemy
-from sqlalchemy import ForeignKey, func, String, ARRAY, TIMESTAMP, BIGINT, JSON, MetaData
+from sqlalchemy import ForeignKey, func, String, ARRAY, TIMESTAMP, BIGINT, JSON, MetaData, Index
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
 
+from src.base.functions import transaction_id
+
 FK = ForeignKey
 mc = mapped_column
 
@@ -33,4 +35,36 @@ class BaseDBModel(DeclarativeBase):
     update_date: Mapped[datetime] = mc(server_default=func.now(), onupdate=func.now())
 
 
+class CacheVersionDB(BaseDBModel):
+    """Cache version database model, shared version of a per-process in-memory index."""
+    __tablename__: str = 'cache_versions'
+
+    uuid = None
+    name: Mapped[str] = mc(primary_key=True)
+    version: Mapped[int] = mc(nullable=False, default=0)
+
+
+class CacheInvalidationDB(BaseDBModel):
+    """Cache invalidation database model, record changed by a shared cache version."""
+    __tablename__: str = 'cache_invalidations'
+    __table_args__ = (Index('ix_cache_invalidations_name_version', 'name', 'version'),)
+
+    name: Mapped[str] = mc(nullable=False)
+    version: Mapped[int] = mc(nullable=False)
+    record_uuid: Mapped[UUID] = mc(nullable=False)
+
+
+class TombstoneDB(BaseDBModel):
+    """Tombstone database model, deleted record of the changes feed."""
+    __tablename__: str = 'tombstones'
+    __table_args__ = (
+        Index('ix_tombstones_entity_update_date', 'entity', 'update_date', 'uuid'),
+        Index('ix_tombstones_entity_change_id', 'entity', 'change_id', 'uuid'),
+    )
+
+    entity: Mapped[str] = mc(nullable=False)
+    record_uuid: Mapped[UUID] = mc(nullable=False)
+    change_id: Mapped[int] = mc(nullable=False, default=transaction_id())
+
+
 metadata = MetaData()
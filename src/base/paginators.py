@@ -1,19 +1,117 @@
-from typing import TypeVar
+import hashlib
+import time
+from typing import TypeVar, Callable, Sequence, Generic, Any
 
 from fastapi import Query
 from fastapi_pagination import Params, Page
-from fastapi_pagination.customization import CustomizedPage, UseParams
+from fastapi_pagination.api import create_page, resolve_params
+from fastapi_pagination.bases import RawParams
+from fastapi_pagination.cursor import CursorPage, CursorParams
+from fastapi_pagination.customization import CustomizedPage, UseParams, UseExcludedFields, UseFieldsAliases
+from fastapi_pagination.ext.sqlalchemy import apaginate, create_count_query
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.base.enums import TotalModeEnum
+from src.config.settings import project_config
 
 T = TypeVar('T')
 
+count_cache: dict[str, tuple[float, int]] = {}
+
 
 class PageParam(Params):
     """Page params."""
     page: int = Query(1, ge=1, description='Page number')
     size: int = Query(10, ge=1, description='Page size')
+    total_mode: TotalModeEnum = Query(
+        TotalModeEnum.exact,
+        description='Total count: exact - count query, estimate - cached count, none - only has_next flag'
+    )
+
+    def to_raw_params(self) -> RawParams:
+        """Raw params, one extra item is fetched to get has_next without the count query."""
+        raw_params = super().to_raw_params()
+        raw_params.include_total = self.total_mode == TotalModeEnum.exact
+        if self.total_mode == TotalModeEnum.none:
+            raw_params.limit += 1
+        return raw_params
+
+
+class TotalPage(Page[T], Generic[T]):
+    """Page with optional total."""
+    total: int | None
+    pages: int | None
+    has_next: bool | None = None
+
+    __params_type__ = PageParam
+
+    @classmethod
+    def create(
+            cls, items: Sequence[T], params: PageParam, *, total: int | None = None, **kwargs: Any
+    ) -> 'TotalPage[T]':
+        """Create page."""
+        estimated_total = kwargs.pop('estimated_total', None)
+        has_next = None
+        if params.total_mode == TotalModeEnum.estimate:
+            total = estimated_total
+        elif params.total_mode == TotalModeEnum.none:
+            has_next = len(items) > params.size
+            items = items[:params.size]
+        return super().create(items, params, total=total, has_next=has_next, **kwargs)
+
+
+class CursorParam(CursorParams):
+    """Cursor page params."""
+    cursor: str | None = Query(None, description='Cursor of the page, next_cursor of the previous page')
+    size: int = Query(10, ge=1, le=100, description='Page size')
 
 
 PaginatePage = CustomizedPage[
-    Page[T],
+    TotalPage[T],
     UseParams(PageParam)
 ]
+
+CursorPaginatePage = CustomizedPage[
+    CursorPage[T],
+    UseParams(CursorParam),
+    UseExcludedFields('current_page', 'current_page_backwards', 'previous_page'),
+    UseFieldsAliases(next_page='next_cursor'),
+]
+
+
+def paginate_by_key(items: Sequence[T], key: Callable[[T], str]) -> CursorPaginatePage[T]:
+    """Cursor pagination of the sequence by the unique string key."""
+    params = resolve_params()
+    raw_params = params.to_raw_params()
+    items = sorted(items, key=key)
+    total = len(items)
+    if raw_params.cursor:
+        items = [item for item in items if key(item) > raw_params.cursor]
+    page_items = items[:raw_params.size]
+    next_ = key(page_items[-1]) if len(items) > raw_params.size else None
+    return create_page(page_items, params=params, next_=next_, total=total)
+
+
+async def get_estimated_total(session: AsyncSession, query: Select) -> int:
+    """Get count of the query rows cached by the filter set for COUNT_CACHE_TTL seconds."""
+    compiled = query.compile(session.bind)
+    key = hashlib.sha256(f'{compiled}{sorted(compiled.params.items())!r}'.encode()).hexdigest()
+    now = time.monotonic()
+    cached = count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+    total = await session.scalar(create_count_query(query))
+    if len(count_cache) >= project_config.app.COUNT_CACHE_SIZE:
+        count_cache.pop(next(iter(count_cache)))
+    count_cache[key] = (now + project_config.app.COUNT_CACHE_TTL, total)
+    return total
+
+
+async def apaginate_query(session: AsyncSession, query: Select) -> TotalPage:
+    """Paginate the query with the requested total mode."""
+    params = resolve_params()
+    additional_data = None
+    if params.total_mode == TotalModeEnum.estimate:
+        additional_data = {'estimated_total': await get_estimated_total(session, query)}
+    return await apaginate(session, query, additional_data=additional_data)
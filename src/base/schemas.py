@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import Generic, TypeVar
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -19,6 +21,24 @@ class UUIDNameSchema(UUIDSchema):
     name: str
 
 
+T = TypeVar('T')
+
+
+class ChangeSchema(BaseModel, Generic[T]):
+    """Change schema, data is empty for deleted records."""
+    uuid: UUID
+    update_date: datetime
+    deleted: bool
+    data: T | None = None
+
+
+class ChangesSchema(BaseModel, Generic[T]):
+    """Changes schema, next_cursor is passed to get the following changes."""
+    items: list[ChangeSchema[T]]
+    next_cursor: str | None
+    has_more: bool
+
+
 class ExceptionSchema(BaseModel):
     """Base Exception Schema."""
     detail: str
@@ -62,7 +82,8 @@ class ResponseSchema:
             statuses = []
         get_status = {response_status: {'model': schema}}
         for status_ in statuses:
-            get_status[status_] = exception_schema if status_ != status.HTTP_204_NO_CONTENT else {'model': None}
+            no_content = status_ in (status.HTTP_204_NO_CONTENT, status.HTTP_304_NOT_MODIFIED)
+            get_status[status_] = {'model': None} if no_content else exception_schema
         return {**get_status, **self.get_base_statuses(exclude=exclude)}
 
     def __call__(
@@ -1,3 +1,24 @@
+from sqlalchemy import ColumnElement, Select
+
+from src.base.enums import SelectivityEnum
+
+
 def get_filters(**filters) -> dict:
     """Get filters"""
     return filters
+
+
+class FilterPlanner:
+    """Flat filter plan: independent clauses on the base table applied in order of expected selectivity."""
+
+    def __init__(self) -> None:
+        self.clauses: list[tuple[SelectivityEnum, ColumnElement[bool]]] = []
+
+    def add(self, selectivity: SelectivityEnum, clause: ColumnElement[bool]) -> None:
+        """Add filter clause."""
+        self.clauses.append((selectivity, clause))
+
+    def apply(self, query: Select) -> Select:
+        """Apply clauses to the query in one WHERE."""
+        clauses = [clause for _, clause in sorted(self.clauses, key=lambda item: item[0])]
+        return query.where(*clauses) if clauses else query
@@ -1,9 +1,21 @@
+import hashlib
+from typing import Any
+
 from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError, CompileError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.exc import StaleDataError
 from starlette import status
 
 
+def get_upsert(session: AsyncSession, model: type) -> Any:
+    """Get dialect insert supporting ON CONFLICT."""
+    if session.bind.dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 def get_error_message(err: IntegrityError, conflict: bool = False) -> str:
     """Get error message."""
     *_, error_msg = f'{err.orig}'.split(':')
@@ -25,3 +37,16 @@ def handle_error(error: IntegrityError | CompileError | StaleDataError):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error_text)
     error_text = get_error_message(error, True)
     raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error_text)
+
+
+def get_etag(body: bytes) -> str:
+    """Get strong ETag of the response body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check If-None-Match header against the ETag by the weak comparison."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in tags or etag in tags
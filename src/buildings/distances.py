@@ -0,0 +1,96 @@
+from array import array
+from math import radians, sin, cos, atan2, sqrt
+from typing import Sequence
+
+from src.buildings.enums import ShapeEnum
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+EARTH_RADIUS_KM = 6371
+
+
+def take(values: array, indexes: Sequence[int]) -> Sequence[float]:
+    """Take values of the float64 array by indexes."""
+    if np is None:
+        return [values[index] for index in indexes]
+    if not indexes:
+        return np.empty(0, dtype=np.float64)
+    return np.frombuffer(values, dtype=np.float64)[np.asarray(indexes, dtype=np.intp)]
+
+
+def haversine_many(
+        center_lat: float, center_lon: float, latitudes: Sequence[float], longitudes: Sequence[float]
+) -> Sequence[float]:
+    """Calculate distances in km from the point to every pair of coordinates."""
+    center_lat, center_lon = float(center_lat), float(center_lon)
+    if np is None:
+        distances = []
+        for lat, lon in zip(latitudes, longitudes):
+            d_lat = radians(lat - center_lat)
+            d_lon = radians(lon - center_lon)
+            a = sin(d_lat / 2) ** 2 + cos(radians(center_lat)) * cos(radians(lat)) * sin(d_lon / 2) ** 2
+            distances.append(2 * EARTH_RADIUS_KM * atan2(sqrt(a), sqrt(1 - a)))
+        return distances
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    d_lat = np.radians(latitudes - center_lat)
+    d_lon = np.radians(longitudes - center_lon)
+    a = np.sin(d_lat / 2) ** 2 + cos(radians(center_lat)) * np.cos(np.radians(latitudes)) * np.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def zone_mask(
+        center_lat: float,
+        center_lon: float,
+        radius_km: float,
+        shape: ShapeEnum,
+        bounding_box: tuple[float, float, float, float],
+        latitudes: Sequence[float],
+        longitudes: Sequence[float]
+) -> Sequence[bool]:
+    """Get mask of coordinates inside the zone, the square may cross the antimeridian."""
+    min_lat, max_lat, min_lon, max_lon = (float(value) for value in bounding_box)
+    lon_span = max_lon - min_lon
+    if shape == ShapeEnum.circle:
+        distances = haversine_many(center_lat, center_lon, latitudes, longitudes)
+        if np is None:
+            return [distance <= radius_km for distance in distances]
+        return distances <= radius_km
+    if np is None:
+        return [
+            min_lat <= lat <= max_lat and (lon - min_lon) % 360 <= lon_span for lat, lon in zip(latitudes, longitudes)
+        ]
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    return (min_lat <= latitudes) & (latitudes <= max_lat) & (np.mod(longitudes - min_lon, 360) <= lon_span)
+
+
+def polygon_mask(
+        rings: list[list[tuple[float, float]]], latitudes: Sequence[float], longitudes: Sequence[float]
+) -> Sequence[bool]:
+    """Get mask of coordinates inside the polygon by the even-odd rule over all rings."""
+    edges = []
+    for ring in rings:
+        for index, (lon1, lat1) in enumerate(ring):
+            lon2, lat2 = ring[index - 1]
+            if lat1 != lat2:
+                edges.append((lon1, lat1, lon2, lat2))
+    if np is None:
+        mask = []
+        for lat, lon in zip(latitudes, longitudes):
+            inside = False
+            for lon1, lat1, lon2, lat2 in edges:
+                if (lat1 > lat) != (lat2 > lat) and lon < lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1):
+                    inside = not inside
+            mask.append(inside)
+        return mask
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    inside = np.zeros(latitudes.shape, dtype=bool)
+    for lon1, lat1, lon2, lat2 in edges:
+        crosses = (lat1 > latitudes) != (lat2 > latitudes)
+        inside ^= crosses & (longitudes < lon1 + (latitudes - lat1) * (lon2 - lon1) / (lat2 - lat1))
+    return inside
@@ -4,3 +4,9 @@ import enum
 class ShapeEnum(enum.Enum):
     circle = 'circle'
     square = 'square'
+    polygon = 'polygon'
+
+
+class GeoSearchModeEnum(enum.Enum):
+    memory = 'memory'
+    sql = 'sql'
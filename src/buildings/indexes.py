@@ -0,0 +1,167 @@
+import heapq
+from array import array
+from decimal import Decimal
+from math import floor, radians, cos, sin, asin
+from typing import Any, Iterator, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import BuildingDB
+from src.base.indexes import BaseMemoryIndex
+from src.buildings.distances import take, haversine_many, EARTH_RADIUS_KM
+
+
+class BuildingGridIndex(BaseMemoryIndex):
+    """In-memory spatial index of buildings bucketed into fixed latitude/longitude cells.
+
+    Coordinates are kept in contiguous float64 arrays, cells hold slots of these arrays.
+    """
+    version_name = 'buildings'
+
+    def __init__(self, cell_size: float = 0.05) -> None:
+        super().__init__()
+        self.cell_size: float = cell_size
+        self.clear()
+
+    def get_cell(self, latitude: Decimal | float, longitude: Decimal | float) -> tuple[int, int]:
+        """Get cell key of the coordinates."""
+        return floor(float(latitude) / self.cell_size), floor(float(longitude) / self.cell_size)
+
+    async def fetch(self, session: AsyncSession) -> Sequence[Any]:
+        """Fetch building coordinates."""
+        query = select(BuildingDB.uuid, BuildingDB.latitude, BuildingDB.longitude)
+        return list(await session.execute(query))
+
+    def build(self, rows: Sequence[Any]) -> None:
+        """Build index from building coordinates."""
+        for building_uuid, latitude, longitude in rows:
+            self._add(building_uuid, latitude, longitude)
+
+    def clear(self) -> None:
+        """Clear index data."""
+        self.slots: dict[UUID, int] = {}
+        self.uuids: list[UUID | None] = []
+        self.latitudes: array = array('d')
+        self.longitudes: array = array('d')
+        self.free_slots: list[int] = []
+        self.cells: dict[tuple[int, int], set[int]] = {}
+
+    def _add(self, building_uuid: UUID, latitude: Decimal | float, longitude: Decimal | float) -> None:
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.uuids[slot] = building_uuid
+            self.latitudes[slot] = float(latitude)
+            self.longitudes[slot] = float(longitude)
+        else:
+            slot = len(self.uuids)
+            self.uuids.append(building_uuid)
+            self.latitudes.append(float(latitude))
+            self.longitudes.append(float(longitude))
+        self.slots[building_uuid] = slot
+        self.cells.setdefault(self.get_cell(latitude, longitude), set()).add(slot)
+
+    def _remove(self, building_uuid: UUID) -> None:
+        slot = self.slots.pop(building_uuid, None)
+        if slot is None:
+            return
+        cell = self.get_cell(self.latitudes[slot], self.longitudes[slot])
+        self.cells[cell].discard(slot)
+        if not self.cells[cell]:
+            del self.cells[cell]
+        self.uuids[slot] = None
+        self.free_slots.append(slot)
+
+    def upsert(self, building: BuildingDB, version: int) -> None:
+        """Add or move building in the index."""
+        if self.touch(version):
+            self._remove(building.uuid)
+            self._add(building.uuid, building.latitude, building.longitude)
+
+    def remove(self, building_uuid: UUID, version: int) -> None:
+        """Remove building from the index."""
+        if self.touch(version):
+            self._remove(building_uuid)
+
+    def search(self, min_lat: Decimal, max_lat: Decimal, min_lon: Decimal, max_lon: Decimal) -> list[int]:
+        """Get slots of buildings from the cells intersecting the box, the result is a superset of the box.
+
+        The box should cover the whole zone and lie inside the longitude range, see get_search_boxes.
+        """
+        # One extra cell on every side absorbs rounding of coordinates at the box borders
+        min_row, min_col = self.get_cell(min_lat, min_lon)
+        max_row, max_col = self.get_cell(max_lat, max_lon)
+        min_row, min_col, max_row, max_col = min_row - 1, min_col - 1, max_row + 1, max_col + 1
+        result = []
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self.cells):
+            for (row, col), slots in self.cells.items():
+                if min_row <= row <= max_row and min_col <= col <= max_col:
+                    result.extend(slots)
+            return result
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                slots = self.cells.get((row, col))
+                if slots:
+                    result.extend(slots)
+        return result
+
+    def get_points(self, slots: list[int]) -> tuple[list[UUID], Sequence[float], Sequence[float]]:
+        """Get uuids, latitudes and longitudes of the slots."""
+        return [self.uuids[slot] for slot in slots], take(self.latitudes, slots), take(self.longitudes, slots)
+
+    def get_ring_cells(self, center_row: int, center_col: int, ring: int) -> list[tuple[int, int]]:
+        """Get cells on the border of the square ring around the center cell."""
+        if ring == 0:
+            return [(center_row, center_col)]
+        cells = []
+        for col in range(center_col - ring, center_col + ring + 1):
+            cells.append((center_row - ring, col))
+            cells.append((center_row + ring, col))
+        for row in range(center_row - ring + 1, center_row + ring):
+            cells.append((row, center_col - ring))
+            cells.append((row, center_col + ring))
+        return cells
+
+    def get_ring_distance(self, latitude: float, ring: int) -> float:
+        """Get distance in km guaranteed to be covered by rings up to the given one."""
+        angle = radians(ring * self.cell_size)
+        lat_distance = EARTH_RADIUS_KM * angle
+        lon_distance = EARTH_RADIUS_KM * asin(min(1.0, cos(radians(latitude)) * sin(min(angle, radians(90)))))
+        return min(lat_distance, lon_distance)
+
+    def iter_nearest(self, latitude: Decimal, longitude: Decimal) -> Iterator[list[tuple[UUID, float]]]:
+        """Yield batches of buildings with distances in km, ordered by distance across all batches."""
+        latitude, longitude = float(latitude), float(longitude)
+        center_row, center_col = self.get_cell(latitude, longitude)
+        visited: set[tuple[int, int]] = set()
+        heap: list[tuple[float, int, UUID]] = []
+        ring = 0
+        while len(visited) < len(self.cells):
+            ring_cells = self.get_ring_cells(center_row, center_col, ring)
+            if len(ring_cells) > len(self.cells) - len(visited):
+                # Sparse area: scanning the rest of occupied cells is cheaper than walking empty rings
+                ring_cells = [cell for cell in self.cells if cell not in visited]
+            slots = []
+            for cell in ring_cells:
+                if cell in self.cells:
+                    visited.add(cell)
+                    slots.extend(self.cells[cell])
+            if slots:
+                uuids, latitudes, longitudes = self.get_points(slots)
+                distances = haversine_many(latitude, longitude, latitudes, longitudes)
+                for slot, building_uuid, distance in zip(slots, uuids, distances):
+                    heapq.heappush(heap, (float(distance), slot, building_uuid))
+            covered = self.get_ring_distance(latitude, ring)
+            batch = []
+            while heap and heap[0][0] <= covered:
+                distance, _, building_uuid = heapq.heappop(heap)
+                batch.append((building_uuid, distance))
+            if batch:
+                yield batch
+            ring += 1
+        if heap:
+            yield [(building_uuid, distance) for distance, _, building_uuid in sorted(heap)]
+
+
+building_index = BuildingGridIndex()
@@ -1,9 +1,10 @@
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UniqueConstraint, Numeric
+from sqlalchemy import UniqueConstraint, Numeric, Index
 from sqlalchemy.orm import Mapped, relationship
 
+from src.base.functions import transaction_id
 from src.base.models import BaseDBModel, mc
 
 if TYPE_CHECKING:
@@ -13,10 +14,17 @@ if TYPE_CHECKING:
 class BuildingDB(BaseDBModel):
     """Building database model."""
     __tablename__: str = 'buildings'
-    __table_args__ = (UniqueConstraint('latitude', 'longitude', name='latitude_longitude_uc'),)
+    __table_args__ = (
+        UniqueConstraint('latitude', 'longitude', name='latitude_longitude_uc'),
+        Index('ix_buildings_longitude_latitude', 'longitude', 'latitude'),
+        Index('ix_buildings_update_date', 'update_date', 'uuid'),
+        Index('ix_buildings_change_id', 'change_id', 'uuid'),
+    )
 
     address: Mapped[str] = mc(nullable=False, unique=True)
     latitude: Mapped[Decimal] = mc(Numeric(14, 12), nullable=False)
     longitude: Mapped[Decimal] = mc(Numeric(15, 12), nullable=False)
+    organizations_count: Mapped[int] = mc(nullable=False, default=0, server_default='0')
+    change_id: Mapped[int] = mc(nullable=False, default=transaction_id(), onupdate=transaction_id())
 
     organizations: Mapped[list['OrganizationDB']] = relationship(back_populates='building')
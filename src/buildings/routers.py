@@ -1,3 +1,4 @@
+from datetime import datetime
 from decimal import Decimal
 from typing import Annotated
 from uuid import UUID
@@ -8,9 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from src.auth.auth import BaseAuth
-from src.base.paginators import PaginatePage
+from src.base.paginators import PaginatePage, CursorPaginatePage, apaginate_query
 from src.base.routers import FastAPIRouter
-from src.base.schemas import responses
+from src.base.schemas import responses, ChangesSchema
 from src.base.services import get_filters
 from src.buildings.enums import ShapeEnum
 from src.buildings.schemas import BuildingOutSchema, BuildingCreateSchema, BuildingListItemSchema, BuildingUpdateSchema
@@ -42,16 +43,7 @@ async def building_create(
     return result
 
 
-@building_router.get(
-    building_url.building_list,
-    response_model=PaginatePage[BuildingListItemSchema],
-    responses=responses(
-        PaginatePage[BuildingListItemSchema],
-        statuses=[status.HTTP_400_BAD_REQUEST]
-    ),
-    description='Building list',
-)
-async def building_list(
+async def get_building_filters(
         latitude: Annotated[
             Decimal, Query(description='Latitude of the point from which the calculation will be made')
         ] = None,
@@ -64,16 +56,75 @@ async def building_list(
         shape: Annotated[
             ShapeEnum, Query(description='Shape of the zone for which the calculation will be made')
         ] = ShapeEnum.circle,
+        polygon: Annotated[
+            str, Query(description='Polygon for the polygon shape in GeoJSON order: [[longitude, latitude], ...]')
+        ] = None,
+) -> dict:
+    """Building list filters."""
+    return get_filters(latitude=latitude, longitude=longitude, radius=radius, shape=shape, polygon=polygon)
+
+
+@building_router.get(
+    building_url.building_list,
+    response_model=PaginatePage[BuildingListItemSchema],
+    responses=responses(
+        PaginatePage[BuildingListItemSchema],
+        statuses=[status.HTTP_400_BAD_REQUEST]
+    ),
+    description='Building list',
+)
+async def building_list(
+        filters: dict = Depends(get_building_filters),
         session: AsyncSession = Depends(get_async_session),
         _: AsyncSession = Depends(BaseAuth())
 ) -> PaginatePage[BuildingListItemSchema]:
     """Building list."""
-    filters = get_filters(latitude=latitude, longitude=longitude, radius=radius, shape=shape)
+    buildings = await BuildingSession(session).building_list(**filters)
+    result = await apaginate_query(session, buildings)
+    return result
+
+
+@building_router.get(
+    building_url.building_list_cursor,
+    response_model=CursorPaginatePage[BuildingListItemSchema],
+    responses=responses(
+        CursorPaginatePage[BuildingListItemSchema],
+        statuses=[status.HTTP_400_BAD_REQUEST]
+    ),
+    description='Building list with cursor pagination ordered by address',
+)
+async def building_list_cursor(
+        filters: dict = Depends(get_building_filters),
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> CursorPaginatePage[BuildingListItemSchema]:
+    """Building list cursor."""
     buildings = await BuildingSession(session).building_list(**filters)
     result = await apaginate(session, buildings)
     return result
 
 
+@building_router.get(
+    building_url.building_changes,
+    response_model=ChangesSchema[BuildingOutSchema],
+    responses=responses(
+        ChangesSchema[BuildingOutSchema],
+        statuses=[status.HTTP_400_BAD_REQUEST]
+    ),
+    description='Buildings changed or deleted after the timestamp or the cursor in the order of changes',
+)
+async def building_changes(
+        since: Annotated[datetime, Query(description='Changes after the timestamp')] = None,
+        cursor: Annotated[str, Query(description='next_cursor of the previous response')] = None,
+        size: Annotated[int, Query(ge=1, le=1000, description='Number of changes')] = 100,
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> ChangesSchema[BuildingOutSchema]:
+    """Buildings changes."""
+    result = await BuildingSession(session).building_changes(since, cursor, size)
+    return result
+
+
 @building_router.get(
     building_url.building_detail,
     response_model=BuildingOutSchema,
@@ -19,6 +19,7 @@ class BuildingListItemSchema(BaseSchema):
     """Building list item schema"""
     uuid: UUID
     address: str
+    organizations_count: int
 
 
 class BuildingInSchema(BaseSchema):
@@ -1,37 +1,115 @@
 from decimal import Decimal
-from math import cos, radians
+from math import radians, sin, cos, pi
+from typing import Sequence
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import Select, select
+from sqlalchemy import Select, ColumnElement, and_, or_, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from src import BuildingDB
-from src.buildings.enums import ShapeEnum
-from src.organizations.utils import haversine, check_latitude, check_longitude
+from src.buildings.distances import zone_mask, polygon_mask, EARTH_RADIUS_KM
+from src.buildings.enums import ShapeEnum, GeoSearchModeEnum
+from src.buildings.indexes import building_index
+from src.config.settings import project_config
+from src.organizations.utils import check_latitude, check_longitude, get_bounding_box, parse_polygon, \
+    get_search_boxes, split_box
 
 
-def filter_buildings_in_radius(
-        center_lat: Decimal, center_lon: Decimal, radius_km: float, shape: ShapeEnum, buildings: list[BuildingDB]
+def filter_points_in_zone(
+        center_lat: Decimal,
+        center_lon: Decimal,
+        radius_km: float,
+        shape: ShapeEnum,
+        uuids: Sequence[UUID],
+        latitudes: Sequence[float],
+        longitudes: Sequence[float]
 ) -> list[UUID]:
-    """Filter buildings in radius."""
-    max_d_lat = Decimal(radius_km / 111.0)
-    max_d_lon = Decimal(radius_km / (111.0 * abs(cos(radians(center_lat)))))
-    min_lat = center_lat - max_d_lat
-    max_lat = center_lat + max_d_lat
-    min_lon = center_lon - max_d_lon
-    max_lon = center_lon + max_d_lon
-    result = []
-    for building in buildings:
-        lat, lon = building.latitude, building.longitude
-        if shape == ShapeEnum.circle:
-            if haversine(center_lat, center_lon, lat, lon) <= radius_km:
-                result.append(building.uuid)
-        elif shape == ShapeEnum.square:
-            if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
-                result.append(building.uuid)
-    return result
+    """Filter uuids of points in the zone in one vectorized pass."""
+    bounding_box = get_bounding_box(center_lat, center_lon, radius_km)
+    mask = zone_mask(center_lat, center_lon, radius_km, shape, bounding_box, latitudes, longitudes)
+    return [point_uuid for point_uuid, inside in zip(uuids, mask) if inside]
+
+
+async def get_buildings_in_boxes(
+        session: AsyncSession, boxes: list[tuple[Decimal, Decimal, Decimal, Decimal]]
+) -> tuple[list[UUID], Sequence[float], Sequence[float]]:
+    """Get uuids, latitudes and longitudes of candidate buildings for the boxes not overlapping each other."""
+    if project_config.app.GEO_SEARCH_MODE == GeoSearchModeEnum.sql:
+        query = (
+            select(BuildingDB.uuid, BuildingDB.latitude, BuildingDB.longitude)
+            .where(or_(*(get_box_clause(*box) for box in boxes)))
+        )
+        rows = list(await session.execute(query))
+        return (
+            [row.uuid for row in rows], [float(row.latitude) for row in rows], [float(row.longitude) for row in rows]
+        )
+    await building_index.ensure_loaded(session)
+    slots = []
+    for box in boxes:
+        slots.extend(building_index.search(*box))
+    return building_index.get_points(slots)
+
+
+def get_box_clause(min_lat: Decimal, max_lat: Decimal, min_lon: Decimal, max_lon: Decimal) -> ColumnElement[bool]:
+    """Get clause of buildings inside the box."""
+    return and_(BuildingDB.latitude.between(min_lat, max_lat), BuildingDB.longitude.between(min_lon, max_lon))
+
+
+def get_distance_clause(center_lat: Decimal, center_lon: Decimal, radius_km: float) -> ColumnElement[bool]:
+    """Get clause of buildings within the radius in km by the haversine formula without the arcsine."""
+    center_lat, center_lon = radians(center_lat), radians(center_lon)
+    latitude, longitude = func.radians(BuildingDB.latitude), func.radians(BuildingDB.longitude)
+    haversine = (
+        func.power(func.sin((latitude - center_lat) / 2), 2)
+        + cos(center_lat) * func.cos(latitude) * func.power(func.sin((longitude - center_lon) / 2), 2)
+    )
+    return haversine <= sin(min(radius_km / (2 * EARTH_RADIUS_KM), pi / 2)) ** 2
+
+
+async def get_buildings_in_polygon(session: AsyncSession, polygon: str | None) -> list[UUID]:
+    """Get uuids of buildings inside the polygon."""
+    if polygon is None:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, 'Field polygon should be specified for polygon shape')
+    rings = parse_polygon(polygon)
+    latitudes = [lat for lon, lat in rings[0]]
+    longitudes = [lon for lon, lat in rings[0]]
+    box = Decimal(min(latitudes)), Decimal(max(latitudes)), Decimal(min(longitudes)), Decimal(max(longitudes))
+    uuids, latitudes, longitudes = await get_buildings_in_boxes(session, [box])
+    mask = polygon_mask(rings, latitudes, longitudes)
+    return [building_uuid for building_uuid, inside in zip(uuids, mask) if inside]
+
+
+async def get_buildings_in_zone(
+        session: AsyncSession,
+        latitude: Decimal | None,
+        longitude: Decimal | None,
+        radius: float | None,
+        shape: ShapeEnum,
+        polygon: str | None = None
+) -> list[UUID] | Select | None:
+    """Get uuids or a query of uuids of buildings in the zone, None if the zone is not specified."""
+    if shape == ShapeEnum.polygon:
+        return await get_buildings_in_polygon(session, polygon)
+    if polygon is not None:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, 'Field polygon should be specified only for polygon shape')
+    if any([latitude, longitude, radius]) and not all([latitude, longitude, radius]):
+        detail = 'Fields latitude, longitude, radius should be specified together or not specified at all'
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
+    if not all([latitude, longitude, radius]):
+        return None
+    check_latitude(latitude)
+    check_longitude(longitude)
+    if project_config.app.GEO_SEARCH_MODE == GeoSearchModeEnum.sql:
+        if shape == ShapeEnum.square:
+            boxes = split_box(*get_bounding_box(latitude, longitude, radius))
+            return select(BuildingDB.uuid).where(or_(*(get_box_clause(*box) for box in boxes))).correlate(None)
+        boxes = get_search_boxes(latitude, longitude, radius)
+        clause = and_(or_(*(get_box_clause(*box) for box in boxes)), get_distance_clause(latitude, longitude, radius))
+        return select(BuildingDB.uuid).where(clause).correlate(None)
+    uuids, latitudes, longitudes = await get_buildings_in_boxes(session, get_search_boxes(latitude, longitude, radius))
+    return filter_points_in_zone(latitude, longitude, radius, shape, uuids, latitudes, longitudes)
 
 
 async def filter_buildings(
@@ -40,17 +118,11 @@ async def filter_buildings(
         latitude: Decimal | None,
         longitude: Decimal | None,
         radius: float | None,
-        shape: ShapeEnum
+        shape: ShapeEnum,
+        polygon: str | None
 ) -> Select:
     """Filter buildings."""
-    if any([latitude, longitude, radius]) and not all([latitude, longitude, radius]):
-        detail = 'Fields latitude, longitude, radius should be specified together or not specified at all'
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
-    if all([latitude, longitude, radius]):
-        check_latitude(latitude)
-        check_longitude(longitude)
-        building_query = select(BuildingDB)
-        res = list(await session.scalars(building_query))
-        filtered_buildings = filter_buildings_in_radius(latitude, longitude, radius, shape, res)
+    filtered_buildings = await get_buildings_in_zone(session, latitude, longitude, radius, shape, polygon)
+    if filtered_buildings is not None:
         query = query.where(BuildingDB.uuid.in_(filtered_buildings))
     return query
@@ -1,3 +1,4 @@
+from datetime import datetime
 from uuid import UUID
 
 from fastapi import HTTPException
@@ -6,10 +7,17 @@ from sqlalchemy.exc import IntegrityError
 from starlette import status
 
 from src import BuildingDB
+from src.base.changes import get_changes, add_tombstones
+from src.base.indexes import bump_indexes
+from src.base.loaders import get_schema_options
+from src.base.schemas import ChangesSchema
 from src.base.sessions import BaseSession
 from src.base.utils import handle_error
-from src.buildings.schemas import BuildingCreateSchema, BuildingOutSchema, BuildingUpdateSchema
+from src.buildings.indexes import building_index
+from src.buildings.schemas import BuildingCreateSchema, BuildingOutSchema, BuildingUpdateSchema, \
+    BuildingListItemSchema
 from src.buildings.services import filter_buildings
+from src.organizations.indexes import organization_detail_cache
 
 
 class BuildingSession(BaseSession):
@@ -22,21 +30,36 @@ class BuildingSession(BaseSession):
                 data = body.model_dump()
                 query = insert(BuildingDB).values(**data).returning(BuildingDB)
                 building = await self.session.scalar(query)
+                version = await building_index.bump(self.session)
         except IntegrityError as err:
             return handle_error(err)
+        building_index.upsert(building, version)
         return building
 
     async def building_list(self, **filters) -> Select:
         """Building list."""
-        query = select(BuildingDB)
+        query = (
+            select(BuildingDB)
+            .options(*get_schema_options(BuildingDB, BuildingListItemSchema))
+            .order_by(BuildingDB.address, BuildingDB.uuid)
+        )
         query = await filter_buildings(self.session, query, **filters)
         return query
 
+    async def building_changes(self, since: datetime | None, cursor: str | None, size: int) -> ChangesSchema:
+        """Building changes."""
+        async with self.session.begin():
+            return await get_changes(
+                self.session, BuildingDB, BuildingDB.__tablename__, since, cursor, size,
+                BuildingOutSchema.model_validate
+            )
+
     async def building_detail(self, building_uuid) -> BuildingDB | BuildingOutSchema:
         """Building detail."""
         async with self.session.begin():
             query = (
                 select(BuildingDB)
+                .options(*get_schema_options(BuildingDB, BuildingOutSchema))
                 .where(BuildingDB.uuid == building_uuid)
             )
             building = await self.session.scalar(query)
@@ -58,8 +81,14 @@ class BuildingSession(BaseSession):
                 building = await self.session.scalar(query)
                 if not building:
                     raise HTTPException(status.HTTP_404_NOT_FOUND, 'Building not found')
+                versions = await bump_indexes(self.session, building_index, organization_detail_cache)
+                await organization_detail_cache.add_invalidations(
+                    self.session, versions[organization_detail_cache], [building_uuid]
+                )
         except IntegrityError as err:
             return handle_error(err)
+        building_index.upsert(building, versions[building_index])
+        organization_detail_cache.remove_building(building.uuid, versions[organization_detail_cache])
         return building
 
     async def building_delete(self, building_uuid: UUID) -> None:
@@ -74,5 +103,12 @@ class BuildingSession(BaseSession):
                 building = await self.session.scalar(query)
                 if not building:
                     raise HTTPException(status.HTTP_404_NOT_FOUND, 'Building not found')
+                await add_tombstones(self.session, BuildingDB.__tablename__, [building_uuid])
+                versions = await bump_indexes(self.session, building_index, organization_detail_cache)
+                await organization_detail_cache.add_invalidations(
+                    self.session, versions[organization_detail_cache], [building_uuid]
+                )
         except IntegrityError as err:
             return handle_error(err)
+        building_index.remove(building_uuid, versions[building_index])
+        organization_detail_cache.remove_building(building_uuid, versions[organization_detail_cache])
@@ -10,6 +10,8 @@ class BuildingURL(BaseURL):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.building_list: str = '/'
+        self.building_list_cursor: str = '/cursor/'
+        self.building_changes: str = '/changes/'
         self.building_create: str = '/'
         self.building_detail: str = '/{building_uuid}/'
         self.building_update: str = '/{building_uuid}/'
@@ -3,6 +3,8 @@ from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.buildings.enums import GeoSearchModeEnum
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 env_file = os.path.join(BASE_DIR, '.env')
 
@@ -20,6 +22,14 @@ class AppSettings(EnvSettings):
     """App settings."""
     DEBUG: bool = False
     STATIC_TOKEN: str = ''
+    GEO_SEARCH_MODE: GeoSearchModeEnum = GeoSearchModeEnum.memory
+    COUNT_CACHE_TTL: int = 60
+    COUNT_CACHE_SIZE: int = 1024
+    IMPORT_CHUNK_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 100
+    EXPORT_CHUNK_SIZE: int = 1000
+    ORGANIZATION_CACHE_SIZE: int = 10000
+    CACHE_VERSION_CHECK_INTERVAL: float = 1.0
 
 
 class DatabaseSettings(EnvSettings):
@@ -0,0 +1,19 @@
+import argparse
+import asyncio
+
+from src.config.session import async_session_maker
+from src.counters.sessions import CounterSession
+
+
+async def main() -> None:
+    """Reconcile organization counters of buildings and activities: python -m src.counters."""
+    parser = argparse.ArgumentParser(description='Recompute organization counters and report the drift')
+    parser.add_argument('--dry-run', action='store_true', help='Only report the drift')
+    args = parser.parse_args()
+    async with async_session_maker() as session:
+        result = await CounterSession(session).reconcile(fix=not args.dry_run)
+    print(result.model_dump_json(indent=2))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,17 @@
+from uuid import UUID
+
+from src.base.schemas import BaseSchema
+
+
+class CounterDriftSchema(BaseSchema):
+    """Counter drift schema."""
+    uuid: UUID
+    stored: int
+    actual: int
+
+
+class ReconcileResultSchema(BaseSchema):
+    """Counters reconciliation result schema."""
+    fixed: bool
+    buildings: list[CounterDriftSchema]
+    activities: list[CounterDriftSchema]
@@ -0,0 +1,132 @@
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import ScalarSelect, select, update, func, distinct, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src import ActivityClosureDB, ActivityDB, BuildingDB, OrganizationActivityDB, OrganizationDB
+from src.counters.schemas import CounterDriftSchema
+
+OrganizationChange = tuple[UUID | None, UUID | None, set[UUID], set[UUID]]
+
+
+def get_building_count() -> ScalarSelect:
+    """Get correlated count of organizations in the building."""
+    return (
+        select(func.count(OrganizationDB.uuid))
+        .where(OrganizationDB.building_uuid == BuildingDB.uuid)
+        .scalar_subquery()
+    )
+
+
+def get_activity_count() -> ScalarSelect:
+    """Get correlated count of distinct organizations of the activity with its descendants."""
+    return (
+        select(func.count(distinct(OrganizationActivityDB.organization_uuid)))
+        .join(ActivityClosureDB, ActivityClosureDB.descendant_uuid == OrganizationActivityDB.activity_uuid)
+        .where(ActivityClosureDB.ancestor_uuid == ActivityDB.uuid)
+        .scalar_subquery()
+    )
+
+
+async def add_counter_deltas(session: AsyncSession, column: InstrumentedAttribute, deltas: dict[UUID, int]) -> None:
+    """Add deltas to the counter column in one UPDATE, so concurrent writes never lock the rows in crossed order.
+
+    Records are grouped by delta value to keep the CASE short for bulk changes, update_date and change_id are kept.
+    """
+    model = column.class_
+    uuids_by_delta: dict[int, list[UUID]] = {}
+    for record_uuid, delta in deltas.items():
+        if delta:
+            uuids_by_delta.setdefault(delta, []).append(record_uuid)
+    if not uuids_by_delta:
+        return
+    delta = case(*((model.uuid.in_(uuids), delta) for delta, uuids in uuids_by_delta.items()), else_=0)
+    query = (
+        update(model)
+        .where(model.uuid.in_([record_uuid for uuids in uuids_by_delta.values() for record_uuid in uuids]))
+        .values({column.key: column + delta, 'update_date': model.update_date, 'change_id': model.change_id})
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(query)
+
+
+async def get_activity_ancestors(session: AsyncSession, activity_uuids: Iterable[UUID]) -> dict[UUID, set[UUID]]:
+    """Get ancestors of the activities including the activities themselves."""
+    query = (
+        select(ActivityClosureDB.descendant_uuid, ActivityClosureDB.ancestor_uuid)
+        .where(ActivityClosureDB.descendant_uuid.in_(set(activity_uuids)))
+    )
+    ancestors: dict[UUID, set[UUID]] = {}
+    for activity_uuid, ancestor_uuid in await session.execute(query):
+        ancestors.setdefault(activity_uuid, set()).add(ancestor_uuid)
+    return ancestors
+
+
+async def update_organization_counters(session: AsyncSession, changes: list[OrganizationChange]) -> dict[UUID, int]:
+    """Update building and activity subtree counters by organization changes, get activity deltas.
+
+    Every change is a building before and after and activities before and after, None and empty sets stand
+    for a created or deleted organization.
+    """
+    building_deltas: dict[UUID, int] = {}
+    for building_before, building_after, _, _ in changes:
+        if building_before != building_after:
+            if building_before is not None:
+                building_deltas[building_before] = building_deltas.get(building_before, 0) - 1
+            if building_after is not None:
+                building_deltas[building_after] = building_deltas.get(building_after, 0) + 1
+    activity_deltas: dict[UUID, int] = {}
+    changed = [(before, after) for _, _, before, after in changes if before != after]
+    if changed:
+        ancestors = await get_activity_ancestors(
+            session, (a for before, after in changed for a in before | after)
+        )
+        for before, after in changed:
+            ancestors_before = set().union(*(ancestors.get(a, ()) for a in before))
+            ancestors_after = set().union(*(ancestors.get(a, ()) for a in after))
+            for ancestor_uuid in ancestors_after - ancestors_before:
+                activity_deltas[ancestor_uuid] = activity_deltas.get(ancestor_uuid, 0) + 1
+            for ancestor_uuid in ancestors_before - ancestors_after:
+                activity_deltas[ancestor_uuid] = activity_deltas.get(ancestor_uuid, 0) - 1
+    await add_counter_deltas(session, BuildingDB.organizations_count, building_deltas)
+    await add_counter_deltas(session, ActivityDB.organizations_count, activity_deltas)
+    return {activity_uuid: delta for activity_uuid, delta in activity_deltas.items() if delta}
+
+
+async def recount_activities(session: AsyncSession, activity_uuids: Iterable[UUID]) -> None:
+    """Recount subtree counters of the activities."""
+    query = (
+        update(ActivityDB)
+        .where(ActivityDB.uuid.in_(set(activity_uuids)))
+        .values(
+            organizations_count=get_activity_count(),
+            update_date=ActivityDB.update_date,
+            change_id=ActivityDB.change_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(query)
+
+
+async def reconcile_counters(
+        session: AsyncSession, counter: InstrumentedAttribute, actual: ScalarSelect, fix: bool
+) -> list[CounterDriftSchema]:
+    """Find counters differing from the actual counts and recompute them in bulk if fix is set."""
+    model = counter.class_
+    actual = actual.label('actual')
+    query = select(model.uuid, counter, actual).where(counter != actual).order_by(model.uuid)
+    drifts = [
+        CounterDriftSchema(uuid=record_uuid, stored=stored, actual=actual_count)
+        for record_uuid, stored, actual_count in await session.execute(query)
+    ]
+    if fix and drifts:
+        query = (
+            update(model)
+            .where(model.uuid.in_([drift.uuid for drift in drifts]))
+            .values({counter.key: actual.element, 'update_date': model.update_date, 'change_id': model.change_id})
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(query)
+    return drifts
@@ -0,0 +1,25 @@
+from src import ActivityDB, BuildingDB
+from src.activities.indexes import activity_count_index
+from src.base.sessions import BaseSession
+from src.counters.schemas import ReconcileResultSchema
+from src.counters.services import reconcile_counters, get_building_count, get_activity_count
+
+
+class CounterSession(BaseSession):
+    """Counter session."""
+
+    async def reconcile(self, fix: bool = True) -> ReconcileResultSchema:
+        """Compare organization counters of buildings and activities with the actual counts and fix the drift."""
+        async with self.session.begin():
+            buildings = await reconcile_counters(
+                self.session, BuildingDB.organizations_count, get_building_count(), fix
+            )
+            activities = await reconcile_counters(
+                self.session, ActivityDB.organizations_count, get_activity_count(), fix
+            )
+            if fix and activities:
+                version = await activity_count_index.bump(self.session)
+        if fix and activities:
+            activity_count_index.touch(version)
+            activity_count_index.reset()
+        return ReconcileResultSchema(fixed=fix, buildings=buildings, activities=activities)
@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+from src.config.session import async_session_maker
+from src.imports.enums import ImportEntityEnum, ImportFormatEnum
+from src.imports.sessions import ImportSession
+
+FILE_FORMATS = {
+    '.ndjson': ImportFormatEnum.ndjson,
+    '.jsonl': ImportFormatEnum.ndjson,
+    '.csv': ImportFormatEnum.csv,
+}
+
+
+async def iter_file(path: Path, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    """Read file by chunks."""
+    with path.open('rb') as file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+async def main() -> None:
+    """Import rows from the NDJSON or CSV file: python -m src.imports buildings buildings.ndjson."""
+    parser = argparse.ArgumentParser(description='Import NDJSON or CSV file')
+    parser.add_argument('entity', choices=[entity.value for entity in ImportEntityEnum])
+    parser.add_argument('path', type=Path)
+    parser.add_argument('--format', choices=[file_format.value for file_format in ImportFormatEnum])
+    args = parser.parse_args()
+    file_format = FILE_FORMATS.get(args.path.suffix.lower(), ImportFormatEnum.ndjson)
+    if args.format:
+        file_format = ImportFormatEnum(args.format)
+    async with async_session_maker() as session:
+        result = await ImportSession(session).import_rows(
+            ImportEntityEnum(args.entity), file_format, iter_file(args.path)
+        )
+    print(result.model_dump_json(indent=2))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
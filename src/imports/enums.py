@@ -0,0 +1,12 @@
+import enum
+
+
+class ImportEntityEnum(enum.Enum):
+    buildings = 'buildings'
+    activities = 'activities'
+    organizations = 'organizations'
+
+
+class ImportFormatEnum(enum.Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
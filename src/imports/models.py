@@ -0,0 +1,48 @@
+import sqlalchemy
+from sqlalchemy import Table, Column, MetaData, BIGINT, String, Numeric
+
+staging_metadata = MetaData()
+
+
+def staging_table(name: str, *columns: Column) -> Table:
+    """Temporary table the import rows are copied into before merging, line is the source line number."""
+    return Table(
+        name, staging_metadata, Column('line', BIGINT, nullable=False, index=True), *columns,
+        prefixes=['TEMPORARY'], postgresql_on_commit='DROP'
+    )
+
+
+buildings_staging = staging_table(
+    'import_buildings',
+    Column('uuid', sqlalchemy.UUID(), nullable=False, index=True),
+    Column('address', String(), nullable=False),
+    Column('latitude', Numeric(14, 12), nullable=False),
+    Column('longitude', Numeric(15, 12), nullable=False),
+)
+
+activities_staging = staging_table(
+    'import_activities',
+    Column('uuid', sqlalchemy.UUID(), nullable=False, index=True),
+    Column('name', String(), nullable=False),
+    Column('parent_uuid', sqlalchemy.UUID(), nullable=True),
+)
+
+organizations_staging = staging_table(
+    'import_organizations',
+    Column('uuid', sqlalchemy.UUID(), nullable=False, index=True),
+    Column('name', String(), nullable=False),
+    Column('building_uuid', sqlalchemy.UUID(), nullable=False),
+)
+
+phones_staging = staging_table(
+    'import_phones',
+    Column('uuid', sqlalchemy.UUID(), nullable=False),
+    Column('organization_uuid', sqlalchemy.UUID(), nullable=False),
+    Column('phone', String(), nullable=False),
+)
+
+organizations_activities_staging = staging_table(
+    'import_organizations_activities',
+    Column('organization_uuid', sqlalchemy.UUID(), nullable=False),
+    Column('activity_uuid', sqlalchemy.UUID(), nullable=False),
+)
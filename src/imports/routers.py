@@ -0,0 +1,48 @@
+from typing import Annotated
+
+from fastapi import Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from src.auth.auth import BaseAuth
+from src.base.routers import FastAPIRouter
+from src.base.schemas import responses
+from src.config.session import get_async_session
+from src.imports.enums import ImportEntityEnum, ImportFormatEnum
+from src.imports.schemas import ImportResultSchema
+from src.imports.sessions import ImportSession
+from src.imports.urls import import_url
+
+import_router = FastAPIRouter()
+
+
+@import_router.post(
+    import_url.import_create,
+    response_model=ImportResultSchema,
+    responses=responses(
+        ImportResultSchema,
+        statuses=[status.HTTP_400_BAD_REQUEST, status.HTTP_404_NOT_FOUND, status.HTTP_409_CONFLICT]
+    ),
+    description='Import of rows from the streamed NDJSON or CSV request body, rows are upserted by uuid',
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'application/x-ndjson': {'schema': {'type': 'string'}},
+                'text/csv': {'schema': {'type': 'string'}},
+            },
+        },
+    },
+)
+async def import_create(
+        entity: ImportEntityEnum,
+        request: Request,
+        file_format: Annotated[
+            ImportFormatEnum, Query(alias='format', description='Format of the request body')
+        ] = ImportFormatEnum.ndjson,
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> ImportResultSchema:
+    """Import create."""
+    result = await ImportSession(session).import_rows(entity, file_format, request.stream())
+    return result
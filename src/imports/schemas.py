@@ -0,0 +1,40 @@
+from uuid import UUID
+
+from src.activities.schemas import ActivityCreateSchema
+from src.base.schemas import BaseSchema
+from src.buildings.schemas import BuildingCreateSchema
+from src.imports.enums import ImportEntityEnum
+from src.organizations.schemas import OrganizationCreateSchema
+
+
+class BuildingImportSchema(BuildingCreateSchema):
+    """Building import row schema."""
+    uuid: UUID
+
+
+class ActivityImportSchema(ActivityCreateSchema):
+    """Activity import row schema."""
+    uuid: UUID
+
+
+class OrganizationImportSchema(OrganizationCreateSchema):
+    """Organization import row schema."""
+    uuid: UUID
+
+
+class ImportErrorSchema(BaseSchema):
+    """Import row error schema."""
+    line: int
+    message: str
+
+
+class ImportResultSchema(BaseSchema):
+    """Import result schema."""
+    entity: ImportEntityEnum
+    received: int
+    invalid: int
+    merged: int
+    skipped: int
+    rejected_phones: int
+    rejected_activities: int
+    errors: list[ImportErrorSchema]
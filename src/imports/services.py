@@ -0,0 +1,284 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Iterable, Any
+
+from fastapi import HTTPException
+from pydantic import ValidationError, BaseModel
+from sqlalchemy import Select, Table, select, exists, and_, or_, delete, func, insert, true, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.schema import CreateTable, DropTable, CreateIndex
+from starlette import status
+
+from src import BuildingDB, ActivityDB, OrganizationDB, PhoneDB, OrganizationActivityDB, ActivityClosureDB
+from src.base.functions import transaction_id
+from src.base.utils import get_upsert
+from src.imports.enums import ImportFormatEnum
+from src.imports.schemas import ImportErrorSchema
+
+LIST_SEPARATOR = ';'
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split stream of byte chunks into text lines without reading the whole stream."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer.rstrip('\r')
+
+
+async def iter_rows(
+        chunks: AsyncIterator[bytes], file_format: ImportFormatEnum
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield line number with the parsed row or the parse error, CSV list cells are separated by semicolons."""
+    header = None
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        if file_format == ImportFormatEnum.ndjson:
+            try:
+                row = json.loads(line)
+            except ValueError as err:
+                yield line_number, None, f'Invalid JSON: {err}'
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, 'Row should be a JSON object'
+                continue
+            yield line_number, row, None
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = values
+            continue
+        if len(values) != len(header):
+            yield line_number, None, f'Row should have {len(header)} columns'
+            continue
+        row = dict(zip(header, values))
+        for key in ('phones', 'activity_uuids'):
+            if key in row:
+                row[key] = [value for value in row[key].split(LIST_SEPARATOR) if value]
+        if row.get('parent_uuid') == '':
+            row['parent_uuid'] = None
+        yield line_number, row, None
+
+
+def validate_row(schema: type[BaseModel], row: dict) -> tuple[BaseModel | None, str | None]:
+    """Validate import row, schema validators raise both validation and HTTP errors."""
+    try:
+        return schema.model_validate(row), None
+    except ValidationError as err:
+        return None, '; '.join(f'{".".join(map(str, e["loc"]))}: {e["msg"]}' for e in err.errors())
+    except HTTPException as err:
+        if isinstance(err.detail, list):
+            return None, '; '.join(f'{e["field"]}: {e["message"]}' for e in err.detail)
+        return None, f'{err.detail}'
+
+
+async def create_staging_tables(session: AsyncSession, tables: Iterable[Table]) -> None:
+    """Create temporary staging tables, indexes are created after loading."""
+    for table in tables:
+        await session.execute(CreateTable(table))
+
+
+async def drop_staging_tables(session: AsyncSession, tables: Iterable[Table]) -> None:
+    """Drop temporary staging tables."""
+    for table in tables:
+        await session.execute(DropTable(table))
+
+
+async def index_staging_tables(session: AsyncSession, tables: Iterable[Table]) -> None:
+    """Create indexes of the loaded staging tables."""
+    for table in tables:
+        for index in table.indexes:
+            await session.execute(CreateIndex(index))
+
+
+async def copy_rows(session: AsyncSession, table: Table, rows: list[dict[str, Any]]) -> None:
+    """Load rows into the staging table by COPY on asyncpg, by multi-row insert on other drivers."""
+    if not rows:
+        return
+    connection = await session.connection()
+    if connection.dialect.driver == 'asyncpg':
+        raw_connection = await connection.get_raw_connection()
+        columns = [column.name for column in table.columns]
+        records = [tuple(row[column] for column in columns) for row in rows]
+        await raw_connection.driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+        return
+    await session.execute(insert(table), rows)
+
+
+def is_latest(staging: Table, *columns: str) -> Any:
+    """Condition of the staging row not overridden by a later row with the same value of any column."""
+    later = aliased(staging)
+    return ~exists().where(
+        later.c.line > staging.c.line,
+        or_(*(later.c[column] == staging.c[column] for column in columns))
+    )
+
+
+def is_free(model: type, staging: Table, *columns: str) -> Any:
+    """Condition of the unique values of the staging row not taken by another database row."""
+    return ~exists().where(
+        model.uuid != staging.c.uuid,
+        or_(*(getattr(model, column) == staging.c[column] for column in columns))
+    )
+
+
+async def upsert_rows(session: AsyncSession, model: type, staging: Table, columns: list[str], accepted: Any) -> int:
+    """Insert or update database rows by uuid from the accepted staging rows."""
+    rows = select(staging.c.uuid, *(staging.c[column] for column in columns)).where(accepted)
+    query = get_upsert(session, model).from_select(['uuid', *columns], rows)
+    query = query.on_conflict_do_update(
+        index_elements=['uuid'],
+        set_={
+            **{column: query.excluded[column] for column in columns},
+            'update_date': func.now(), 'change_id': transaction_id(),
+        }
+    )
+    result = await session.execute(query)
+    return result.rowcount
+
+
+async def merge_buildings(session: AsyncSession, staging: Table) -> int:
+    """Merge staged buildings."""
+    accepted = and_(
+        is_latest(staging, 'uuid', 'address'),
+        is_free(BuildingDB, staging, 'address'),
+        ~exists().where(
+            BuildingDB.uuid != staging.c.uuid,
+            BuildingDB.latitude == staging.c.latitude,
+            BuildingDB.longitude == staging.c.longitude
+        ),
+    )
+    return await upsert_rows(session, BuildingDB, staging, ['address', 'latitude', 'longitude'], accepted)
+
+
+async def merge_activities(session: AsyncSession, staging: Table) -> int:
+    """Merge staged activities and rebuild the closure table."""
+    parent = aliased(staging)
+    accepted = and_(
+        is_latest(staging, 'uuid', 'name'),
+        is_free(ActivityDB, staging, 'name'),
+        or_(
+            staging.c.parent_uuid.is_(None),
+            exists().where(ActivityDB.uuid == staging.c.parent_uuid),
+            exists().where(parent.c.uuid == staging.c.parent_uuid),
+        ),
+    )
+    merged = await upsert_rows(session, ActivityDB, staging, ['name', 'parent_uuid'], accepted)
+    await rebuild_activity_closure(session)
+    depth = await session.scalar(select(func.max(ActivityClosureDB.depth)))
+    if depth is not None and depth > 2:
+        detail = 'Not possible to choice parent activity with third level depth'
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
+    return merged
+
+
+async def rebuild_activity_closure(session: AsyncSession) -> None:
+    """Rebuild the activity closure table, walking stops below the allowed depth so cycles terminate."""
+    tree = select(
+        ActivityDB.uuid.label('ancestor_uuid'), ActivityDB.uuid.label('descendant_uuid'), literal(0).label('depth')
+    ).cte('tree', recursive=True)
+    tree = tree.union_all(
+        select(tree.c.ancestor_uuid, ActivityDB.uuid, tree.c.depth + 1)
+        .join(ActivityDB, ActivityDB.parent_uuid == tree.c.descendant_uuid)
+        .where(tree.c.depth < 3)
+    )
+    await session.execute(delete(ActivityClosureDB))
+    query = (
+        insert(ActivityClosureDB)
+        .from_select(['ancestor_uuid', 'descendant_uuid', 'depth'], select(tree))
+    )
+    await session.execute(query)
+
+
+async def merge_organizations(
+        session: AsyncSession, staging: Table, phones_staging: Table, activities_staging: Table
+) -> int:
+    """Merge staged organizations replacing their phones and activities.
+
+    A phone goes to the latest organization row claiming it among the rows passing the organization checks and only
+    if no other organization keeps it, an organization is merged only with at least one phone.
+    """
+    checked = and_(
+        is_latest(staging, 'uuid', 'name'),
+        is_free(OrganizationDB, staging, 'name'),
+        exists().where(BuildingDB.uuid == staging.c.building_uuid),
+    )
+    checked_rows = select(staging.c.line, staging.c.uuid).where(checked).subquery()
+    later = aliased(phones_staging)
+    phone_accepted = and_(
+        phones_staging.c.line.in_(select(checked_rows.c.line)),
+        ~exists().where(
+            later.c.line > phones_staging.c.line,
+            later.c.phone == phones_staging.c.phone,
+            later.c.line.in_(select(checked_rows.c.line)),
+        ),
+        ~exists().where(
+            PhoneDB.phone == phones_staging.c.phone,
+            PhoneDB.organization_uuid.not_in(select(checked_rows.c.uuid)),
+        ),
+    )
+    accepted = and_(checked, exists().where(phones_staging.c.line == staging.c.line, phone_accepted))
+    merged = await upsert_rows(session, OrganizationDB, staging, ['name', 'building_uuid'], accepted)
+    accepted_rows = select(staging.c.line, staging.c.uuid).where(accepted).subquery()
+    accepted_uuids = select(accepted_rows.c.uuid)
+    await session.execute(delete(PhoneDB).where(PhoneDB.organization_uuid.in_(accepted_uuids)))
+    await session.execute(
+        delete(OrganizationActivityDB).where(OrganizationActivityDB.organization_uuid.in_(accepted_uuids))
+    )
+    phones = (
+        select(phones_staging.c.uuid, phones_staging.c.organization_uuid, phones_staging.c.phone)
+        .where(phone_accepted)
+    )
+    query = get_upsert(session, PhoneDB).from_select(['uuid', 'organization_uuid', 'phone'], phones)
+    await session.execute(query.on_conflict_do_nothing())
+    activities = (
+        select(activities_staging.c.organization_uuid, activities_staging.c.activity_uuid)
+        .join(accepted_rows, accepted_rows.c.line == activities_staging.c.line)
+        .join(ActivityDB, ActivityDB.uuid == activities_staging.c.activity_uuid)
+        .where(true())
+    )
+    query = get_upsert(session, OrganizationActivityDB).from_select(['organization_uuid', 'activity_uuid'], activities)
+    await session.execute(query.on_conflict_do_nothing())
+    return merged
+
+
+async def get_rejected_rows(
+        session: AsyncSession, query: Select, message: str, limit: int
+) -> tuple[int, list[ImportErrorSchema]]:
+    """Get count of the rejected staging rows selected as line and value with errors of the first of them."""
+    count = await session.scalar(select(func.count()).select_from(query.subquery()))
+    rows = await session.execute(query.order_by(query.selected_columns[0]).limit(limit))
+    return count, [ImportErrorSchema(line=line, message=message.format(value)) for line, value in rows]
+
+
+async def get_rejected_links(
+        session: AsyncSession, phones_staging: Table, activities_staging: Table, limit: int
+) -> tuple[int, int, list[ImportErrorSchema]]:
+    """Get counts and errors of phones and activities dropped from the merged organizations."""
+    merged_lines = select(phones_staging.c.line).join(PhoneDB, PhoneDB.uuid == phones_staging.c.uuid)
+    query = select(phones_staging.c.line, phones_staging.c.phone).where(
+        phones_staging.c.line.in_(merged_lines),
+        ~exists().where(PhoneDB.uuid == phones_staging.c.uuid),
+    )
+    rejected_phones, phone_errors = await get_rejected_rows(
+        session, query, 'phones: Phone {} already exists', limit
+    )
+    query = select(activities_staging.c.line, activities_staging.c.activity_uuid).where(
+        activities_staging.c.line.in_(merged_lines),
+        ~exists().where(ActivityDB.uuid == activities_staging.c.activity_uuid),
+    )
+    rejected_activities, activity_errors = await get_rejected_rows(
+        session, query, 'activity_uuids: Activity {} not found', limit
+    )
+    return rejected_phones, rejected_activities, phone_errors + activity_errors
@@ -0,0 +1,131 @@
+from typing import AsyncIterator
+from uuid import uuid4
+
+from pydantic import BaseModel
+from sqlalchemy import Table
+from sqlalchemy.exc import IntegrityError
+
+from src import ActivityDB, BuildingDB
+from src.activities.indexes import activity_tree, activity_name_index, activity_count_index
+from src.base.indexes import bump_indexes, reload_indexes
+from src.base.sessions import BaseSession
+from src.base.utils import handle_error
+from src.buildings.indexes import building_index
+from src.config.settings import project_config
+from src.counters.services import reconcile_counters, get_building_count, get_activity_count
+from src.imports.enums import ImportEntityEnum, ImportFormatEnum
+from src.imports.models import buildings_staging, activities_staging, organizations_staging, phones_staging, \
+    organizations_activities_staging
+from src.imports.schemas import ImportResultSchema, ImportErrorSchema, BuildingImportSchema, ActivityImportSchema, \
+    OrganizationImportSchema
+from src.organizations.indexes import organization_detail_cache, organization_name_index, \
+    organization_bitmap_index
+from src.imports.services import iter_rows, validate_row, create_staging_tables, drop_staging_tables, \
+    index_staging_tables, copy_rows, merge_buildings, merge_activities, merge_organizations, get_rejected_links
+
+IMPORT_SCHEMAS: dict[ImportEntityEnum, type[BaseModel]] = {
+    ImportEntityEnum.buildings: BuildingImportSchema,
+    ImportEntityEnum.activities: ActivityImportSchema,
+    ImportEntityEnum.organizations: OrganizationImportSchema,
+}
+
+IMPORT_TABLES: dict[ImportEntityEnum, list[Table]] = {
+    ImportEntityEnum.buildings: [buildings_staging],
+    ImportEntityEnum.activities: [activities_staging],
+    ImportEntityEnum.organizations: [organizations_staging, phones_staging, organizations_activities_staging],
+}
+
+
+def get_staging_rows(entity: ImportEntityEnum, line: int, row: BaseModel) -> dict[Table, list[dict]]:
+    """Get staging rows of the validated import row."""
+    if entity == ImportEntityEnum.buildings:
+        return {buildings_staging: [{'line': line, **row.model_dump()}]}
+    if entity == ImportEntityEnum.activities:
+        return {activities_staging: [{'line': line, **row.model_dump()}]}
+    return {
+        organizations_staging: [
+            {'line': line, 'uuid': row.uuid, 'name': row.name, 'building_uuid': row.building_uuid}
+        ],
+        phones_staging: [
+            {'line': line, 'uuid': uuid4(), 'organization_uuid': row.uuid, 'phone': phone} for phone in row.phones
+        ],
+        organizations_activities_staging: [
+            {'line': line, 'organization_uuid': row.uuid, 'activity_uuid': activity_uuid}
+            for activity_uuid in row.activity_uuids
+        ],
+    }
+
+
+class ImportSession(BaseSession):
+    """Import session."""
+
+    async def import_rows(
+            self, entity: ImportEntityEnum, file_format: ImportFormatEnum, chunks: AsyncIterator[bytes]
+    ) -> ImportResultSchema | None:
+        """Import streamed rows in chunks through staging tables in one transaction."""
+        schema = IMPORT_SCHEMAS[entity]
+        tables = IMPORT_TABLES[entity]
+        chunk_size = project_config.app.IMPORT_CHUNK_SIZE
+        received, invalid, errors = 0, 0, []
+        rejected_phones, rejected_activities = 0, 0
+        try:
+            async with self.session.begin():
+                await create_staging_tables(self.session, tables)
+                staged: dict[Table, list[dict]] = {table: [] for table in tables}
+                staged_count = 0
+                async for line, row, error in iter_rows(chunks, file_format):
+                    received += 1
+                    if row is not None:
+                        row, error = validate_row(schema, row)
+                    if error is not None:
+                        invalid += 1
+                        if len(errors) < project_config.app.IMPORT_MAX_ERRORS:
+                            errors.append(ImportErrorSchema(line=line, message=error))
+                        continue
+                    for table, rows in get_staging_rows(entity, line, row).items():
+                        staged[table].extend(rows)
+                    staged_count += 1
+                    if staged_count >= chunk_size:
+                        for table, rows in staged.items():
+                            await copy_rows(self.session, table, rows)
+                            rows.clear()
+                        staged_count = 0
+                for table, rows in staged.items():
+                    await copy_rows(self.session, table, rows)
+                await index_staging_tables(self.session, tables)
+                if entity == ImportEntityEnum.buildings:
+                    merged = await merge_buildings(self.session, buildings_staging)
+                    indexes = [building_index]
+                elif entity == ImportEntityEnum.activities:
+                    merged = await merge_activities(self.session, activities_staging)
+                    await reconcile_counters(self.session, ActivityDB.organizations_count, get_activity_count(), True)
+                    indexes = [activity_tree, activity_count_index, activity_name_index, organization_bitmap_index]
+                else:
+                    merged = await merge_organizations(
+                        self.session, organizations_staging, phones_staging, organizations_activities_staging
+                    )
+                    rejected_phones, rejected_activities, rejections = await get_rejected_links(
+                        self.session, phones_staging, organizations_activities_staging,
+                        project_config.app.IMPORT_MAX_ERRORS - len(errors)
+                    )
+                    errors = sorted(errors + rejections, key=lambda error: error.line)
+                    await reconcile_counters(self.session, BuildingDB.organizations_count, get_building_count(), True)
+                    await reconcile_counters(self.session, ActivityDB.organizations_count, get_activity_count(), True)
+                    indexes = [activity_count_index, organization_name_index, organization_bitmap_index]
+                indexes.append(organization_detail_cache)
+                versions = await bump_indexes(self.session, *indexes)
+                await drop_staging_tables(self.session, tables)
+        except IntegrityError as err:
+            return handle_error(err)
+        # Bulk changes are not applied in place, the indexes are reloaded on the next access
+        reload_indexes(versions)
+        return ImportResultSchema(
+            entity=entity,
+            received=received,
+            invalid=invalid,
+            merged=merged,
+            skipped=received - invalid - merged,
+            rejected_phones=rejected_phones,
+            rejected_activities=rejected_activities,
+            errors=errors
+        )
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+from src.base.urls import BaseURL
+
+
+class ImportURL(BaseURL):
+    """Import URL."""
+    module = Path(__file__).parent.name
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.import_create: str = '/{entity}/'
+
+
+import_url = ImportURL()
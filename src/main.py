@@ -7,6 +7,8 @@ from src.activities.urls import activity_url
 from src.buildings.routers import building_router
 from src.buildings.urls import building_url
 from src.config.settings import project_config
+from src.imports.routers import import_router
+from src.imports.urls import import_url
 from src.organizations.routers import organization_router
 from src.organizations.urls import organization_url
 
@@ -33,6 +35,7 @@ app = FastAPI(
 app.include_router(activity_router, prefix=activity_url(), tags=[activity_url.module])
 app.include_router(building_router, prefix=building_url(), tags=[building_url.module])
 app.include_router(organization_router, prefix=organization_url(), tags=[organization_url.module])
+app.include_router(import_router, prefix=import_url(), tags=[import_url.module])
 
 add_pagination(app)
 
@@ -0,0 +1,6 @@
+import enum
+
+
+class ActivityMatchEnum(enum.Enum):
+    any = 'any'
+    all = 'all'
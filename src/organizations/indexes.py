@@ -0,0 +1,232 @@
+from typing import Any, Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import select, insert, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import OrganizationDB, OrganizationActivityDB, ActivityClosureDB
+from src.base.indexes import BaseMemoryIndex, NamePrefixIndex
+from src.base.models import CacheInvalidationDB
+from src.config.settings import project_config
+
+# Processes behind by more versions than recorded clear the whole detail cache
+CACHE_INVALIDATIONS_KEPT = 1000
+
+
+class OrganizationDetailCache(BaseMemoryIndex):
+    """In-memory cache of serialized organization details with their ETags.
+
+    The shared version is bumped by any change of organizations, buildings or activities,
+    own writes drop affected entries in place. Writes of other processes drop entries of the organizations
+    and buildings recorded in cache_invalidations, versions without records clear the whole cache.
+    """
+    version_name = 'organizations'
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.clear()
+
+    async def fetch(self, session: AsyncSession) -> Sequence[Any]:
+        """Entries are filled on read."""
+        return []
+
+    def build(self, rows: Sequence[Any]) -> None:
+        """Entries are filled on read."""
+
+    def clear(self) -> None:
+        """Clear cached entries."""
+        self.entries: dict[UUID, tuple[str, bytes, UUID]] = {}
+
+    async def apply_changes(self, session: AsyncSession, version: int) -> bool:
+        """Drop entries of organizations and buildings changed by other processes since the loaded version."""
+        query = (
+            select(CacheInvalidationDB.version, CacheInvalidationDB.record_uuid)
+            .where(CacheInvalidationDB.name == self.version_name)
+            .where(CacheInvalidationDB.version > self.version, CacheInvalidationDB.version <= version)
+        )
+        rows = list(await session.execute(query))
+        if len({row.version for row in rows}) != version - self.version:
+            return False
+        record_uuids = {row.record_uuid for row in rows}
+        self.entries = {
+            k: entry for k, entry in self.entries.items() if k not in record_uuids and entry[2] not in record_uuids
+        }
+        self.version = version
+        # Details read before the changes were applied must not be cached
+        self.generation += 1
+        return True
+
+    async def add_invalidations(self, session: AsyncSession, version: int, record_uuids: Iterable[UUID]) -> None:
+        """Record organizations or buildings changed by the bumped version, old records are pruned."""
+        rows = [{'name': self.version_name, 'version': version, 'record_uuid': u} for u in record_uuids]
+        await session.execute(insert(CacheInvalidationDB), rows)
+        if version % CACHE_INVALIDATIONS_KEPT == 0:
+            query = (
+                delete(CacheInvalidationDB)
+                .where(CacheInvalidationDB.name == self.version_name)
+                .where(CacheInvalidationDB.version <= version - CACHE_INVALIDATIONS_KEPT)
+            )
+            await session.execute(query)
+
+    def get(self, organization_uuid: UUID) -> tuple[str, bytes] | None:
+        """Get ETag and body of the organization detail."""
+        entry = self.entries.get(organization_uuid)
+        return entry and entry[:2]
+
+    def put(self, organization_uuid: UUID, building_uuid: UUID, etag: str, body: bytes, generation: int) -> None:
+        """Cache the organization detail read while no write was committed by this process."""
+        if not self.loaded or generation != self.generation:
+            return
+        if len(self.entries) >= project_config.app.ORGANIZATION_CACHE_SIZE:
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[organization_uuid] = (etag, body, building_uuid)
+
+    def remove(self, organization_uuid: UUID, version: int) -> None:
+        """Drop the organization detail."""
+        if self.touch(version):
+            self.entries.pop(organization_uuid, None)
+
+    def remove_building(self, building_uuid: UUID, version: int) -> None:
+        """Drop details of organizations in the building."""
+        if self.touch(version):
+            self.entries = {k: entry for k, entry in self.entries.items() if entry[2] != building_uuid}
+
+
+class OrganizationNameIndex(NamePrefixIndex):
+    """In-memory sorted array of organization names for suggestions."""
+    version_name = 'organization_names'
+
+    async def fetch(self, session: AsyncSession) -> Sequence[Any]:
+        """Fetch organization names."""
+        return list(await session.execute(select(OrganizationDB.uuid, OrganizationDB.name)))
+
+
+class OrganizationBitmapIndex(BaseMemoryIndex):
+    """In-memory organization ordinals by building and bitmaps by activity and by activity with descendants.
+
+    Bitmaps are Python integers, bit N is set for the organization with ordinal N, so filters are
+    intersected and united by integer operations and counted by int.bit_count. Every bitmap is as wide
+    as its highest ordinal, so the many small building memberships are kept as sets of ordinals,
+    ordinals are assigned in building order on load.
+    """
+    version_name = 'organization_bitmaps'
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.clear()
+
+    async def fetch(self, session: AsyncSession) -> Sequence[Any]:
+        """Fetch organization buildings, activity links and activity ancestors."""
+        queries = [
+            select(OrganizationDB.uuid, OrganizationDB.building_uuid),
+            select(OrganizationActivityDB.organization_uuid, OrganizationActivityDB.activity_uuid),
+            select(ActivityClosureDB.descendant_uuid, ActivityClosureDB.ancestor_uuid),
+        ]
+        return [list(await session.execute(query)) for query in queries]
+
+    def build(self, rows: Sequence[Any]) -> None:
+        """Build bitmaps."""
+        organizations, links, closure = rows
+        for activity_uuid, ancestor_uuid in closure:
+            self.ancestors.setdefault(activity_uuid, []).append(ancestor_uuid)
+        activities: dict[UUID, list[UUID]] = {}
+        for organization_uuid, activity_uuid in links:
+            activities.setdefault(organization_uuid, []).append(activity_uuid)
+        for organization_uuid, building_uuid in sorted(organizations, key=lambda row: (row[1], row[0])):
+            self._add(organization_uuid, building_uuid, activities.get(organization_uuid, []))
+
+    def clear(self) -> None:
+        """Clear index data."""
+        self.ordinals: dict[UUID, int] = {}
+        self.uuids: list[UUID | None] = []
+        self.free_ordinals: list[int] = []
+        self.all: int = 0
+        self.organizations: dict[UUID, tuple[UUID, tuple[UUID, ...]]] = {}
+        self.ancestors: dict[UUID, list[UUID]] = {}
+        self.buildings: dict[UUID, set[int]] = {}
+        self.activities: dict[UUID, int] = {}
+        self.subtrees: dict[UUID, int] = {}
+
+    def _add(self, organization_uuid: UUID, building_uuid: UUID, activity_uuids: Iterable[UUID]) -> None:
+        if self.free_ordinals:
+            ordinal = self.free_ordinals.pop()
+            self.uuids[ordinal] = organization_uuid
+        else:
+            ordinal = len(self.uuids)
+            self.uuids.append(organization_uuid)
+        bit = 1 << ordinal
+        activity_uuids = tuple(set(activity_uuids))
+        self.ordinals[organization_uuid] = ordinal
+        self.organizations[organization_uuid] = (building_uuid, activity_uuids)
+        self.all |= bit
+        self.buildings.setdefault(building_uuid, set()).add(ordinal)
+        for activity_uuid in activity_uuids:
+            self.activities[activity_uuid] = self.activities.get(activity_uuid, 0) | bit
+            for ancestor_uuid in self.ancestors.get(activity_uuid, [activity_uuid]):
+                self.subtrees[ancestor_uuid] = self.subtrees.get(ancestor_uuid, 0) | bit
+
+    def _remove(self, organization_uuid: UUID) -> None:
+        ordinal = self.ordinals.pop(organization_uuid, None)
+        if ordinal is None:
+            return
+        mask = ~(1 << ordinal)
+        building_uuid, activity_uuids = self.organizations.pop(organization_uuid)
+        self.all &= mask
+        self.buildings[building_uuid].discard(ordinal)
+        if not self.buildings[building_uuid]:
+            del self.buildings[building_uuid]
+        for activity_uuid in activity_uuids:
+            self.activities[activity_uuid] &= mask
+            for ancestor_uuid in self.ancestors.get(activity_uuid, [activity_uuid]):
+                self.subtrees[ancestor_uuid] &= mask
+        self.uuids[ordinal] = None
+        self.free_ordinals.append(ordinal)
+
+    def upsert(self, organizations: Iterable[tuple[UUID, UUID, Iterable[UUID] | None]], version: int) -> None:
+        """Add or change organizations given by uuid, building uuid and activity uuids, None keeps activities."""
+        if self.touch(version):
+            for organization_uuid, building_uuid, activity_uuids in organizations:
+                if activity_uuids is None:
+                    activity_uuids = self.organizations.get(organization_uuid, (None, ()))[1]
+                self._remove(organization_uuid)
+                self._add(organization_uuid, building_uuid, activity_uuids)
+
+    def remove(self, organization_uuids: Iterable[UUID], version: int) -> None:
+        """Remove organizations."""
+        if self.touch(version):
+            for organization_uuid in organization_uuids:
+                self._remove(organization_uuid)
+
+    def get_bitmap(self, organization_uuids: Iterable[UUID]) -> int:
+        """Get bitmap of the organizations."""
+        return self.get_ordinals_bitmap(
+            ordinal for ordinal in map(self.ordinals.get, organization_uuids) if ordinal is not None
+        )
+
+    def get_ordinals_bitmap(self, ordinals: Iterable[int]) -> int:
+        """Get bitmap of the ordinals."""
+        bits = bytearray((len(self.uuids) + 7) // 8)
+        for ordinal in ordinals:
+            bits[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(bits, 'little')
+
+    def get_buildings_bitmap(self, building_uuids: Iterable[UUID]) -> int:
+        """Get bitmap of organizations in the buildings."""
+        return self.get_ordinals_bitmap(
+            ordinal for building_uuid in building_uuids for ordinal in self.buildings.get(building_uuid, ())
+        )
+
+    def get_uuids(self, bitmap: int) -> list[UUID]:
+        """Get organization uuids of the bitmap."""
+        uuids = []
+        for index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+            while byte:
+                low = byte & -byte
+                uuids.append(self.uuids[index * 8 + low.bit_length() - 1])
+                byte ^= low
+        return uuids
+
+
+organization_detail_cache = OrganizationDetailCache()
+organization_name_index = OrganizationNameIndex()
+organization_bitmap_index = OrganizationBitmapIndex()
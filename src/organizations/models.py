@@ -1,8 +1,9 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UUID
+from sqlalchemy import UUID, Index
 from sqlalchemy.orm import Mapped, relationship
 
+from src.base.functions import transaction_id
 from src.base.models import BaseDBModel, mc, FK
 
 if TYPE_CHECKING:
@@ -12,9 +13,17 @@ if TYPE_CHECKING:
 class OrganizationDB(BaseDBModel):
     """Organization database model."""
     __tablename__: str = 'organizations'
+    __table_args__ = (
+        Index('ix_organizations_update_date', 'update_date', 'uuid'),
+        Index('ix_organizations_change_id', 'change_id', 'uuid'),
+        Index(
+            'ix_organizations_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
 
     name: Mapped[str] = mc(nullable=False, unique=True)
     building_uuid: Mapped[UUID] = mc(FK('buildings.uuid', ondelete='RESTRICT'), nullable=False, unique=False)
+    change_id: Mapped[int] = mc(nullable=False, default=transaction_id(), onupdate=transaction_id())
 
     building: Mapped['BuildingDB'] = relationship('BuildingDB', back_populates='organizations')
     phones: Mapped[list['PhoneDB']] = relationship(back_populates='organization')
@@ -1,21 +1,27 @@
+from datetime import datetime
 from decimal import Decimal
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends, Query
+from fastapi import Depends, Query, Body, Header
 from fastapi_pagination.ext.sqlalchemy import apaginate
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
+from starlette.responses import StreamingResponse, Response
 
 from src.auth.auth import BaseAuth
-from src.base.paginators import PaginatePage
+from src.base.paginators import PaginatePage, CursorPaginatePage, apaginate_query
 from src.base.routers import FastAPIRouter
-from src.base.schemas import responses, UUIDSchema
+from src.base.schemas import responses, UUIDSchema, UUIDNameSchema, ChangesSchema
 from src.base.services import get_filters
+from src.base.utils import etag_matches
 from src.buildings.enums import ShapeEnum
 from src.config.session import get_async_session
+from src.organizations.enums import ActivityMatchEnum
 from src.organizations.schemas import OrganizationCreateSchema, OrganizationListItemSchema, OrganizationDetailSchema, \
-    OrganizationUpdateSchema
+    OrganizationUpdateSchema, OrganizationNearestItemSchema, OrganizationBulkCreateResultSchema, \
+    OrganizationExportSchema, OrganizationChangeSchema, OrganizationBatchGetResultSchema, \
+    OrganizationUpdateResultSchema, OrganizationFacetsSchema
 from src.organizations.sessions import OrganizationSession
 from src.organizations.urls import organization_url
 
@@ -43,18 +49,53 @@ async def organization_create(
     return result
 
 
-@organization_router.get(
-    organization_url.organization_list,
-    response_model=PaginatePage[OrganizationListItemSchema],
+@organization_router.post(
+    organization_url.organization_bulk_create,
+    response_model=OrganizationBulkCreateResultSchema,
     responses=responses(
-        PaginatePage[OrganizationListItemSchema],
-        statuses=[status.HTTP_400_BAD_REQUEST]
+        OrganizationBulkCreateResultSchema,
+        status.HTTP_201_CREATED,
+        statuses=[status.HTTP_409_CONFLICT]
     ),
-    description='Organization list',
+    status_code=status.HTTP_201_CREATED,
+    description='Organization bulk create, conflicting items are skipped and reported by their index',
 )
-async def organization_list(
+async def organization_bulk_create(
+        body: Annotated[list[OrganizationCreateSchema], Body(min_length=1, max_length=1000)],
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> OrganizationBulkCreateResultSchema:
+    """Organization bulk create."""
+    result = await OrganizationSession(session).organization_bulk_create(body)
+    return result
+
+
+@organization_router.post(
+    organization_url.organization_batch_get,
+    response_model=OrganizationBatchGetResultSchema,
+    responses=responses(OrganizationBatchGetResultSchema),
+    description='Organization details by uuids, not found uuids are listed in missing',
+)
+async def organization_batch_get(
+        body: Annotated[list[UUID], Body(min_length=1, max_length=5000)],
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> OrganizationBatchGetResultSchema:
+    """Organization batch get."""
+    result = await OrganizationSession(session).organization_batch_get(body)
+    return result
+
+
+async def get_organization_filters(
         building_uuid: Annotated[UUID, Query(description='Filter by building_uuid')] = None,
         activity_uuid: Annotated[UUID, Query(description='Filter by activity_uuid')] = None,
+        building_uuids: Annotated[list[UUID], Query(description='Filter by any of building_uuids')] = None,
+        activity_uuids: Annotated[
+            list[UUID], Query(description='Filter by activity_uuids, any or all of them by activity_match')
+        ] = None,
+        activity_match: Annotated[
+            ActivityMatchEnum, Query(description='Organization should have any or all of activity_uuids')
+        ] = ActivityMatchEnum.any,
         latitude: Annotated[
             Decimal, Query(description='Latitude of the point from which the calculation will be made')
         ] = None,
@@ -67,55 +108,199 @@ async def organization_list(
         shape: Annotated[
             ShapeEnum, Query(description='Shape of the zone for which the calculation will be made')
         ] = ShapeEnum.circle,
+        polygon: Annotated[
+            str, Query(description='Polygon for the polygon shape in GeoJSON order: [[longitude, latitude], ...]')
+        ] = None,
         search_activity: Annotated[str, Query(description='Search by activity name')] = None,
         search_name: Annotated[str, Query(description='Search by organization name')] = None,
+) -> dict:
+    """Organization list filters."""
+    return get_filters(
+        building_uuid=building_uuid, activity_uuid=activity_uuid, building_uuids=building_uuids,
+        activity_uuids=activity_uuids, activity_match=activity_match, search_activity=search_activity,
+        search_name=search_name, latitude=latitude, longitude=longitude, radius=radius, shape=shape,
+        polygon=polygon
+    )
+
+
+@organization_router.get(
+    organization_url.organization_list,
+    response_model=PaginatePage[OrganizationListItemSchema],
+    responses=responses(
+        PaginatePage[OrganizationListItemSchema],
+        statuses=[status.HTTP_400_BAD_REQUEST]
+    ),
+    description='Organization list, search by name is ordered by relevance',
+)
+async def organization_list(
+        filters: dict = Depends(get_organization_filters),
         session: AsyncSession = Depends(get_async_session),
         _: AsyncSession = Depends(BaseAuth())
 ) -> PaginatePage[OrganizationListItemSchema]:
     """Organization list."""
-    filters = get_filters(
-        building_uuid=building_uuid, activity_uuid=activity_uuid, search_activity=search_activity,
-        search_name=search_name, latitude=latitude, longitude=longitude, radius=radius, shape=shape
-    )
+    organizations = await OrganizationSession(session).organization_list(ranked=True, **filters)
+    result = await apaginate_query(session, organizations)
+    return result
+
+
+@organization_router.get(
+    organization_url.organization_list_cursor,
+    response_model=CursorPaginatePage[OrganizationListItemSchema],
+    responses=responses(
+        CursorPaginatePage[OrganizationListItemSchema],
+        statuses=[status.HTTP_400_BAD_REQUEST]
+    ),
+    description='Organization list with cursor pagination ordered by name',
+)
+async def organization_list_cursor(
+        filters: dict = Depends(get_organization_filters),
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> CursorPaginatePage[OrganizationListItemSchema]:
+    """Organization list cursor."""
     organizations = await OrganizationSession(session).organization_list(**filters)
     result = await apaginate(session, organizations)
     return result
 
 
+@organization_router.get(
+    organization_url.organization_facets,
+    response_model=OrganizationFacetsSchema,
+    responses=responses(
+        OrganizationFacetsSchema,
+        statuses=[status.HTTP_400_BAD_REQUEST]
+    ),
+    description='Counts of organizations filtered as in the list per activity with descendants and per building',
+)
+async def organization_facets(
+        filters: dict = Depends(get_organization_filters),
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> OrganizationFacetsSchema:
+    """Organization facets."""
+    result = await OrganizationSession(session).organization_facets(**filters)
+    return result
+
+
+@organization_router.get(
+    organization_url.organization_nearest,
+    response_model=list[OrganizationNearestItemSchema],
+    responses=responses(list[OrganizationNearestItemSchema]),
+    description='Organizations nearest to the point ordered by distance in km',
+)
+async def organization_nearest(
+        latitude: Annotated[
+            Decimal, Query(description='Latitude of the point from which the calculation will be made')
+        ],
+        longitude: Annotated[
+            Decimal, Query(description='Longitude of the point from which the calculation will be made')
+        ],
+        limit: Annotated[int, Query(ge=1, le=100, description='Number of organizations')] = 10,
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> list[OrganizationNearestItemSchema]:
+    """Organization nearest."""
+    result = await OrganizationSession(session).organization_nearest(latitude, longitude, limit)
+    return result
+
+
+@organization_router.get(
+    organization_url.organization_export,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            'model': OrganizationExportSchema,
+            'content': {'application/x-ndjson': {}},
+            'description': 'One organization per line',
+        },
+        **responses.get_base_statuses(exclude=[status.HTTP_422_UNPROCESSABLE_CONTENT]),
+    },
+    description='Export of all organizations as NDJSON',
+)
+async def organization_export(
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> StreamingResponse:
+    """Organization export."""
+    result = OrganizationSession(session).organization_export()
+    return StreamingResponse(result, media_type='application/x-ndjson')
+
+
+@organization_router.get(
+    organization_url.organization_suggest,
+    response_model=list[UUIDNameSchema],
+    responses=responses(list[UUIDNameSchema]),
+    description='Organization names starting with the text ignoring case, ordered by name',
+)
+async def organization_suggest(
+        q: Annotated[str, Query(min_length=1, max_length=255, description='Beginning of the organization name')],
+        limit: Annotated[int, Query(ge=1, le=50, description='Number of suggestions')] = 10,
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> list[UUIDNameSchema]:
+    """Organization suggest."""
+    result = await OrganizationSession(session).organization_suggest(q, limit)
+    return result
+
+
+@organization_router.get(
+    organization_url.organization_changes,
+    response_model=ChangesSchema[OrganizationChangeSchema],
+    responses=responses(
+        ChangesSchema[OrganizationChangeSchema],
+        statuses=[status.HTTP_400_BAD_REQUEST]
+    ),
+    description='Organizations changed or deleted after the timestamp or the cursor in the order of changes',
+)
+async def organization_changes(
+        since: Annotated[datetime, Query(description='Changes after the timestamp')] = None,
+        cursor: Annotated[str, Query(description='next_cursor of the previous response')] = None,
+        size: Annotated[int, Query(ge=1, le=1000, description='Number of changes')] = 100,
+        session: AsyncSession = Depends(get_async_session),
+        _: AsyncSession = Depends(BaseAuth())
+) -> ChangesSchema[OrganizationChangeSchema]:
+    """Organizations changes."""
+    result = await OrganizationSession(session).organization_changes(since, cursor, size)
+    return result
+
+
 @organization_router.get(
     organization_url.organization_detail,
     response_model=OrganizationDetailSchema,
     responses=responses(
         OrganizationDetailSchema,
-        statuses=[status.HTTP_404_NOT_FOUND]
+        statuses=[status.HTTP_304_NOT_MODIFIED, status.HTTP_404_NOT_FOUND]
     ),
-    description='Organization detail',
+    description='Organization detail with ETag, If-None-Match with the current ETag returns 304',
 )
 async def organization_detail(
         organization_uuid: UUID,
+        if_none_match: Annotated[str, Header(description='ETag of the cached response')] = None,
         session: AsyncSession = Depends(get_async_session),
         _: AsyncSession = Depends(BaseAuth())
-) -> OrganizationDetailSchema:
+) -> Response:
     """Organization detail."""
-    result = await OrganizationSession(session).organization_detail(organization_uuid)
-    return result
+    etag, body = await OrganizationSession(session).organization_detail_cached(organization_uuid)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return Response(body, media_type='application/json', headers={'ETag': etag})
 
 
 @organization_router.patch(
     organization_url.organization_update,
-    response_model=UUIDSchema,
+    response_model=OrganizationUpdateResultSchema,
     responses=responses(
-        UUIDSchema,
+        OrganizationUpdateResultSchema,
         statuses=[status.HTTP_404_NOT_FOUND, status.HTTP_409_CONFLICT]
     ),
-    description='Organization update',
+    description='Organization update, the response has counts of inserted and deleted phones and activities',
 )
 async def organization_update(
         organization_uuid: UUID,
         body: OrganizationUpdateSchema,
         session: AsyncSession = Depends(get_async_session),
         _: AsyncSession = Depends(BaseAuth())
-) -> UUIDSchema:
+) -> OrganizationUpdateResultSchema:
     """Organization update."""
     result = await OrganizationSession(session).organization_update(body, organization_uuid)
     return result
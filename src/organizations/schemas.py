@@ -6,7 +6,7 @@ from pydantic import field_validator
 from starlette import status
 
 from src.activities.schemas import ActivityTreeItemSchema
-from src.base.schemas import BaseSchema
+from src.base.schemas import BaseSchema, UUIDSchema
 from src.buildings.schemas import BuildingOutSchema
 
 
@@ -39,6 +39,30 @@ class OrganizationCreateSchema(OrganizationInSchema):
     building_uuid: UUID
     activity_uuids: list[UUID]
 
+    @field_validator('activity_uuids')
+    def check_activity_uuids(cls, activity_uuids: list[UUID]) -> list[UUID]:
+        """Drop duplicate activities."""
+        return list(dict.fromkeys(activity_uuids))
+
+
+class OrganizationBulkCreatedSchema(BaseSchema):
+    """Organization bulk create created item schema."""
+    index: int
+    uuid: UUID
+
+
+class OrganizationBulkConflictSchema(BaseSchema):
+    """Organization bulk create conflict schema."""
+    index: int
+    field: str
+    message: str
+
+
+class OrganizationBulkCreateResultSchema(BaseSchema):
+    """Organization bulk create result schema."""
+    created: list[OrganizationBulkCreatedSchema]
+    conflicts: list[OrganizationBulkConflictSchema]
+
 
 class OrganizationListItemSchema(BaseSchema):
     """Organization list item schema."""
@@ -47,6 +71,29 @@ class OrganizationListItemSchema(BaseSchema):
     phones: list[PhoneSchema]
 
 
+class OrganizationNearestItemSchema(OrganizationListItemSchema):
+    """Organization nearest item schema."""
+    distance: float
+
+
+class OrganizationExportSchema(BaseSchema):
+    """Organization export schema."""
+    uuid: UUID
+    name: str
+    building: BuildingOutSchema
+    phones: list[str]
+    activity_uuids: list[UUID]
+
+
+class OrganizationChangeSchema(BaseSchema):
+    """Organization change schema."""
+    uuid: UUID
+    name: str
+    building_uuid: UUID
+    phones: list[str]
+    activity_uuids: list[UUID]
+
+
 class OrganizationDetailSchema(BaseSchema):
     """Organization detail schema."""
     uuid: UUID
@@ -56,6 +103,42 @@ class OrganizationDetailSchema(BaseSchema):
     phones: list[PhoneSchema]
 
 
+class OrganizationBatchGetResultSchema(BaseSchema):
+    """Organization batch get result schema."""
+    items: list[OrganizationDetailSchema]
+    missing: list[UUID]
+
+
+class ActivityFacetSchema(BaseSchema):
+    """Organization count of the activity with its descendants."""
+    uuid: UUID
+    name: str
+    parent_uuid: UUID | None
+    count: int
+
+
+class BuildingFacetSchema(BaseSchema):
+    """Organization count of the building."""
+    uuid: UUID
+    address: str
+    count: int
+
+
+class OrganizationFacetsSchema(BaseSchema):
+    """Organization facets schema."""
+    total: int
+    activities: list[ActivityFacetSchema]
+    buildings: list[BuildingFacetSchema]
+
+
+class OrganizationUpdateResultSchema(UUIDSchema):
+    """Organization update result schema with counts of touched phone and activity rows."""
+    phones_inserted: int = 0
+    phones_deleted: int = 0
+    activities_inserted: int = 0
+    activities_deleted: int = 0
+
+
 class OrganizationUpdateSchema(OrganizationInSchema):
     """Organization update schema."""
     name: str = None
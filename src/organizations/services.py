@@ -1,64 +1,264 @@
 from decimal import Decimal
+from functools import reduce
+from operator import and_, or_
+from typing import Any, Sequence
 from uuid import UUID
 
-from fastapi import HTTPException
-from sqlalchemy import Select, and_, select
+from sqlalchemy import ColumnElement, Exists, Select, select, delete, insert, exists, func, false
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette import status
+from sqlalchemy.orm import InstrumentedAttribute
 
-from src import ActivityDB, OrganizationActivityDB, OrganizationDB, BuildingDB
-from src.activities.services import get_all_child_activities
+from src import OrganizationActivityDB, OrganizationDB, PhoneDB, BuildingDB, ActivityDB, ActivityClosureDB
+from src.activities.indexes import activity_tree
+from src.activities.services import build_activities_tree
+from src.base.enums import SelectivityEnum
+from src.base.functions import json_agg_objects
+from src.base.services import FilterPlanner
 from src.buildings.enums import ShapeEnum
-from src.buildings.services import filter_buildings_in_radius
-from src.organizations.utils import check_latitude, check_longitude
+from src.buildings.schemas import BuildingOutSchema
+from src.buildings.services import get_buildings_in_zone
+from src.organizations.enums import ActivityMatchEnum
+from src.organizations.indexes import organization_bitmap_index
+from src.organizations.schemas import OrganizationCreateSchema, OrganizationDetailSchema, PhoneSchema, \
+    OrganizationFacetsSchema, ActivityFacetSchema, BuildingFacetSchema
 
 
 async def filter_organizations(
         session: AsyncSession, query: Select, building_uuid: UUID | None, activity_uuid: UUID | None,
         search_activity: str | None, search_name: str | None, latitude: Decimal | None, longitude: Decimal | None,
-        radius: float | None, shape: ShapeEnum
+        radius: float | None, shape: ShapeEnum, polygon: str | None, building_uuids: list[UUID] | None = None,
+        activity_uuids: list[UUID] | None = None, activity_match: ActivityMatchEnum = ActivityMatchEnum.any
 ) -> Select:
-    """Filter organizations."""
+    """Filter organizations, every filter is an independent clause on organizations, activities are semi-joins.
+
+    Building and activity filters are checked by the bitmap index first to cut short filters matching nothing,
+    the database checks every filter itself, so the index lagging behind other processes never changes results.
+    """
+    planner = FilterPlanner()
+    searched_activities = None
+    if search_activity is not None:
+        await activity_tree.ensure_loaded(session)
+        searched_activities = activity_tree.search(search_activity)
+    if activity_uuid or activity_uuids or searched_activities is not None:
+        bitmap = await get_filters_bitmap(
+            session, building_uuid, building_uuids, activity_uuid, activity_uuids, activity_match, searched_activities
+        )
+        if not bitmap:
+            planner.add(SelectivityEnum.key, false())
+    if building_uuid:
+        planner.add(SelectivityEnum.key, OrganizationDB.building_uuid == building_uuid)
+    if building_uuids:
+        planner.add(SelectivityEnum.key, OrganizationDB.building_uuid.in_(building_uuids))
+    if activity_uuid:
+        clause = has_activities(OrganizationActivityDB.activity_uuid == activity_uuid)
+        planner.add(SelectivityEnum.semi_join, clause)
+    if activity_uuids and activity_match == ActivityMatchEnum.all:
+        clause = OrganizationDB.uuid.in_(get_organizations_with_all(set(activity_uuids)))
+        planner.add(SelectivityEnum.semi_join, clause)
+    elif activity_uuids:
+        clause = has_activities(OrganizationActivityDB.activity_uuid.in_(activity_uuids))
+        planner.add(SelectivityEnum.semi_join, clause)
+    if searched_activities is not None:
+        clause = has_activities(OrganizationActivityDB.activity_uuid.in_(searched_activities))
+        planner.add(SelectivityEnum.semi_join, clause)
+    filtered_buildings = await get_buildings_in_zone(session, latitude, longitude, radius, shape, polygon)
+    if filtered_buildings is not None:
+        planner.add(SelectivityEnum.candidates, OrganizationDB.building_uuid.in_(filtered_buildings))
+    if search_name is not None:
+        planner.add(SelectivityEnum.pattern, OrganizationDB.name.icontains(search_name, autoescape=True))
+    return planner.apply(query)
+
+
+async def get_filters_bitmap(
+        session: AsyncSession, building_uuid: UUID | None, building_uuids: list[UUID] | None,
+        activity_uuid: UUID | None, activity_uuids: list[UUID] | None, activity_match: ActivityMatchEnum,
+        searched_activities: set[UUID] | None
+) -> int:
+    """Get bitmap of organizations matching building and activity filters from the bitmap index."""
+    index = organization_bitmap_index
+    await index.ensure_loaded(session)
+    bitmap = index.all
     if building_uuid:
-        query = query.where(OrganizationDB.building_uuid == building_uuid)
+        bitmap &= index.get_buildings_bitmap([building_uuid])
+    if building_uuids:
+        bitmap &= index.get_buildings_bitmap(building_uuids)
     if activity_uuid:
-        subquery = (
-            select(query.subquery().c.uuid)
-            .join(
-                OrganizationActivityDB,
-                and_(
-                    OrganizationDB.uuid == OrganizationActivityDB.organization_uuid,
-                    OrganizationActivityDB.activity_uuid == activity_uuid
-                )
+        bitmap &= index.activities.get(activity_uuid, 0)
+    if activity_uuids:
+        bitmaps = (index.activities.get(a, 0) for a in set(activity_uuids))
+        bitmap &= reduce(and_ if activity_match == ActivityMatchEnum.all else or_, bitmaps)
+    if searched_activities is not None:
+        bitmap &= reduce(or_, (index.subtrees.get(a, 0) for a in searched_activities), 0)
+    return bitmap
+
+
+def has_activities(clause: ColumnElement[bool]) -> Exists:
+    """Get semi-join of organizations having activity links matching the clause."""
+    return exists().where(OrganizationActivityDB.organization_uuid == OrganizationDB.uuid, clause)
+
+
+def get_organizations_with_all(activity_uuids: set[UUID]) -> Select:
+    """Get query of organizations linked to all the activities by grouping their links."""
+    return (
+        select(OrganizationActivityDB.organization_uuid)
+        .where(OrganizationActivityDB.activity_uuid.in_(activity_uuids))
+        .group_by(OrganizationActivityDB.organization_uuid)
+        .having(func.count(OrganizationActivityDB.activity_uuid) == len(activity_uuids))
+    )
+
+
+async def get_bulk_conflicts(
+        session: AsyncSession, organizations: list[OrganizationCreateSchema]
+) -> dict[int, list[dict]]:
+    """Get conflicts of the organizations batch with each other and with the database by item index."""
+    names = {organization.name for organization in organizations}
+    phones = {phone for organization in organizations for phone in organization.phones}
+    building_uuids = {organization.building_uuid for organization in organizations}
+    activity_uuids = {activity_uuid for organization in organizations for activity_uuid in organization.activity_uuids}
+    existing_names = set(await session.scalars(select(OrganizationDB.name).where(OrganizationDB.name.in_(names))))
+    existing_phones = set(await session.scalars(select(PhoneDB.phone).where(PhoneDB.phone.in_(phones))))
+    existing_buildings = set(await session.scalars(select(BuildingDB.uuid).where(BuildingDB.uuid.in_(building_uuids))))
+    existing_activities = set(
+        await session.scalars(select(ActivityDB.uuid).where(ActivityDB.uuid.in_(activity_uuids)))
+    )
+    conflicts = {}
+    batch_names = set()
+    batch_phones = set()
+    for index, organization in enumerate(organizations):
+        errors = []
+        if organization.name in existing_names or organization.name in batch_names:
+            errors.append({'field': 'name', 'message': f'Organization {organization.name} already exists'})
+        for phone in organization.phones:
+            if phone in existing_phones or phone in batch_phones:
+                errors.append({'field': 'phones', 'message': f'Phone {phone} already exists'})
+        if organization.building_uuid not in existing_buildings:
+            errors.append({'field': 'building_uuid', 'message': f'Building {organization.building_uuid} not found'})
+        for activity_uuid in organization.activity_uuids:
+            if activity_uuid not in existing_activities:
+                errors.append({'field': 'activity_uuids', 'message': f'Activity {activity_uuid} not found'})
+        if errors:
+            conflicts[index] = errors
+        else:
+            batch_names.add(organization.name)
+            batch_phones.update(organization.phones)
+    return conflicts
+
+
+async def sync_organization_rows(
+        session: AsyncSession, column: InstrumentedAttribute, organization_uuid: UUID, values: list
+) -> tuple[list, set]:
+    """Insert and delete organization rows by the difference with the current values, get inserted and deleted."""
+    model = column.class_
+    current = set(await session.scalars(select(column).where(model.organization_uuid == organization_uuid)))
+    inserted = [value for value in dict.fromkeys(values) if value not in current]
+    deleted = current.difference(values)
+    if deleted:
+        query = delete(model).where(model.organization_uuid == organization_uuid, column.in_(deleted))
+        await session.execute(query)
+    if inserted:
+        rows = [{column.key: value, 'organization_uuid': organization_uuid} for value in inserted]
+        await session.execute(insert(model).values(rows))
+    return inserted, deleted
+
+
+async def get_organization_detail(session: AsyncSession, organization_uuid: UUID) -> OrganizationDetailSchema | None:
+    """Get organization detail in one statement, phones and ancestor-complete activities are aggregated to JSON."""
+    phones = (
+        select(json_agg_objects('uuid', PhoneDB.uuid, 'phone', PhoneDB.phone))
+        .where(PhoneDB.organization_uuid == OrganizationDB.uuid)
+        .scalar_subquery()
+    )
+    ancestors = (
+        select(ActivityClosureDB.ancestor_uuid)
+        .join(OrganizationActivityDB, OrganizationActivityDB.activity_uuid == ActivityClosureDB.descendant_uuid)
+        .where(OrganizationActivityDB.organization_uuid == OrganizationDB.uuid)
+        .correlate(OrganizationDB)
+    )
+    activities = (
+        select(
+            json_agg_objects(
+                'uuid', ActivityDB.uuid, 'name', ActivityDB.name, 'parent_uuid', ActivityDB.parent_uuid
             )
-        ).scalar_subquery()
-        query = query.where(OrganizationDB.uuid.in_(subquery))
-    if search_activity is not None:
-        activity_subquery = (
-            select(ActivityDB.uuid).where(ActivityDB.name.ilike(f'%{search_activity}%')).scalar_subquery()
         )
-        activities = await get_all_child_activities(activity_subquery)
-        subquery = (
-            select(query.subquery().c.uuid)
-            .join(
-                OrganizationActivityDB,
-                and_(
-                    OrganizationDB.uuid == OrganizationActivityDB.organization_uuid,
-                    OrganizationActivityDB.activity_uuid.in_(activities)
-                )
-            )
-        ).scalar_subquery()
-        query = query.where(OrganizationDB.uuid.in_(subquery))
-    if search_name is not None:
-        query = query.where(OrganizationDB.name.ilike(f'%{search_name}%'))
-    if any([latitude, longitude, radius]) and not all([latitude, longitude, radius]):
-        detail = 'Fields latitude, longitude, radius should be specified together or not specified at all'
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
-    if all([latitude, longitude, radius]):
-        check_latitude(latitude)
-        check_longitude(longitude)
-        building_query = select(BuildingDB)
-        res = list(await session.scalars(building_query))
-        filtered_buildings = filter_buildings_in_radius(latitude, longitude, radius, shape, res)
-        query = query.where(OrganizationDB.building_uuid.in_(filtered_buildings))
-    return query
+        .where(ActivityDB.uuid.in_(ancestors))
+        .scalar_subquery()
+    )
+    query = (
+        select(OrganizationDB.uuid, OrganizationDB.name, BuildingDB, phones, activities)
+        .join(BuildingDB, BuildingDB.uuid == OrganizationDB.building_uuid)
+        .where(OrganizationDB.uuid == organization_uuid)
+    )
+    row = (await session.execute(query)).one_or_none()
+    if not row:
+        return None
+    uuid, name, building, phones, activities = row
+    return OrganizationDetailSchema(
+        uuid=uuid,
+        name=name,
+        building=BuildingOutSchema.model_validate(building),
+        phones=phones or [],
+        activities_tree=build_activities_tree(activities or []),
+    )
+
+
+async def get_organization_details(
+        session: AsyncSession, organization_uuids: list[UUID]
+) -> dict[UUID, OrganizationDetailSchema]:
+    """Get organization details with one query per relation, activity trees are built from the memory index."""
+    query = (
+        select(OrganizationDB.uuid, OrganizationDB.name, BuildingDB)
+        .join(BuildingDB, BuildingDB.uuid == OrganizationDB.building_uuid)
+        .where(OrganizationDB.uuid.in_(organization_uuids))
+    )
+    organizations = (await session.execute(query)).all()
+    found = [organization_uuid for organization_uuid, _, _ in organizations]
+    phones = {organization_uuid: [] for organization_uuid in found}
+    activities = {organization_uuid: [] for organization_uuid in found}
+    if found:
+        query = (
+            select(PhoneDB.organization_uuid, PhoneDB.uuid, PhoneDB.phone)
+            .where(PhoneDB.organization_uuid.in_(found))
+            .order_by(PhoneDB.phone)
+        )
+        for organization_uuid, phone_uuid, phone in await session.execute(query):
+            phones[organization_uuid].append(PhoneSchema(uuid=phone_uuid, phone=phone))
+        query = (
+            select(OrganizationActivityDB.organization_uuid, OrganizationActivityDB.activity_uuid)
+            .where(OrganizationActivityDB.organization_uuid.in_(found))
+        )
+        for organization_uuid, activity_uuid in await session.execute(query):
+            activities[organization_uuid].append(activity_uuid)
+    await activity_tree.ensure_loaded(session)
+    trees = activity_tree.get_trees(activities)
+    return {
+        organization_uuid: OrganizationDetailSchema(
+            uuid=organization_uuid,
+            name=name,
+            building=BuildingOutSchema.model_validate(building),
+            phones=phones[organization_uuid],
+            activities_tree=trees[organization_uuid],
+        )
+        for organization_uuid, name, building in organizations
+    }
+
+
+def get_organization_facets(buildings: Sequence[Any], bitmap: int) -> OrganizationFacetsSchema:
+    """Get counts of the filtered organizations per activity and building.
+
+    Buildings are given as rows of uuid, address and count, activity counts include organizations of descendant
+    activities and are taken from the loaded bitmap index for the bitmap of filtered organizations.
+    """
+    activities = []
+    for activity_uuid, name in activity_tree.names.items():
+        count = (organization_bitmap_index.subtrees.get(activity_uuid, 0) & bitmap).bit_count()
+        if count:
+            parent_uuid = activity_tree.parents[activity_uuid]
+            activities.append(ActivityFacetSchema(uuid=activity_uuid, name=name, parent_uuid=parent_uuid, count=count))
+    return OrganizationFacetsSchema(
+        total=sum(count for _, _, count in buildings),
+        activities=sorted(activities, key=lambda activity: activity.name),
+        buildings=[
+            BuildingFacetSchema(uuid=building_uuid, address=address, count=count)
+            for building_uuid, address, count in sorted(buildings, key=lambda item: (-item[2], item[1]))
+        ]
+    )
@@ -1,18 +1,38 @@
-from uuid import UUID
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException
-from sqlalchemy import insert, Select, select, update, delete
+from sqlalchemy import insert, Select, select, update, delete, func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload, joinedload
 from starlette import status
 
-from src import OrganizationDB, PhoneDB, OrganizationActivityDB, ActivityDB
-from src.activities.services import get_activities_tree
-from src.base.schemas import UUIDSchema
+from src import OrganizationDB, PhoneDB, OrganizationActivityDB, ActivityDB, BuildingDB
+from src.activities.indexes import activity_tree, activity_count_index
+from src.base.changes import get_changes, add_tombstones
+from src.base.functions import text_similarity
+from src.base.indexes import bump_indexes
+from src.base.loaders import get_schema_options
+from src.base.schemas import UUIDSchema, UUIDNameSchema, ChangesSchema
 from src.base.sessions import BaseSession
-from src.base.utils import handle_error
-from src.organizations.schemas import OrganizationCreateSchema, OrganizationDetailSchema, OrganizationUpdateSchema
-from src.organizations.services import filter_organizations
+from src.base.utils import handle_error, get_etag
+from src.buildings.indexes import building_index
+from src.config.settings import project_config
+from src.counters.services import update_organization_counters
+from src.organizations.schemas import OrganizationCreateSchema, OrganizationUpdateSchema, \
+    OrganizationNearestItemSchema, OrganizationListItemSchema, OrganizationBulkCreateResultSchema, \
+    OrganizationBulkCreatedSchema, OrganizationBulkConflictSchema, OrganizationExportSchema, \
+    OrganizationChangeSchema, OrganizationBatchGetResultSchema, OrganizationUpdateResultSchema, \
+    OrganizationFacetsSchema
+from src.organizations.indexes import organization_detail_cache, organization_name_index, \
+    organization_bitmap_index
+from src.organizations.services import filter_organizations, get_bulk_conflicts, get_organization_detail, \
+    get_organization_details, sync_organization_rows, get_organization_facets, get_filters_bitmap
+from src.organizations.utils import check_latitude, check_longitude
+
+NEAREST_MAX_ROUNDS = 3
 
 
 class OrganizationSession(BaseSession):
@@ -35,82 +55,319 @@ class OrganizationSession(BaseSession):
                         OrganizationActivityDB(activity_uuid=activity_uuid, organization_uuid=organization.uuid)
                     )
                 self.session.add_all(inserted_data)
+                deltas = await update_organization_counters(
+                    self.session, [(None, organization.building_uuid, set(), set(activity_uuids))]
+                )
+                indexes = [organization_name_index, organization_bitmap_index]
+                if deltas:
+                    indexes.append(activity_count_index)
+                versions = await bump_indexes(self.session, *indexes)
         except IntegrityError as err:
             return handle_error(err)
+        organization_name_index.upsert([(organization.uuid, organization.name)], versions[organization_name_index])
+        if deltas:
+            activity_count_index.add(deltas, versions[activity_count_index])
+        organization_bitmap_index.upsert(
+            [(organization.uuid, organization.building_uuid, activity_uuids)], versions[organization_bitmap_index]
+        )
         return organization
 
-    async def organization_list(self, **filters) -> Select:
-        """Organization list."""
-        query = (
-            select(OrganizationDB)
-            .options(selectinload(OrganizationDB.phones), selectinload(OrganizationDB.building))
+    async def organization_bulk_create(
+            self, body: list[OrganizationCreateSchema]
+    ) -> OrganizationBulkCreateResultSchema | UUIDSchema:
+        """Organization bulk create, conflicting items are skipped and reported."""
+        try:
+            async with self.session.begin():
+                conflicts = await get_bulk_conflicts(self.session, body)
+                created = []
+                organizations, phones, activities = [], [], []
+                for index, organization in enumerate(body):
+                    if index in conflicts:
+                        continue
+                    organization_uuid = uuid4()
+                    created.append(OrganizationBulkCreatedSchema(index=index, uuid=organization_uuid))
+                    organizations.append(
+                        {'uuid': organization_uuid, 'name': organization.name,
+                         'building_uuid': organization.building_uuid}
+                    )
+                    phones.extend(
+                        {'uuid': uuid4(), 'phone': phone, 'organization_uuid': organization_uuid}
+                        for phone in organization.phones
+                    )
+                    activities.extend(
+                        {'activity_uuid': activity_uuid, 'organization_uuid': organization_uuid}
+                        for activity_uuid in organization.activity_uuids
+                    )
+                for model, rows in ((OrganizationDB, organizations), (PhoneDB, phones),
+                                    (OrganizationActivityDB, activities)):
+                    if rows:
+                        await self.session.execute(insert(model), rows)
+                organization_activities = {}
+                for row in activities:
+                    organization_activities.setdefault(row['organization_uuid'], []).append(row['activity_uuid'])
+                deltas = await update_organization_counters(
+                    self.session,
+                    [
+                        (None, row['building_uuid'], set(), set(organization_activities.get(row['uuid'], [])))
+                        for row in organizations
+                    ]
+                )
+                indexes = [organization_name_index, organization_bitmap_index]
+                if deltas:
+                    indexes.append(activity_count_index)
+                versions = await bump_indexes(self.session, *indexes)
+        except IntegrityError as err:
+            return handle_error(err)
+        organization_name_index.upsert(
+            ((row['uuid'], row['name']) for row in organizations), versions[organization_name_index]
+        )
+        if deltas:
+            activity_count_index.add(deltas, versions[activity_count_index])
+        organization_bitmap_index.upsert(
+            (
+                (row['uuid'], row['building_uuid'], organization_activities.get(row['uuid'], []))
+                for row in organizations
+            ),
+            versions[organization_bitmap_index]
         )
+        return OrganizationBulkCreateResultSchema(
+            created=created,
+            conflicts=[
+                OrganizationBulkConflictSchema(index=index, **error)
+                for index, errors in conflicts.items() for error in errors
+            ]
+        )
+
+    async def organization_list(self, ranked: bool = False, **filters) -> Select:
+        """Organization list, ranked lists searched by name are ordered by relevance first."""
+        query = select(OrganizationDB).options(*get_schema_options(OrganizationDB, OrganizationListItemSchema))
+        if ranked and filters.get('search_name') is not None:
+            query = query.order_by(text_similarity(OrganizationDB.name, filters['search_name']).desc())
+        query = query.order_by(OrganizationDB.name, OrganizationDB.uuid)
         query = await filter_organizations(self.session, query, **filters)
         return query
 
-    async def organization_detail(self, organization_uuid) -> OrganizationDetailSchema:
-        """Organization detail."""
+    async def organization_facets(self, **filters) -> OrganizationFacetsSchema:
+        """Organization counts per activity subtree and per building.
+
+        Buildings are counted by the database. Activities are counted by the bitmap index over organizations matching
+        building and activity filters, kept to the counted buildings for a zone and to the found ones for a name.
+        """
+        query = (
+            select(OrganizationDB.building_uuid, BuildingDB.address, func.count())
+            .join(BuildingDB, BuildingDB.uuid == OrganizationDB.building_uuid)
+            .group_by(OrganizationDB.building_uuid, BuildingDB.address)
+        )
+        query = await filter_organizations(self.session, query, **filters)
+        buildings = (await self.session.execute(query)).all()
+        await activity_tree.ensure_loaded(self.session)
+        if filters['search_name'] is not None:
+            query = await filter_organizations(self.session, select(OrganizationDB.uuid), **filters)
+            bitmap = organization_bitmap_index.get_bitmap(await self.session.scalars(query))
+            return get_organization_facets(buildings, bitmap)
+        searched_activities = None
+        if filters['search_activity'] is not None:
+            searched_activities = activity_tree.search(filters['search_activity'])
+        bitmap = await get_filters_bitmap(
+            self.session, filters['building_uuid'], filters['building_uuids'], filters['activity_uuid'],
+            filters['activity_uuids'], filters['activity_match'], searched_activities
+        )
+        if any(filters[name] is not None for name in ('latitude', 'longitude', 'radius', 'polygon')):
+            bitmap &= organization_bitmap_index.get_buildings_bitmap(row.building_uuid for row in buildings)
+        return get_organization_facets(buildings, bitmap)
+
+    async def organization_nearest(
+            self, latitude: Decimal, longitude: Decimal, limit: int
+    ) -> list[OrganizationNearestItemSchema]:
+        """Organizations nearest to the point ordered by distance."""
+        check_latitude(latitude)
+        check_longitude(longitude)
+        await building_index.ensure_loaded(self.session)
+        await organization_bitmap_index.ensure_loaded(self.session)
+        nearest = (item for buildings in building_index.iter_nearest(latitude, longitude) for item in buildings)
+        result = []
+        for round_ in range(NEAREST_MAX_ROUNDS):
+            # Take the nearest buildings holding enough organizations by the index, the last round takes the rest
+            wanted = (limit - len(result)) * 2 ** round_
+            last_round = round_ == NEAREST_MAX_ROUNDS - 1
+            distances, expected = {}, 0
+            for building_uuid, distance in nearest:
+                count = len(organization_bitmap_index.buildings.get(building_uuid, ()))
+                if count:
+                    distances[building_uuid] = distance
+                    expected += count
+                    if expected >= wanted and not last_round:
+                        break
+            if not distances:
+                break
+            query = (
+                select(OrganizationDB)
+                .where(OrganizationDB.building_uuid.in_(distances))
+                .options(*get_schema_options(OrganizationDB, OrganizationListItemSchema, OrganizationDB.building_uuid))
+            )
+            organizations = sorted(
+                await self.session.scalars(query), key=lambda o: (distances[o.building_uuid], o.name)
+            )
+            for organization in organizations:
+                item = OrganizationListItemSchema.model_validate(organization).model_dump()
+                result.append(OrganizationNearestItemSchema(**item, distance=distances[organization.building_uuid]))
+            if len(result) >= limit:
+                break
+        return result[:limit]
+
+    async def organization_export(self) -> AsyncIterator[bytes]:
+        """Organization export as NDJSON chunks read by the server-side cursor in one snapshot."""
+        chunk_size = project_config.app.EXPORT_CHUNK_SIZE
+        options = {}
+        if self.session.bind.dialect.name == 'postgresql':
+            options = {'isolation_level': 'REPEATABLE READ', 'postgresql_readonly': True}
         async with self.session.begin():
+            await self.session.connection(execution_options=options)
             query = (
                 select(OrganizationDB)
-                .where(OrganizationDB.uuid == organization_uuid)
                 .options(
                     joinedload(OrganizationDB.building), selectinload(OrganizationDB.phones),
-                    selectinload(OrganizationDB.activities).selectinload(ActivityDB.parent, recursion_depth=2),
+                    selectinload(OrganizationDB.activities).load_only(ActivityDB.uuid),
                 )
+                .order_by(OrganizationDB.uuid)
+                .execution_options(yield_per=chunk_size)
             )
-            organization = await self.session.scalar(query)
-            if not organization:
-                raise HTTPException(status.HTTP_404_NOT_FOUND, 'Organization not found')
-            schema = OrganizationDetailSchema.model_validate(organization, from_attributes=True)
-            schema.activities_tree = await get_activities_tree(self.session, organization.activities)
-            return schema
+            organizations = await self.session.stream_scalars(query)
+            async for partition in organizations.partitions():
+                lines = []
+                for organization in partition:
+                    schema = OrganizationExportSchema(
+                        uuid=organization.uuid,
+                        name=organization.name,
+                        building=organization.building,
+                        phones=[phone.phone for phone in organization.phones],
+                        activity_uuids=[activity.uuid for activity in organization.activities],
+                    )
+                    lines.append(f'{schema.model_dump_json()}\n')
+                yield ''.join(lines).encode()
+
+    async def organization_changes(self, since: datetime | None, cursor: str | None, size: int) -> ChangesSchema:
+        """Organization changes."""
+        async with self.session.begin():
+            return await get_changes(
+                self.session, OrganizationDB, OrganizationDB.__tablename__, since, cursor, size,
+                lambda organization: OrganizationChangeSchema(
+                    uuid=organization.uuid,
+                    name=organization.name,
+                    building_uuid=organization.building_uuid,
+                    phones=[phone.phone for phone in organization.phones],
+                    activity_uuids=[activity.uuid for activity in organization.activities],
+                ),
+                options=[
+                    selectinload(OrganizationDB.phones),
+                    selectinload(OrganizationDB.activities).load_only(ActivityDB.uuid),
+                ]
+            )
+
+    async def organization_suggest(self, q: str, limit: int) -> list[UUIDNameSchema]:
+        """Organization names starting with the text."""
+        await organization_name_index.ensure_loaded(self.session)
+        return organization_name_index.search(q, limit)
+
+    async def organization_batch_get(self, organization_uuids: list[UUID]) -> OrganizationBatchGetResultSchema:
+        """Organization batch get, missing uuids are reported."""
+        organization_uuids = list(dict.fromkeys(organization_uuids))
+        async with self.session.begin():
+            organizations = await get_organization_details(self.session, organization_uuids)
+        return OrganizationBatchGetResultSchema(
+            items=[organizations[a] for a in organization_uuids if a in organizations],
+            missing=[a for a in organization_uuids if a not in organizations]
+        )
+
+    async def organization_detail_cached(self, organization_uuid: UUID) -> tuple[str, bytes]:
+        """Organization detail ETag and JSON body from the process cache."""
+        async with self.session.begin():
+            await organization_detail_cache.ensure_loaded(self.session)
+            cached = organization_detail_cache.get(organization_uuid)
+            if cached:
+                return cached
+            generation = organization_detail_cache.generation
+            organization = await get_organization_detail(self.session, organization_uuid)
+        if not organization:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, 'Organization not found')
+        body = organization.model_dump_json().encode()
+        etag = get_etag(body)
+        organization_detail_cache.put(organization_uuid, organization.building.uuid, etag, body, generation)
+        return etag, body
 
     async def organization_update(
             self, body: OrganizationUpdateSchema, organization_uuid: UUID
-    ) -> OrganizationDB | UUIDSchema:
-        """Organization update."""
+    ) -> OrganizationUpdateResultSchema | UUIDSchema:
+        """Organization update, phones and activities are changed by the difference with the current ones."""
         try:
             async with self.session.begin():
                 data = body.model_dump(exclude_unset=True)
                 phones: list[str] | None = data.pop('phones', None)
                 activity_uuids: list[UUID] | None = data.pop('activity_uuids', None)
+                building_before = None
+                if 'building_uuid' in data:
+                    query = select(OrganizationDB.building_uuid).where(OrganizationDB.uuid == organization_uuid)
+                    building_before = await self.session.scalar(query)
                 query = (
                     update(OrganizationDB)
                     .where(OrganizationDB.uuid == organization_uuid)
                     .values(**data)
-                    .returning(OrganizationDB)
+                    .returning(OrganizationDB.building_uuid)
                 )
-                organization = await self.session.scalar(query)
-                if not organization:
+                building_uuid = await self.session.scalar(query)
+                if not building_uuid:
                     raise HTTPException(status.HTTP_404_NOT_FOUND, 'Organization not found')
-                inserted_data = []
+                result = OrganizationUpdateResultSchema(uuid=organization_uuid)
                 if phones is not None:
                     if len(phones) == 0:
                         detail = {'field': 'phones', 'message': 'Organization should have at least one phone number'}
                         raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, [detail])
-                    query = delete(PhoneDB).where(PhoneDB.organization_uuid == organization.uuid)
-                    await self.session.execute(query)
-                    for phone in phones:
-                        inserted_data.append(PhoneDB(phone=phone, organization_uuid=organization.uuid))
+                    inserted, deleted = await sync_organization_rows(
+                        self.session, PhoneDB.phone, organization_uuid, phones
+                    )
+                    result.phones_inserted, result.phones_deleted = len(inserted), len(deleted)
+                activities_before = activities_after = set()
                 if activity_uuids is not None:
-                    query = (
-                        delete(OrganizationActivityDB)
-                        .where(OrganizationActivityDB.organization_uuid == organization.uuid)
+                    inserted, deleted = await sync_organization_rows(
+                        self.session, OrganizationActivityDB.activity_uuid, organization_uuid, activity_uuids
                     )
-                    await self.session.execute(query)
-                    for activity_uuid in activity_uuids:
-                        inserted_data.append(
-                            OrganizationActivityDB(activity_uuid=activity_uuid, organization_uuid=organization.uuid)
-                        )
-                self.session.add_all(inserted_data)
+                    result.activities_inserted, result.activities_deleted = len(inserted), len(deleted)
+                    activities_after = set(activity_uuids)
+                    activities_before = activities_after.difference(inserted) | deleted
+                change = (building_before or building_uuid, building_uuid, activities_before, activities_after)
+                deltas = await update_organization_counters(self.session, [change])
+                indexes = [organization_detail_cache]
+                if deltas:
+                    indexes.append(activity_count_index)
+                if 'name' in data:
+                    indexes.append(organization_name_index)
+                if 'building_uuid' in data or activity_uuids is not None:
+                    indexes.append(organization_bitmap_index)
+                versions = await bump_indexes(self.session, *indexes)
+                await organization_detail_cache.add_invalidations(
+                    self.session, versions[organization_detail_cache], [organization_uuid]
+                )
         except IntegrityError as err:
             return handle_error(err)
-        return organization
+        organization_detail_cache.remove(organization_uuid, versions[organization_detail_cache])
+        if activity_count_index in versions:
+            activity_count_index.add(deltas, versions[activity_count_index])
+        if organization_name_index in versions:
+            organization_name_index.upsert([(organization_uuid, data['name'])], versions[organization_name_index])
+        if organization_bitmap_index in versions:
+            organization_bitmap_index.upsert(
+                [(organization_uuid, building_uuid, activity_uuids)], versions[organization_bitmap_index]
+            )
+        return result
 
     async def organization_delete(self, organization_uuid: UUID) -> None:
         """Organization delete."""
         async with self.session.begin():
+            query = (
+                select(OrganizationActivityDB.activity_uuid)
+                .where(OrganizationActivityDB.organization_uuid == organization_uuid)
+            )
+            activity_uuids = set(await self.session.scalars(query))
             query = (
                 delete(OrganizationDB)
                 .where(OrganizationDB.uuid == organization_uuid)
@@ -119,3 +376,19 @@ class OrganizationSession(BaseSession):
             organization = await self.session.scalar(query)
             if not organization:
                 raise HTTPException(status.HTTP_404_NOT_FOUND, 'Organization not found')
+            await add_tombstones(self.session, OrganizationDB.__tablename__, [organization_uuid])
+            deltas = await update_organization_counters(
+                self.session, [(organization.building_uuid, None, activity_uuids, set())]
+            )
+            indexes = [organization_detail_cache, organization_name_index, organization_bitmap_index]
+            if deltas:
+                indexes.append(activity_count_index)
+            versions = await bump_indexes(self.session, *indexes)
+            await organization_detail_cache.add_invalidations(
+                self.session, versions[organization_detail_cache], [organization_uuid]
+            )
+        organization_detail_cache.remove(organization_uuid, versions[organization_detail_cache])
+        if deltas:
+            activity_count_index.add(deltas, versions[activity_count_index])
+        organization_name_index.remove([organization_uuid], versions[organization_name_index])
+        organization_bitmap_index.remove([organization_uuid], versions[organization_bitmap_index])
@@ -10,7 +10,15 @@ class OrganizationURL(BaseURL):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.organization_list: str = '/'
+        self.organization_list_cursor: str = '/cursor/'
         self.organization_create: str = '/'
+        self.organization_bulk_create: str = '/bulk/'
+        self.organization_batch_get: str = '/batch-get/'
+        self.organization_nearest: str = '/nearest/'
+        self.organization_facets: str = '/facets/'
+        self.organization_export: str = '/export/'
+        self.organization_changes: str = '/changes/'
+        self.organization_suggest: str = '/suggest/'
         self.organization_detail: str = '/{organization_uuid}/'
         self.organization_update: str = '/{organization_uuid}/'
         self.organization_delete: str = '/{organization_uuid}/'
@@ -1,11 +1,13 @@
-
+import json
 import re
 from decimal import Decimal
-from math import radians, sin, cos, atan2, sqrt
+from math import radians, degrees, cos, sin, asin, isfinite
 
 from fastapi import HTTPException
 from starlette import status
 
+from src.buildings.distances import EARTH_RADIUS_KM
+
 
 def check_latitude(latitude: Decimal | None) -> Decimal | None:
     """Check latitude."""
@@ -29,11 +31,78 @@ def check_longitude(longitude: Decimal | None) -> Decimal | None:
         return Decimal(longitude)
 
 
-def haversine(lat1: Decimal, lon1: Decimal, lat2: Decimal, lon2: Decimal) -> float:
-    """Calculate distance between two pair coordinates."""
-    earth_radius = 6371
-    d_lat = radians(lat2 - lat1)
-    d_lon = radians(lon2 - lon1)
-    a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
-    distance = 2 * earth_radius * atan2(sqrt(a), sqrt(1 - a))
-    return distance
+def get_bounding_box(
+        center_lat: Decimal, center_lon: Decimal, radius_km: float
+) -> tuple[Decimal, Decimal, Decimal, Decimal]:
+    """Get min latitude, max latitude, min longitude, max longitude of the square around the point."""
+    max_d_lat = Decimal(radius_km / 111.0)
+    max_d_lon = Decimal(radius_km / (111.0 * abs(cos(radians(center_lat)))))
+    return center_lat - max_d_lat, center_lat + max_d_lat, center_lon - max_d_lon, center_lon + max_d_lon
+
+
+def split_box(
+        min_lat: Decimal, max_lat: Decimal, min_lon: Decimal, max_lon: Decimal
+) -> list[tuple[Decimal, Decimal, Decimal, Decimal]]:
+    """Split the box crossing the antimeridian into boxes inside the longitude range."""
+    if max_lon - min_lon >= 360:
+        return [(min_lat, max_lat, Decimal(-180), Decimal(180))]
+    if min_lon < -180:
+        return [(min_lat, max_lat, min_lon + 360, Decimal(180)), (min_lat, max_lat, Decimal(-180), max_lon)]
+    if max_lon > 180:
+        return [(min_lat, max_lat, min_lon, Decimal(180)), (min_lat, max_lat, Decimal(-180), max_lon - 360)]
+    return [(min_lat, max_lat, min_lon, max_lon)]
+
+
+def get_search_boxes(
+        center_lat: Decimal, center_lon: Decimal, radius_km: float
+) -> list[tuple[Decimal, Decimal, Decimal, Decimal]]:
+    """Get boxes covering both the square and the circle around the point, split at the antimeridian.
+
+    The longitude reach of the circle asin(sin r / cos lat) exceeds the square at high latitudes,
+    a circle around a pole covers all longitudes.
+    """
+    min_lat, max_lat, min_lon, max_lon = get_bounding_box(center_lat, center_lon, radius_km)
+    angle = radius_km / EARTH_RADIUS_KM
+    lat_reach = Decimal(degrees(angle))
+    min_lat = max(min(min_lat, center_lat - lat_reach), Decimal(-90))
+    max_lat = min(max(max_lat, center_lat + lat_reach), Decimal(90))
+    cos_lat = cos(radians(center_lat))
+    if min_lat <= -90 or max_lat >= 90 or sin(angle) >= cos_lat:
+        return [(min_lat, max_lat, Decimal(-180), Decimal(180))]
+    lon_reach = Decimal(degrees(asin(sin(angle) / cos_lat)))
+    return split_box(min_lat, max_lat, min(min_lon, center_lon - lon_reach), max(max_lon, center_lon + lon_reach))
+
+
+def is_list_of_lists(value: object) -> bool:
+    """Check the value is a JSON array of arrays."""
+    return isinstance(value, list) and all(isinstance(item, list) for item in value)
+
+
+def parse_polygon(polygon: str) -> list[list[tuple[float, float]]]:
+    """Parse GeoJSON-like polygon coordinates into rings of (longitude, latitude) pairs.
+
+    Accepts a single ring [[lon, lat], ...] or GeoJSON polygon rings [[[lon, lat], ...], ...],
+    the first ring is the outer border, the rest are holes.
+    """
+    error = [{'field': 'polygon', 'message': 'Polygon should be in format [[longitude, latitude], ...]'}]
+    try:
+        coordinates = json.loads(polygon)
+        if not is_list_of_lists(coordinates):
+            raise ValueError
+        if coordinates and isinstance(coordinates[0][0], (int, float)):
+            coordinates = [coordinates]
+        rings = []
+        for ring in coordinates:
+            if not is_list_of_lists(ring):
+                raise ValueError
+            points = [(float(lon), float(lat)) for lon, lat in ring]
+            if len(points) < 3 or any(
+                    not isfinite(lat) or not isfinite(lon) or abs(lat) > 90 or abs(lon) > 180 for lon, lat in points
+            ):
+                raise ValueError
+            rings.append(points)
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, error)
+    if not rings:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_CONTENT, error)
+    return rings
@@ -0,0 +1,24 @@
+from starlette import status
+
+from src.base.base_test import BaseTestCase
+
+
+class TestActivityChangesCase(BaseTestCase):
+    """Activity changes test suite."""
+    url = '/activities/changes/'
+
+    async def test_activity_changes(self, activity1, activity11, activity111):
+        """Test activity changes."""
+        response = await self.make_get(self.url)
+        assert len(response['items']) == 3
+        parents = {item['uuid']: item['data']['parent_uuid'] for item in response['items']}
+        assert parents[str(activity111.uuid)] == str(activity11.uuid)
+
+        await self.make_delete(f'/activities/{activity11.uuid}/')
+        response = await self.make_get(self.url)
+        deleted = {item['uuid'] for item in response['items'] if item['deleted']}
+        assert deleted == {str(activity11.uuid), str(activity111.uuid)}
+
+    async def test_activity_changes_401(self):
+        """Test activity changes Unauthorized."""
+        await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
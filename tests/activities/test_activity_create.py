@@ -3,6 +3,7 @@ import uuid
 from starlette import status
 
 from src.base.base_test import BaseTestCase
+from src.config.settings import project_config
 
 
 class TestActivityCreateCase(BaseTestCase):
@@ -24,6 +25,14 @@ class TestActivityCreateCase(BaseTestCase):
         await self.make_post(self.url, data, status_code=status.HTTP_201_CREATED)
         await self.make_post(self.url, data, status_code=status.HTTP_409_CONFLICT)
 
+    async def test_activity_create_version_check_interval(self, monkeypatch, activity1):
+        """Test activity create is seen by the process at once while shared versions are not checked."""
+        monkeypatch.setattr(project_config.app, 'CACHE_VERSION_CHECK_INTERVAL', 60.0)
+        await self.make_get(self.url)
+        response = await self.make_post(self.url, self.get_data(parent_uuid=activity1.uuid), status.HTTP_201_CREATED)
+        response = await self.make_get(f'{self.url}{response["uuid"]}/')
+        assert response['parent']['uuid'] == str(activity1.uuid)
+
     async def test_activity_create_400(self, activity111):
         """Test activity create Bad request."""
         data = self.get_data(parent_uuid=activity111.uuid)
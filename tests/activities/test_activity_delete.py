@@ -3,6 +3,7 @@ import uuid
 from starlette import status
 
 from src.base.base_test import BaseTestCase
+from src.config.settings import project_config
 
 
 class TestActivityDeleteCase(BaseTestCase):
@@ -19,6 +20,14 @@ class TestActivityDeleteCase(BaseTestCase):
         url = f'{self.url}/{activity12.uuid}/'
         await self.make_delete(url, status_code=status.HTTP_404_NOT_FOUND)
 
+    async def test_activity_delete_version_check_interval(self, monkeypatch, activity1, activity2):
+        """Test activity delete is seen in the list of the process while shared versions are not checked."""
+        monkeypatch.setattr(project_config.app, 'CACHE_VERSION_CHECK_INTERVAL', 60.0)
+        await self.make_get(f'{self.url}/')
+        await self.make_delete(f'{self.url}/{activity2.uuid}/')
+        response = await self.make_get(f'{self.url}/')
+        assert [item['uuid'] for item in response['items']] == [str(activity1.uuid)]
+
     async def test_activity_delete_401(self, activity1):
         """Test activity delete Unauthorized."""
         url = f'{self.url}/{activity1.uuid}/'
@@ -1,6 +1,7 @@
 from starlette import status
 
 from src.base.base_test import BaseTestCase
+from tests.fixtures.activities import create_activity
 
 
 class TestActivityListCase(BaseTestCase):
@@ -25,6 +26,38 @@ class TestActivityListCase(BaseTestCase):
             elif item['uuid'] == str(activity112.uuid):
                 assert len(item['children']) == 0
 
+    async def test_activity_list_reload(self, get_override_async_session, activity1, activity11):
+        """Test activity list is reloaded after a write made by another process."""
+        response = await self.make_get(self.url)
+        assert len(response['items']) == 1
+        assert len(response['items'][0]['children']) == 1
+
+        await create_activity(get_override_async_session, 'Молочная продукция', activity1.uuid)
+        await create_activity(get_override_async_session, 'Автомобили')
+        response = await self.make_get(self.url)
+        assert [item['name'] for item in response['items']] == ['Автомобили', activity1.name]
+        assert len(response['items'][1]['children']) == 2
+
+    async def test_activity_list_total_mode(self, activity1, activity2):
+        """Test activity list total modes."""
+        response = await self.make_get(self.url, {'size': 1, 'total_mode': 'none'})
+        assert len(response['items']) == 1
+        assert response['has_next'] is True
+
+        response = await self.make_get(self.url, {'total_mode': 'estimate'})
+        assert response['total'] == 2
+
+    async def test_activity_list_cursor(self, activity1, activity2, activity11):
+        """Test activity list with cursor pagination."""
+        response = await self.make_get(f'{self.url}cursor/', {'size': 1})
+        assert len(response['items']) == 1
+        first = response['items'][0]
+
+        response = await self.make_get(f'{self.url}cursor/', {'size': 1, 'cursor': response['next_cursor']})
+        assert len(response['items']) == 1
+        assert response['next_cursor'] is None
+        assert [first['name'], response['items'][0]['name']] == sorted([activity1.name, activity2.name])
+
     async def test_activity_list_401(self):
         """Test activity list Unauthorized."""
         await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
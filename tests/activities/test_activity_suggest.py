@@ -0,0 +1,38 @@
+from starlette import status
+
+from src.activities.indexes import activity_name_index
+from src.base.base_test import BaseTestCase
+
+
+class TestActivitySuggestCase(BaseTestCase):
+    """Activity suggest test suite."""
+    url = '/activities/suggest/'
+
+    async def test_activity_suggest(self, activity111, activity112, activity12, activity2):
+        """Test activity suggest."""
+        response = await self.make_get(self.url, {'q': 'м'})
+        assert [item['name'] for item in response] == ['Молочная продукция', 'Мясная продукция']
+        response = await self.make_get(self.url, {'q': 'КУР'})
+        assert response == [{'uuid': str(activity111.uuid), 'name': activity111.name}]
+
+    async def test_activity_suggest_writes(self, activity1, activity11, activity111, activity112, activity12):
+        """Test activity suggest follows writes of the process without reloading."""
+        await self.make_get(self.url, {'q': 'м'})
+        await self.make_post(self.url.replace('suggest/', ''), {'name': 'Мебель'}, status.HTTP_201_CREATED)
+        await self.make_patch(f'/activities/{activity12.uuid}/', {'name': 'Сыры'})
+        await self.make_delete(f'/activities/{activity11.uuid}/')
+        assert activity_name_index.loaded
+        response = await self.make_get(self.url, {'q': 'м'})
+        assert [item['name'] for item in response] == ['Мебель']
+        response = await self.make_get(self.url, {'q': 'с'})
+        assert [item['name'] for item in response] == ['Сыры']
+        response = await self.make_get(self.url, {'q': 'г'})
+        assert response == []
+
+    async def test_activity_suggest_401(self):
+        """Test activity suggest Unauthorized."""
+        await self.make_get(self.url, {'q': 'м'}, status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
+
+    async def test_activity_suggest_422(self):
+        """Test activity suggest Unprocessable content."""
+        await self.make_get(self.url, {'q': ''}, status.HTTP_422_UNPROCESSABLE_CONTENT)
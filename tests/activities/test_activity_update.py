@@ -3,6 +3,7 @@ import uuid
 from starlette import status
 
 from src.base.base_test import BaseTestCase
+from src.config.settings import project_config
 
 
 class TestActivityUpdateCase(BaseTestCase):
@@ -28,6 +29,25 @@ class TestActivityUpdateCase(BaseTestCase):
         }
         assert response == result
 
+    async def test_activity_update_version_check_interval(self, monkeypatch, organization, activity111):
+        """Test activity rename is seen in organization details while shared versions are not checked."""
+        monkeypatch.setattr(project_config.app, 'CACHE_VERSION_CHECK_INTERVAL', 60.0)
+        await self.make_get(f'/organizations/{organization.uuid}/')
+        await self.make_patch(f'{self.url}/{activity111.uuid}/', {'name': 'Индейка'})
+        response = await self.make_get(f'/organizations/{organization.uuid}/')
+        assert response['activities_tree'][0]['activities'][0]['activities'][0]['name'] == 'Индейка'
+
+    async def test_activity_update_counters(self, organization, activity1, activity11, activity12, activity111):
+        """Test activity re-parenting moves organization counters between the ancestor subtrees."""
+        await self.make_patch(f'{self.url}/{activity111.uuid}/', {'parent_uuid': str(activity12.uuid)})
+        response = await self.make_get(f'{self.url}/{activity1.uuid}/')
+        children = {item['name']: item for item in response['children']}
+        assert children[activity11.name]['organizations_count'] == 0
+        assert children[activity12.name]['organizations_count'] == 1
+        assert children[activity12.name]['children'][0]['organizations_count'] == 1
+        response = await self.make_get(f'{self.url}/')
+        assert response['items'][0]['organizations_count'] == 1
+
     async def test_activity_update_400_1(self, activity2, activity11, activity111):
         """Test activity update Bad request."""
         url = f'{self.url}/{activity11.uuid}/'
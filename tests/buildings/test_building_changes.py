@@ -0,0 +1,24 @@
+from starlette import status
+
+from src.base.base_test import BaseTestCase
+
+
+class TestBuildingChangesCase(BaseTestCase):
+    """Building changes test suite."""
+    url = '/buildings/changes/'
+
+    async def test_building_changes(self, building, building2):
+        """Test building changes."""
+        response = await self.make_get(self.url)
+        assert sorted(item['uuid'] for item in response['items']) == sorted([str(building.uuid), str(building2.uuid)])
+        assert response['items'][0]['data']['address']
+
+        await self.make_delete(f'/buildings/{building2.uuid}/')
+        response = await self.make_get(self.url)
+        deleted = [item for item in response['items'] if item['deleted']]
+        assert len(response['items']) == 2
+        assert [(item['uuid'], item['data']) for item in deleted] == [(str(building2.uuid), None)]
+
+    async def test_building_changes_401(self):
+        """Test building changes Unauthorized."""
+        await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
@@ -21,6 +21,13 @@ class TestBuildingDetailCase(BaseTestCase):
             else:
                 assert str(model_value) == str(value)
 
+    async def test_building_detail_round_trips(self, building, executed_statements):
+        """Test building detail loads only serialized columns in one statement."""
+        executed_statements.clear()
+        await self.make_get(f'{self.url}/{building.uuid}/')
+        assert len(executed_statements) == 1
+        assert 'create_date' not in executed_statements[0]
+
     async def test_building_detail_401(self, building):
         """Test building detail Unauthorized."""
         url = f'{self.url}/{building.uuid}/'
@@ -1,8 +1,14 @@
+import json
 import uuid
+from decimal import Decimal
 
 from starlette import status
 
 from src.base.base_test import BaseTestCase
+from src.buildings import distances
+from src.buildings.enums import GeoSearchModeEnum
+from src.config.settings import project_config
+from tests.fixtures.buildings import create_building
 
 
 class TestBuildingListCase(BaseTestCase):
@@ -22,6 +28,203 @@ class TestBuildingListCase(BaseTestCase):
         response = await self.make_get(self.url, params)
         assert len(response['items']) == 2
 
+        params['shape'] = 'square'
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+    async def test_building_list_round_trips(self, building, building2, building3, executed_statements):
+        """Test building list loads only serialized columns."""
+        executed_statements.clear()
+        response = await self.make_get(self.url)
+        assert len(response['items']) == 3
+        assert len(executed_statements) == 2
+        assert 'latitude' not in executed_statements[1]
+
+    async def test_building_list_cursor(self, building, building2, building3):
+        """Test building list with cursor pagination."""
+        addresses = []
+        params = {'size': 2}
+        response = await self.make_get(f'{self.url}cursor/', params)
+        assert len(response['items']) == 2
+        addresses.extend(item['address'] for item in response['items'])
+
+        params['cursor'] = response['next_cursor']
+        response = await self.make_get(f'{self.url}cursor/', params)
+        assert len(response['items']) == 1
+        assert response['next_cursor'] is None
+        addresses.extend(item['address'] for item in response['items'])
+        assert addresses == sorted([building.address, building2.address, building3.address])
+
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'radius': 10
+        }
+        response = await self.make_get(f'{self.url}cursor/', params)
+        assert len(response['items']) == 2
+
+    async def test_building_list_total_mode(self, building, building2, building3):
+        """Test building list total modes."""
+        response = await self.make_get(self.url, {'size': 3, 'total_mode': 'none'})
+        assert len(response['items']) == 3
+        assert response['total'] is None
+        assert response['pages'] is None
+        assert response['has_next'] is False
+
+        response = await self.make_get(self.url, {'size': 2, 'total_mode': 'estimate'})
+        assert response['total'] == 3
+        assert response['pages'] == 2
+
+    async def test_building_list_index(self, building, building2, building3):
+        """Test building list follows building changes."""
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'radius': 10
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        data = {
+            'address': 'Ярославское шоссе, 1',
+            'latitude': '55.850000',
+            'longitude': '37.640000'
+        }
+        created = await self.make_post(self.url, data, status_code=status.HTTP_201_CREATED)
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 3
+
+        await self.make_patch(f'{self.url}{created["uuid"]}/', {'latitude': '59.938784', 'longitude': '30.314997'})
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        await self.make_patch(f'{self.url}{building.uuid}/', {'latitude': '55.840000', 'longitude': '37.630000'})
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 3
+
+        await self.make_delete(f'{self.url}{building.uuid}/')
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+    async def test_building_list_reload(self, get_override_async_session, building, building2):
+        """Test building list is reloaded after a write made by another process."""
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'radius': 10
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 1
+
+        await create_building(get_override_async_session, 'Проспект мира, 38', Decimal(55.779665), Decimal(37.633636))
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+    async def test_building_list_sql_mode(self, monkeypatch, building, building2, building3):
+        """Test building list with geo filtering in the database."""
+        monkeypatch.setattr(project_config.app, 'GEO_SEARCH_MODE', GeoSearchModeEnum.sql)
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'radius': 10
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        params['shape'] = 'square'
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        params['radius'] = 1
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 0
+
+    async def test_building_list_sql_mode_circle(self, monkeypatch, get_override_async_session, executed_statements):
+        """Test circle filtering in the database keeps the distance check in the query."""
+        monkeypatch.setattr(project_config.app, 'GEO_SEARCH_MODE', GeoSearchModeEnum.sql)
+        await create_building(get_override_async_session, 'Центр', Decimal('55.847336'), Decimal('37.635552'))
+        await create_building(get_override_async_session, 'Угол', Decimal('55.855336'), Decimal('37.649852'))
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'radius': 1
+        }
+        executed_statements.clear()
+        response = await self.make_get(self.url, params)
+        assert [item['address'] for item in response['items']] == ['Центр']
+        statement = next(s for s in executed_statements if s.startswith('SELECT buildings.') and 'LIMIT' in s)
+        assert 'sin(' in statement
+        assert 'buildings.uuid IN (?' not in statement
+
+        params['shape'] = 'square'
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+    async def test_building_list_without_numpy(self, monkeypatch, building, building2, building3):
+        """Test building list with the pure Python distance engine."""
+        monkeypatch.setattr(distances, 'np', None)
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'radius': 10
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        params['shape'] = 'square'
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        params['radius'] = 1
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 0
+
+        params = {
+            'shape': 'polygon',
+            'polygon': json.dumps([[37.6, 55.76], [37.7, 55.76], [37.7, 55.86], [37.6, 55.86]])
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+    async def test_building_list_high_latitude(self, monkeypatch, get_override_async_session):
+        """Test building list finds buildings of a large circle beyond the square at high latitudes."""
+        session = get_override_async_session
+        inside = await create_building(session, 'Inside', Decimal('61.27'), Decimal('19.15'))
+        await create_building(session, 'Outside', Decimal('61.27'), Decimal('19.25'))
+        params = {'latitude': '60', 'longitude': '1.0', 'radius': 1000}
+        for mode in GeoSearchModeEnum:
+            monkeypatch.setattr(project_config.app, 'GEO_SEARCH_MODE', mode)
+            response = await self.make_get(self.url, params)
+            assert [item['uuid'] for item in response['items']] == [str(inside.uuid)]
+
+    async def test_building_list_antimeridian(self, monkeypatch, get_override_async_session):
+        """Test building list finds buildings across the antimeridian."""
+        session = get_override_async_session
+        west = await create_building(session, 'West', Decimal('1.1'), Decimal('-179.9'))
+        east = await create_building(session, 'East', Decimal('1.1'), Decimal('179.95'))
+        await create_building(session, 'Far', Decimal('1.1'), Decimal('-179'))
+        params = {'latitude': '1.0', 'longitude': '179.9', 'radius': 30}
+        for mode in GeoSearchModeEnum:
+            monkeypatch.setattr(project_config.app, 'GEO_SEARCH_MODE', mode)
+            for shape in ('circle', 'square'):
+                response = await self.make_get(self.url, {**params, 'shape': shape})
+                assert {item['uuid'] for item in response['items']} == {str(west.uuid), str(east.uuid)}
+
+    async def test_building_list_polygon(self, building, building2, building3):
+        """Test building list in polygon."""
+        outer = [[37.6, 55.76], [37.7, 55.76], [37.7, 55.86], [37.6, 55.86]]
+        params = {
+            'shape': 'polygon',
+            'polygon': json.dumps(outer)
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        hole = [[37.65, 55.83], [37.67, 55.83], [37.67, 55.85], [37.65, 55.85]]
+        params['polygon'] = json.dumps([outer, hole])
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 1
+
     async def test_building_list_400(self, building, building2, building3):
         """Test building list Bad request."""
         params = {
@@ -30,6 +233,16 @@ class TestBuildingListCase(BaseTestCase):
         }
         await self.make_get(self.url, params, status_code=status.HTTP_400_BAD_REQUEST)
 
+        params = {
+            'shape': 'polygon'
+        }
+        await self.make_get(self.url, params, status_code=status.HTTP_400_BAD_REQUEST)
+
+        params = {
+            'polygon': '[[37.6, 55.76], [37.7, 55.76], [37.7, 55.86]]'
+        }
+        await self.make_get(self.url, params, status_code=status.HTTP_400_BAD_REQUEST)
+
     async def test_building_list_401(self):
         """Test building list Unauthorized."""
         await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
@@ -46,3 +259,17 @@ class TestBuildingListCase(BaseTestCase):
             'radius': uuid.uuid4()
         }
         await self.make_get(self.url, params, status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
+
+        params = {
+            'shape': 'polygon',
+            'polygon': '[[37.6, 55.76], [37.7, 55.76]]'
+        }
+        await self.make_get(self.url, params, status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
+
+        polygons = (
+            '{"a": 1}', '[{"a": 1}]', '[[{"a": 1}, [37.7, 55.76], [37.7, 55.86]]]',
+            '[[NaN, 55.76], [37.7, 55.76], [37.7, 55.86]]', '[[37.6, Infinity], [37.7, 55.76], [37.7, 55.86]]'
+        )
+        for polygon in polygons:
+            params['polygon'] = polygon
+            await self.make_get(self.url, params, status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
@@ -1,9 +1,11 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Generator
 
 import pytest
 from sqlalchemy import StaticPool, event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
+from src.base.indexes import reset_indexes
+from src.base.paginators import count_cache
 from src.base.models import BaseDBModel
 from src.config.session import get_async_session
 from src.config.settings import project_config
@@ -51,11 +53,32 @@ async def get_override_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+@pytest.fixture(scope='function')
+def executed_statements() -> Generator[list[str], None, None]:
+    """Statements executed by the test engine while the fixture is active."""
+    statements = []
+
+    def listener(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, 'before_cursor_execute', listener)
+    yield statements
+    event.remove(engine_test.sync_engine, 'before_cursor_execute', listener)
+
+
+@pytest.fixture(autouse=True, scope='function')
+def cache_version_check_interval(monkeypatch) -> None:
+    """Check shared cache versions on every access, fixtures write to the database as another process."""
+    monkeypatch.setattr(project_config.app, 'CACHE_VERSION_CHECK_INTERVAL', 0.0)
+
+
 @pytest.fixture(autouse=True, scope='function')
 async def prepare_database():
     """Prepare database."""
     async with engine_test.begin() as conn:
         await conn.run_sync(BaseDBModel.metadata.create_all)
+    reset_indexes()
+    count_cache.clear()
     yield
     async with engine_test.begin() as conn:
         await conn.run_sync(BaseDBModel.metadata.drop_all)
@@ -0,0 +1,35 @@
+from sqlalchemy import update
+
+from src import ActivityDB, BuildingDB
+from src.base.base_test import BaseTestCase
+from src.counters.sessions import CounterSession
+
+
+class TestCounterReconcileCase(BaseTestCase):
+    """Counter reconcile test suite."""
+
+    async def test_counter_reconcile(
+            self, get_override_async_session, organization, organization2, building, activity1, activity111
+    ):
+        """Test counter reconcile reports the drift and recomputes the counters."""
+        session = get_override_async_session
+        async with session.begin():
+            query = update(BuildingDB).where(BuildingDB.uuid == building.uuid).values(organizations_count=5)
+            await session.execute(query)
+            await session.execute(update(ActivityDB).values(organizations_count=0))
+        await self.make_get('/activities/')
+
+        result = await CounterSession(session).reconcile(fix=False)
+        assert result.fixed is False
+        assert [(d.uuid, d.stored, d.actual) for d in result.buildings] == [(building.uuid, 5, 1)]
+        assert {d.uuid: d.actual for d in result.activities}[activity1.uuid] == 2
+        assert len(result.activities) == 4
+
+        result = await CounterSession(session).reconcile()
+        assert result.fixed is True
+        assert len(result.buildings) == 1 and len(result.activities) == 4
+        result = await CounterSession(session).reconcile(fix=False)
+        assert result.buildings == result.activities == []
+        response = await self.make_get('/activities/')
+        assert response['items'][0]['organizations_count'] == 2
+        assert response['items'][0]['children'][0]['children'][0]['organizations_count'] == 1
@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src import ActivityDB
+from src.activities.indexes import activity_tree
+from src.activities.services import add_activity_closure
 
 
 async def create_activity(
@@ -27,6 +29,8 @@ async def create_activity(
             )
         )
         activity = await session.scalar(query)
+        await add_activity_closure(session, activity.uuid, parent_uuid)
+        await activity_tree.bump(session)
     return activity
 
 
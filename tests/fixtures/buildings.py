@@ -4,6 +4,7 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import BuildingDB
+from src.buildings.indexes import building_index
 
 
 async def create_building(
@@ -18,6 +19,7 @@ async def create_building(
         }
         building = BuildingDB(**data)
         session.add(building)
+        await building_index.bump(session)
     return building
 
 
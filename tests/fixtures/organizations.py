@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
 from src import OrganizationDB, PhoneDB, OrganizationActivityDB, ActivityDB
+from src.activities.indexes import activity_count_index
+from src.counters.services import update_organization_counters
 
 
 async def create_organization(
@@ -35,6 +37,8 @@ async def create_organization(
             )
         session.add_all(inserted_data)
         await session.flush()
+        await update_organization_counters(session, [(None, building_uuid, set(), set(activity_uuids))])
+        await activity_count_index.bump(session)
         query = (
             select(OrganizationDB)
             .where(OrganizationDB.uuid == organization.uuid)
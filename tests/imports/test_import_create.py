@@ -0,0 +1,207 @@
+import json
+from uuid import uuid4
+
+from httpx import AsyncClient
+from sqlalchemy import select, func
+from starlette import status
+
+from src import BuildingDB, ActivityDB, ActivityClosureDB, OrganizationDB, PhoneDB, OrganizationActivityDB
+from src.base.base_test import BaseTestCase
+
+
+class TestImportCreateCase(BaseTestCase):
+    """Import create test suite."""
+    url = '/imports/'
+
+    async def make_import(
+            self,
+            entity: str,
+            content: str,
+            file_format: str = 'ndjson',
+            status_code: int = status.HTTP_200_OK,
+            send_auth_token: bool = True
+    ) -> dict:
+        """Make import request with the raw body."""
+        headers = {'Authorization': f'Bearer {self.token}'} if send_auth_token else {}
+        async with AsyncClient(transport=self.transport, base_url=self.base_url) as client:
+            response = await client.post(
+                f'{self.base_url}{self.url}{entity}/', content=content.encode(), headers=headers,
+                params={'format': file_format}
+            )
+        assert response.status_code == status_code, f'status: {response.status_code}, response: {response.text}'
+        return response.json()
+
+    @staticmethod
+    def get_ndjson(*rows: dict) -> str:
+        """Get NDJSON content."""
+        return '\n'.join(json.dumps(row) for row in rows) + '\n'
+
+    async def test_import_buildings(self, get_override_async_session, building):
+        """Test import buildings."""
+        building_uuid = str(uuid4())
+        content = self.get_ndjson(
+            {'uuid': str(uuid4()), 'address': 'Москва, Тверская 1', 'latitude': '55.757', 'longitude': '37.615'},
+            {'uuid': str(building.uuid), 'address': 'Москва, Тверская 2', 'latitude': '55.758', 'longitude': '37.616'},
+            {'uuid': str(uuid4()), 'address': 'Москва, Тверская 3', 'latitude': 'north', 'longitude': '37.617'},
+            {'uuid': building_uuid, 'address': 'Москва, Тверская 1', 'latitude': '55.759', 'longitude': '37.618'},
+        ) + 'not json\n'
+        response = await self.make_import('buildings', content)
+        assert response['received'] == 5
+        assert response['invalid'] == 2
+        assert response['merged'] == 2
+        assert response['skipped'] == 1
+        assert [error['line'] for error in response['errors']] == [3, 5]
+
+        session = get_override_async_session
+        assert await session.scalar(select(func.count()).select_from(BuildingDB)) == 2
+        await session.refresh(building)
+        assert building.address == 'Москва, Тверская 2'
+
+        params = {'latitude': '55.757', 'longitude': '37.615', 'radius': 1}
+        response = await self.make_get('/buildings/', params)
+        assert {item['uuid'] for item in response['items']} == {building_uuid, str(building.uuid)}
+
+    async def test_import_buildings_csv(self, get_override_async_session):
+        """Test import buildings from CSV."""
+        content = (
+            'uuid,address,latitude,longitude\r\n'
+            f'{uuid4()},"Москва, Тверская 1",55.757,37.615\r\n'
+            f'{uuid4()},"Москва, Тверская 2",55.758\r\n'
+        )
+        response = await self.make_import('buildings', content, 'csv')
+        assert response['received'] == 2
+        assert response['merged'] == 1
+        assert response['errors'][0]['line'] == 3
+
+    async def test_import_activities(self, get_override_async_session, activity1):
+        """Test import activities."""
+        root_uuid, child_uuid = str(uuid4()), str(uuid4())
+        content = self.get_ndjson(
+            {'uuid': child_uuid, 'name': 'Грузовые', 'parent_uuid': root_uuid},
+            {'uuid': root_uuid, 'name': 'Автомобили'},
+            {'uuid': str(uuid4()), 'name': 'Запчасти', 'parent_uuid': str(uuid4())},
+        )
+        response = await self.make_import('activities', content)
+        assert response['merged'] == 2
+        assert response['skipped'] == 1
+
+        session = get_override_async_session
+        assert await session.scalar(select(func.count()).select_from(ActivityDB)) == 3
+        assert await session.scalar(select(func.count()).select_from(ActivityClosureDB)) == 4
+
+        response = await self.make_get('/activities/')
+        assert [item['name'] for item in response['items']] == ['Автомобили', activity1.name]
+        assert response['items'][0]['children'][0]['uuid'] == child_uuid
+
+    async def test_import_activities_400(self, activity1):
+        """Test import activities Bad request."""
+        uuids = [str(uuid4()) for _ in range(3)]
+        content = self.get_ndjson(
+            {'uuid': uuids[0], 'name': 'Уровень 2', 'parent_uuid': str(activity1.uuid)},
+            {'uuid': uuids[1], 'name': 'Уровень 3', 'parent_uuid': uuids[0]},
+            {'uuid': uuids[2], 'name': 'Уровень 4', 'parent_uuid': uuids[1]},
+        )
+        await self.make_import('activities', content, status_code=status.HTTP_400_BAD_REQUEST)
+
+    async def test_import_organizations(
+            self, get_override_async_session, organization, building, building2, activity111, activity2
+    ):
+        """Test import organizations."""
+        organization_uuid = str(uuid4())
+        content = self.get_ndjson(
+            {
+                'uuid': organization_uuid, 'name': 'ООО Импорт', 'building_uuid': str(building.uuid),
+                'phones': ['8-800-555-35-01', '88005553502'], 'activity_uuids': [str(activity111.uuid)]
+            },
+            {
+                'uuid': str(organization.uuid), 'name': organization.name, 'building_uuid': str(building2.uuid),
+                'phones': ['88005553503'], 'activity_uuids': [str(activity2.uuid), str(uuid4())]
+            },
+            {
+                'uuid': str(uuid4()), 'name': 'ООО Без здания', 'building_uuid': str(uuid4()),
+                'phones': ['88005553504'], 'activity_uuids': []
+            },
+            {'uuid': str(uuid4()), 'name': 'ООО Без телефона', 'building_uuid': str(building.uuid)},
+        )
+        response = await self.make_import('organizations', content)
+        assert response['received'] == 4
+        assert response['invalid'] == 1
+        assert response['merged'] == 2
+        assert response['skipped'] == 1
+        assert response['rejected_phones'] == 0
+        assert response['rejected_activities'] == 1
+        assert [error['line'] for error in response['errors']] == [2, 4]
+
+        session = get_override_async_session
+        assert await session.scalar(select(func.count()).select_from(OrganizationDB)) == 2
+        assert await session.scalar(select(func.count()).select_from(PhoneDB)) == 3
+        assert await session.scalar(select(func.count()).select_from(OrganizationActivityDB)) == 2
+
+        response = await self.make_get(f'/organizations/{organization.uuid}/')
+        assert response['building']['uuid'] == str(building2.uuid)
+        assert [phone['phone'] for phone in response['phones']] == ['88005553503']
+        response = await self.make_get('/buildings/')
+        assert {item['uuid']: item['organizations_count'] for item in response['items']} == {
+            str(building.uuid): 1, str(building2.uuid): 1
+        }
+
+        content = (
+            'uuid,name,building_uuid,phones,activity_uuids\n'
+            f'{organization_uuid},ООО Импорт 2,{building2.uuid},88005553505;88005553506,\n'
+        )
+        response = await self.make_import('organizations', content, 'csv')
+        assert response['merged'] == 1
+        response = await self.make_get(f'/organizations/{organization_uuid}/')
+        assert response['name'] == 'ООО Импорт 2'
+        assert len(response['phones']) == 2
+        assert response['activities_tree'] == []
+
+    async def test_import_organizations_phones(self, organization, building):
+        """Test import organizations keeps phones of other organizations and skips organizations without phones."""
+        response = await self.make_get(f'/organizations/{organization.uuid}/')
+        taken = response['phones'][0]['phone']
+        uuids = [str(uuid4()) for _ in range(4)]
+        content = self.get_ndjson(
+            {
+                'uuid': uuids[0], 'name': 'ООО Первый', 'building_uuid': str(building.uuid),
+                'phones': [taken, '88005553511'], 'activity_uuids': []
+            },
+            {
+                'uuid': uuids[1], 'name': 'ООО Занятый', 'building_uuid': str(building.uuid),
+                'phones': [taken], 'activity_uuids': []
+            },
+            {
+                'uuid': uuids[2], 'name': 'ООО Второй', 'building_uuid': str(building.uuid),
+                'phones': ['88005553512'], 'activity_uuids': []
+            },
+            {
+                'uuid': uuids[3], 'name': 'ООО Без здания', 'building_uuid': str(uuid4()),
+                'phones': ['88005553512'], 'activity_uuids': []
+            },
+        )
+        response = await self.make_import('organizations', content)
+        assert response['merged'] == 2
+        assert response['skipped'] == 2
+        assert response['rejected_phones'] == 1
+        assert response['errors'] == [{'line': 1, 'message': f'phones: Phone {taken} already exists'}]
+
+        response = await self.make_get(f'/organizations/{uuids[0]}/')
+        assert [phone['phone'] for phone in response['phones']] == ['88005553511']
+        response = await self.make_get(f'/organizations/{uuids[2]}/')
+        assert [phone['phone'] for phone in response['phones']] == ['88005553512']
+        await self.make_get(f'/organizations/{uuids[1]}/', status_code=status.HTTP_404_NOT_FOUND)
+        response = await self.make_get(f'/organizations/{organization.uuid}/')
+        assert taken in [phone['phone'] for phone in response['phones']]
+
+    async def test_import_401(self):
+        """Test import Unauthorized."""
+        await self.make_import('buildings', '', status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
+
+    async def test_import_405(self):
+        """Test import Method not allowed."""
+        await self.make_get(f'{self.url}buildings/', status_code=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_import_422(self):
+        """Test import Unprocessable content."""
+        await self.make_import('users', '', status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
+        await self.make_import('buildings', '', 'xml', status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
@@ -0,0 +1,48 @@
+import uuid
+
+from starlette import status
+
+from src.base.base_test import BaseTestCase
+
+
+class TestOrganizationBatchGetCase(BaseTestCase):
+    """Organization batch get test suite."""
+    url = '/organizations/batch-get/'
+
+    async def test_organization_batch_get(self, organization, organization2, organization3):
+        """Test organization batch get matches organization details."""
+        missing = str(uuid.uuid4())
+        uuids = [str(organization3.uuid), missing, str(organization.uuid), str(organization2.uuid),
+                 str(organization.uuid)]
+        response = await self.make_post(self.url, uuids)
+        assert response['missing'] == [missing]
+        assert [item['uuid'] for item in response['items']] == [
+            str(organization3.uuid), str(organization.uuid), str(organization2.uuid)
+        ]
+        for item in response['items']:
+            assert item == await self.make_get(f'/organizations/{item["uuid"]}/')
+
+    async def test_organization_batch_get_round_trips(
+            self, organization, organization2, organization3, executed_statements
+    ):
+        """Test organization batch get runs one query per relation regardless of the batch size."""
+        await self.make_post(self.url, [str(organization.uuid)])
+        executed_statements.clear()
+        response = await self.make_post(self.url, [str(o.uuid) for o in (organization, organization2, organization3)])
+        assert len(response['items']) == 3
+        assert len(executed_statements) == 4
+
+    async def test_organization_batch_get_missing(self):
+        """Test organization batch get with unknown uuids only."""
+        missing = str(uuid.uuid4())
+        response = await self.make_post(self.url, [missing])
+        assert response == {'items': [], 'missing': [missing]}
+
+    async def test_organization_batch_get_401(self):
+        """Test organization batch get Unauthorized."""
+        await self.make_post(self.url, [str(uuid.uuid4())], status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
+
+    async def test_organization_batch_get_422(self):
+        """Test organization batch get Unprocessable Entity."""
+        await self.make_post(self.url, [], status.HTTP_422_UNPROCESSABLE_CONTENT)
+        await self.make_post(self.url, ['not-uuid'], status.HTTP_422_UNPROCESSABLE_CONTENT)
@@ -0,0 +1,72 @@
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, func
+from starlette import status
+
+from src import OrganizationDB, PhoneDB, OrganizationActivityDB
+from src.base.base_test import BaseTestCase
+
+
+class TestOrganizationBulkCreateCase(BaseTestCase):
+    """Organization bulk create test suite."""
+    url = '/organizations/bulk/'
+
+    @staticmethod
+    def get_data(name: str, building_uuid: UUID, phones: list[str], activity_uuids: list[UUID]) -> dict:
+        """Get data."""
+        data = {
+            'name': name,
+            'building_uuid': str(building_uuid),
+            'phones': phones,
+            'activity_uuids': [str(i) for i in activity_uuids],
+        }
+        return data
+
+    async def test_organization_bulk_create(
+            self, get_override_async_session, organization, building, building2, activity111, activity2
+    ):
+        """Test organization bulk create."""
+        phone = organization.phones[0].phone
+        data = [
+            self.get_data('Bulk organization 1', building.uuid, ['88005553501', '88005553502'], [activity111.uuid]),
+            self.get_data(
+                'Bulk organization 2', building2.uuid, ['88005553503'],
+                [activity111.uuid, activity2.uuid, activity2.uuid]
+            ),
+            self.get_data(organization.name, building.uuid, ['88005553504'], []),
+            self.get_data('Bulk organization 1', building.uuid, ['88005553505'], []),
+            self.get_data('Bulk organization 3', building.uuid, ['88005553503', phone], []),
+            self.get_data('Bulk organization 4', uuid4(), ['88005553506'], [uuid4()]),
+        ]
+        response = await self.make_post(self.url, data, status_code=status.HTTP_201_CREATED)
+        assert [item['index'] for item in response['created']] == [0, 1]
+        conflicts = [(item['index'], item['field']) for item in response['conflicts']]
+        assert conflicts == [
+            (2, 'name'), (3, 'name'), (4, 'phones'), (4, 'phones'), (5, 'building_uuid'), (5, 'activity_uuids')
+        ]
+
+        session = get_override_async_session
+        assert await session.scalar(select(func.count()).select_from(OrganizationDB)) == 3
+        assert await session.scalar(select(func.count()).select_from(PhoneDB)) == len(organization.phones) + 3
+        assert await session.scalar(select(func.count()).select_from(OrganizationActivityDB)) == 4
+
+        organization_uuid = response['created'][1]['uuid']
+        response = await self.make_get(f'/organizations/{organization_uuid}/')
+        assert response['name'] == 'Bulk organization 2'
+        assert response['building']['uuid'] == str(building2.uuid)
+
+    async def test_organization_bulk_create_401(self, building, activity111):
+        """Test organization bulk create Unauthorized."""
+        data = [self.get_data('Bulk organization', building.uuid, ['88005553501'], [activity111.uuid])]
+        await self.make_post(self.url, data, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
+
+    async def test_organization_bulk_create_405(self):
+        """Test organization bulk create Method not allowed."""
+        await self.make_put(self.url, {}, status_code=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_organization_bulk_create_422(self, building, activity111):
+        """Test organization bulk create Unprocessable content."""
+        await self.make_post(self.url, [], status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
+        data = [self.get_data('Bulk organization', building.uuid, ['88005553501'], [activity111.uuid])]
+        data[0]['name'] = 123
+        await self.make_post(self.url, data, status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
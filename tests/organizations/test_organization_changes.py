@@ -0,0 +1,82 @@
+from sqlalchemy import update, literal_column
+from starlette import status
+
+from src import OrganizationDB
+from src.base.base_test import BaseTestCase
+
+
+class TestOrganizationChangesCase(BaseTestCase):
+    """Organization changes test suite."""
+    url = '/organizations/changes/'
+
+    async def test_organization_changes(self, get_override_async_session, organization, organization2, organization3):
+        """Test organization changes."""
+        session = get_override_async_session
+        async with session.begin():
+            await session.execute(update(OrganizationDB).values(update_date=literal_column("'2000-01-01 00:00:00'")))
+
+        response = await self.make_get(self.url, {'size': 2})
+        assert len(response['items']) == 2
+        assert response['has_more'] is True
+        uuids = [item['uuid'] for item in response['items']]
+
+        response = await self.make_get(self.url, {'size': 2, 'cursor': response['next_cursor']})
+        assert len(response['items']) == 1
+        assert response['has_more'] is False
+        uuids.extend(item['uuid'] for item in response['items'])
+        assert sorted(uuids) == sorted(str(o.uuid) for o in (organization, organization2, organization3))
+        item = next(item for item in response['items'])
+        assert item['deleted'] is False
+        assert item['data']['building_uuid']
+        cursor = response['next_cursor']
+
+        response = await self.make_get(self.url, {'cursor': cursor})
+        assert response['items'] == []
+        assert response['next_cursor'] == cursor
+
+        await self.make_patch(f'/organizations/{organization.uuid}/', {'phones': ['88005553599']})
+        await self.make_delete(f'/organizations/{organization2.uuid}/')
+        response = await self.make_get(self.url, {'cursor': cursor})
+        items = {item['uuid']: item for item in response['items']}
+        assert len(items) == 2
+        assert items[str(organization.uuid)]['deleted'] is False
+        assert items[str(organization.uuid)]['data']['phones'] == ['88005553599']
+        assert items[str(organization2.uuid)]['deleted'] is True
+        assert items[str(organization2.uuid)]['data'] is None
+
+        response = await self.make_get(self.url, {'since': '2001-01-01T00:00:00'})
+        assert len(response['items']) == 2
+
+    async def test_organization_changes_commit_order(self, get_override_async_session, organization, organization2):
+        """Test organization changes keep a transaction started earlier and committed after a later one."""
+        session = get_override_async_session
+        response = await self.make_get(self.url)
+        cursor = response['next_cursor']
+
+        await self.make_patch(f'/organizations/{organization2.uuid}/', {'name': 'ООО Поздний старт'})
+        response = await self.make_get(self.url, {'cursor': cursor})
+        assert [item['uuid'] for item in response['items']] == [str(organization2.uuid)]
+        cursor = response['next_cursor']
+
+        # The earlier transaction keeps the timestamp of its start
+        async with session.begin():
+            await session.execute(
+                update(OrganizationDB)
+                .where(OrganizationDB.uuid == organization.uuid)
+                .values(name='ООО Ранний старт', update_date=literal_column("'2000-01-01 00:00:00'"))
+            )
+        response = await self.make_get(self.url, {'cursor': cursor})
+        assert [item['uuid'] for item in response['items']] == [str(organization.uuid)]
+        assert response['items'][0]['data']['name'] == 'ООО Ранний старт'
+
+    async def test_organization_changes_400(self):
+        """Test organization changes Bad request."""
+        await self.make_get(self.url, {'cursor': 'invalid'}, status_code=status.HTTP_400_BAD_REQUEST)
+
+    async def test_organization_changes_401(self):
+        """Test organization changes Unauthorized."""
+        await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
+
+    async def test_organization_changes_405(self):
+        """Test organization changes Method not allowed."""
+        await self.make_post(self.url, {}, status_code=status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,84 @@
+from starlette import status
+
+from src.activities.indexes import activity_tree
+from src.base.base_test import BaseTestCase
+from src.counters.sessions import CounterSession
+
+
+class TestOrganizationCountersCase(BaseTestCase):
+    """Organization counters test suite."""
+    url = '/organizations/'
+
+    async def get_counts(self) -> dict[str, int]:
+        """Get organization counters of buildings and activities from the lists."""
+        counts = {}
+        response = await self.make_get('/buildings/')
+        counts.update({item['uuid']: item['organizations_count'] for item in response['items']})
+        stack = list((await self.make_get('/activities/'))['items'])
+        while stack:
+            item = stack.pop()
+            counts[item['uuid']] = item['organizations_count']
+            stack.extend(item['children'])
+        return counts
+
+    async def test_organization_counters(
+            self, get_override_async_session, organization, organization2, building, building2, activity1,
+            activity11, activity111, activity112, activity2
+    ):
+        """Test organization writes keep building and activity subtree counters up to date."""
+        counts = await self.get_counts()
+        assert [counts[str(a.uuid)] for a in (building, building2, activity1, activity11, activity111, activity2)] \
+            == [1, 1, 2, 2, 1, 0]
+
+        data = {
+            'name': 'Test organization',
+            'building_uuid': str(building.uuid),
+            'phones': ['88005553538'],
+            'activity_uuids': [str(activity111.uuid), str(activity112.uuid)],
+        }
+        created = await self.make_post(self.url, data, status_code=status.HTTP_201_CREATED)
+        counts = await self.get_counts()
+        assert [counts[str(a.uuid)] for a in (building, activity1, activity11, activity111, activity112)] \
+            == [2, 3, 3, 2, 2]
+
+        data = {'building_uuid': str(building2.uuid), 'activity_uuids': [str(activity2.uuid)]}
+        await self.make_patch(f'{self.url}{organization.uuid}/', data)
+        counts = await self.get_counts()
+        assert [counts[str(a.uuid)] for a in (building, building2, activity1, activity111, activity2)] \
+            == [1, 2, 2, 1, 1]
+
+        await self.make_delete(f'{self.url}{created["uuid"]}/')
+        counts = await self.get_counts()
+        assert [counts[str(a.uuid)] for a in (building, activity1, activity11, activity111, activity112)] \
+            == [0, 1, 1, 0, 1]
+
+        result = await CounterSession(get_override_async_session).reconcile(fix=False)
+        assert result.buildings == result.activities == []
+
+    async def test_organization_counters_one_statement(
+            self, organization, building2, activity2, executed_statements
+    ):
+        """Test counter deltas of a moved organization are applied in one statement per table."""
+        data = {'building_uuid': str(building2.uuid), 'activity_uuids': [str(activity2.uuid)]}
+        await self.make_patch(f'{self.url}{organization.uuid}/', data)
+        updates = [s for s in executed_statements if s.startswith('UPDATE buildings')]
+        assert len(updates) == 1
+        updates = [s for s in executed_statements if s.startswith('UPDATE activities')]
+        assert len(updates) == 1
+        counts = await self.get_counts()
+        assert counts[str(building2.uuid)] == 1 and counts[str(activity2.uuid)] == 1
+
+    async def test_organization_counters_keep_activity_tree(self, organization, building, activity1, activity111):
+        """Test organization writes change activity counters without reloading the activity tree."""
+        await self.get_counts()
+        version = activity_tree.version
+        data = {
+            'name': 'Test organization',
+            'building_uuid': str(building.uuid),
+            'phones': ['88005553538'],
+            'activity_uuids': [str(activity111.uuid)],
+        }
+        await self.make_post(self.url, data, status_code=status.HTTP_201_CREATED)
+        counts = await self.get_counts()
+        assert counts[str(activity1.uuid)] == 2
+        assert activity_tree.loaded and activity_tree.version == version
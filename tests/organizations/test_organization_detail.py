@@ -1,8 +1,10 @@
 import uuid
 
+from httpx import AsyncClient, Response
 from starlette import status
 
 from src.base.base_test import BaseTestCase
+from src.organizations.indexes import organization_detail_cache
 
 
 class TestOrganizationDetailCase(BaseTestCase):
@@ -50,6 +52,99 @@ class TestOrganizationDetailCase(BaseTestCase):
         }
         assert response == result
 
+    async def test_organization_detail_round_trips(
+            self, organization, organization2, organization3, activity111, executed_statements
+    ):
+        """Test organization detail is read in one statement after the cache version check."""
+        executed_statements.clear()
+        response = await self.make_get(f'{self.url}/{organization3.uuid}/')
+        assert len(executed_statements) == 2
+        assert [phone['phone'] for phone in response['phones']] == [phone.phone for phone in organization3.phones]
+        assert [activity['name'] for activity in response['activities_tree']] == [
+            activity.name for activity in organization3.activities
+        ]
+
+    async def get_detail(self, url: str, etag: str = None) -> Response:
+        """Get organization detail, conditional if the ETag is given."""
+        headers = {'Authorization': f'Bearer {self.token}'}
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        async with AsyncClient(transport=self.transport, base_url=self.base_url) as client:
+            return await client.get(f'{self.base_url}{url}', headers=headers)
+
+    async def test_organization_detail_not_modified(self, organization, executed_statements):
+        """Test organization detail returns 304 for the current ETag from the cache."""
+        url = f'{self.url}/{organization.uuid}/'
+        response = await self.get_detail(url)
+        etag = response.headers['etag']
+        assert response.status_code == status.HTTP_200_OK
+        executed_statements.clear()
+        response = await self.get_detail(url, etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers['etag'] == etag
+        assert response.content == b''
+        assert len(executed_statements) == 1
+        response = await self.get_detail(url, f'W/{etag}, "other"')
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        response = await self.get_detail(url, '"other"')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['etag'] == etag
+
+    async def test_organization_detail_etag_after_update(self, organization):
+        """Test organization detail ETag changes after the organization update."""
+        url = f'{self.url}/{organization.uuid}/'
+        etag = (await self.get_detail(url)).headers['etag']
+        await self.make_patch(url, {'name': 'New name'})
+        response = await self.get_detail(url, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['etag'] != etag
+        assert response.json()['name'] == 'New name'
+
+    async def test_organization_detail_etag_after_building_update(self, organization, building):
+        """Test organization detail ETag changes after the building update."""
+        url = f'{self.url}/{organization.uuid}/'
+        etag = (await self.get_detail(url)).headers['etag']
+        await self.make_patch(f'/buildings/{building.uuid}/', {'address': 'New address'})
+        response = await self.get_detail(url, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['etag'] != etag
+        assert response.json()['building']['address'] == 'New address'
+
+    async def test_organization_detail_etag_after_activity_update(self, organization, activity111):
+        """Test organization detail ETag changes after the activity update."""
+        url = f'{self.url}/{organization.uuid}/'
+        etag = (await self.get_detail(url)).headers['etag']
+        await self.make_patch(f'/activities/{activity111.uuid}/', {'name': 'New name'})
+        response = await self.get_detail(url, etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['etag'] != etag
+
+    async def test_organization_detail_other_process_writes(
+            self, get_override_async_session, organization, organization2, building2
+    ):
+        """Test organization detail cache drops only entries changed by writes of another process."""
+        for item in (organization, organization2):
+            await self.make_get(f'{self.url}/{item.uuid}/')
+        session = get_override_async_session
+        async with session.begin():
+            version = await organization_detail_cache.bump(session)
+            await organization_detail_cache.add_invalidations(session, version, [organization.uuid])
+        await self.make_get(f'{self.url}/{organization2.uuid}/')
+        assert organization_detail_cache.version == version
+        assert set(organization_detail_cache.entries) == {organization2.uuid}
+
+        await self.make_get(f'{self.url}/{organization.uuid}/')
+        async with session.begin():
+            version = await organization_detail_cache.bump(session)
+            await organization_detail_cache.add_invalidations(session, version, [building2.uuid])
+        await self.make_get(f'{self.url}/{organization.uuid}/')
+        assert set(organization_detail_cache.entries) == {organization.uuid}
+
+        async with session.begin():
+            await organization_detail_cache.bump(session)
+        await self.make_get(f'{self.url}/{organization2.uuid}/')
+        assert set(organization_detail_cache.entries) == {organization2.uuid}
+
     async def test_organization_detail_401(self, organization):
         """Test organization detail Unauthorized."""
         url = f'{self.url}/{organization.uuid}/'
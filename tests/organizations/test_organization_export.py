@@ -0,0 +1,42 @@
+import json
+
+from httpx import AsyncClient
+from starlette import status
+
+from src.base.base_test import BaseTestCase
+from src.config.settings import project_config
+
+
+class TestOrganizationExportCase(BaseTestCase):
+    """Organization export test suite."""
+    url = '/organizations/export/'
+
+    async def test_organization_export(
+            self, organization, organization2, organization3, building, activity111, monkeypatch
+    ):
+        """Test organization export."""
+        monkeypatch.setattr(project_config.app, 'EXPORT_CHUNK_SIZE', 2)
+        headers = {'Authorization': f'Bearer {self.token}'}
+        async with AsyncClient(transport=self.transport, base_url=self.base_url) as client:
+            async with client.stream('GET', f'{self.base_url}{self.url}', headers=headers) as response:
+                assert response.status_code == status.HTTP_200_OK
+                assert response.headers['content-type'] == 'application/x-ndjson'
+                chunks = [chunk async for chunk in response.aiter_bytes()]
+        rows = [json.loads(line) for line in b''.join(chunks).decode().splitlines()]
+        assert len(rows) == 3
+        assert [row['uuid'] for row in rows] == sorted(
+            str(o.uuid) for o in (organization, organization2, organization3)
+        )
+        row = next(row for row in rows if row['uuid'] == str(organization.uuid))
+        assert row['name'] == organization.name
+        assert row['building']['uuid'] == str(building.uuid)
+        assert row['phones'] == [phone.phone for phone in organization.phones]
+        assert row['activity_uuids'] == [str(activity111.uuid)]
+
+    async def test_organization_export_401(self):
+        """Test organization export Unauthorized."""
+        await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
+
+    async def test_organization_export_405(self):
+        """Test organization export Method not allowed."""
+        await self.make_post(self.url, {}, status_code=status.HTTP_405_METHOD_NOT_ALLOWED)
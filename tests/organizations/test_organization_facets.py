@@ -0,0 +1,72 @@
+from starlette import status
+
+from src.base.base_test import BaseTestCase
+
+
+class TestOrganizationFacetsCase(BaseTestCase):
+    """Organization facets test suite."""
+    url = '/organizations/facets/'
+
+    async def test_organization_facets(
+            self, organization, organization2, organization3, building, building2, building3, activity1, activity11,
+            activity111, activity112, activity2, executed_statements
+    ):
+        """Test organization facets rolled up through the activity tree in one query with loaded indexes."""
+        await self.make_get(self.url)
+        executed_statements.clear()
+        response = await self.make_get(self.url)
+        assert response['total'] == 3
+        assert {(item['name'], item['count']) for item in response['activities']} == {
+            (activity1.name, 2), (activity11.name, 2), (activity111.name, 1), (activity112.name, 1),
+            (activity2.name, 1)
+        }
+        item = next(item for item in response['activities'] if item['uuid'] == str(activity11.uuid))
+        assert item['parent_uuid'] == str(activity1.uuid)
+        assert {(item['address'], item['count']) for item in response['buildings']} == {
+            (building.address, 1), (building2.address, 1), (building3.address, 1)
+        }
+        statements = [s for s in executed_statements if 'cache_versions' not in s]
+        assert len(statements) == 1
+        assert 'GROUP BY' in statements[0]
+
+    async def test_organization_facets_filters(
+            self, organization, organization2, organization3, building, activity1, activity11, activity111
+    ):
+        """Test organization facets with list filters."""
+        response = await self.make_get(self.url, {'search_activity': activity1.name})
+        assert response['total'] == 2
+        assert {item['name'] for item in response['activities']} == {
+            activity1.name, activity11.name, activity111.name, organization2.activities[0].name
+        }
+        response = await self.make_get(self.url, {'building_uuid': str(building.uuid)})
+        assert response['total'] == 1
+        assert [item['name'] for item in response['activities']] == sorted(
+            [activity1.name, activity11.name, activity111.name]
+        )
+        assert response['buildings'] == [{'uuid': str(building.uuid), 'address': building.address, 'count': 1}]
+        response = await self.make_get(self.url, {'search_name': 'nothing'})
+        assert response == {'total': 0, 'activities': [], 'buildings': []}
+
+    async def test_organization_facets_zone(
+            self, organization, organization2, organization3, building, activity1, activity11, activity111
+    ):
+        """Test organization facets within a zone and by name count activities of matching organizations only."""
+        params = {'latitude': str(building.latitude), 'longitude': str(building.longitude), 'radius': 0.1}
+        response = await self.make_get(self.url, params)
+        assert response['total'] == 1
+        assert {item['name'] for item in response['activities']} == {activity1.name, activity11.name, activity111.name}
+        assert response['buildings'] == [{'uuid': str(building.uuid), 'address': building.address, 'count': 1}]
+
+        response = await self.make_get(self.url, {'search_name': organization.name})
+        assert response['total'] == 1
+        assert {item['name'] for item in response['activities']} == {activity1.name, activity11.name, activity111.name}
+        response = await self.make_get(self.url, {**params, 'search_name': organization2.name})
+        assert response == {'total': 0, 'activities': [], 'buildings': []}
+
+    async def test_organization_facets_400(self, organization):
+        """Test organization facets Bad request."""
+        await self.make_get(self.url, {'latitude': '55.7'}, status.HTTP_400_BAD_REQUEST)
+
+    async def test_organization_facets_401(self):
+        """Test organization facets Unauthorized."""
+        await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
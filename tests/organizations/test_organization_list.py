@@ -1,8 +1,16 @@
+import json
+import re
 import uuid
 
+from sqlalchemy import delete
 from starlette import status
 
+from src import OrganizationActivityDB
 from src.base.base_test import BaseTestCase
+from src.buildings.enums import GeoSearchModeEnum
+from src.config.settings import project_config
+from src.organizations.indexes import organization_bitmap_index
+from tests.fixtures.organizations import create_organization
 
 
 class TestOrganizationListCase(BaseTestCase):
@@ -51,6 +59,248 @@ class TestOrganizationListCase(BaseTestCase):
         response = await self.make_get(self.url, params)
         assert len(response['items']) == 2
 
+    async def test_organization_list_cursor(self, organization, organization2, organization3, building):
+        """Test organization list with cursor pagination."""
+        names = []
+        params = {'size': 2}
+        response = await self.make_get(f'{self.url}cursor/', params)
+        assert len(response['items']) == 2
+        names.extend(item['name'] for item in response['items'])
+
+        params['cursor'] = response['next_cursor']
+        response = await self.make_get(f'{self.url}cursor/', params)
+        assert len(response['items']) == 1
+        assert response['next_cursor'] is None
+        names.extend(item['name'] for item in response['items'])
+        assert names == sorted([organization.name, organization2.name, organization3.name])
+
+        params = {'building_uuid': str(building.uuid)}
+        response = await self.make_get(f'{self.url}cursor/', params)
+        assert [item['uuid'] for item in response['items']] == [str(organization.uuid)]
+
+    async def test_organization_list_total_mode(
+            self, get_override_async_session, organization, organization2, organization3, building, activity2
+    ):
+        """Test organization list total modes."""
+        response = await self.make_get(self.url, {'size': 2, 'total_mode': 'none'})
+        assert len(response['items']) == 2
+        assert response['total'] is None
+        assert response['has_next'] is True
+
+        response = await self.make_get(self.url, {'size': 2, 'page': 2, 'total_mode': 'none'})
+        assert len(response['items']) == 1
+        assert response['has_next'] is False
+
+        response = await self.make_get(self.url, {'total_mode': 'estimate'})
+        assert response['total'] == 3
+
+        await create_organization(get_override_async_session, 'ООО Новая', building.uuid, [], [activity2.uuid])
+        response = await self.make_get(self.url, {'total_mode': 'estimate'})
+        assert response['total'] == 3
+        assert len(response['items']) == 4
+
+        response = await self.make_get(self.url, {'total_mode': 'estimate', 'building_uuid': str(building.uuid)})
+        assert response['total'] == 2
+
+        response = await self.make_get(self.url)
+        assert response['total'] == 4
+        assert response['has_next'] is None
+
+    async def test_organization_list_activity_tree(
+            self, organization, organization2, organization3, activity1, activity11, activity2
+    ):
+        """Test organization list search by activity follows activity tree changes."""
+        params = {
+            'search_activity': activity1.name,
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        await self.make_patch(f'/activities/{activity2.uuid}/', {'parent_uuid': str(activity1.uuid)})
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 3
+
+        params = {
+            'search_activity': activity11.name,
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        data = {
+            'name': 'Грузовые',
+            'parent_uuid': str(activity2.uuid)
+        }
+        created = await self.make_post('/activities/', data, status_code=status.HTTP_201_CREATED)
+        await self.make_patch(f'{self.url}{organization3.uuid}/', {'activity_uuids': [created['uuid']]})
+        params = {
+            'search_activity': activity1.name,
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 3
+
+        await self.make_patch(f'/activities/{activity2.uuid}/', {'name': 'Транспорт'})
+        await self.make_delete(f'/activities/{activity11.uuid}/', status_code=status.HTTP_409_CONFLICT)
+
+    async def test_organization_list_sql_mode(self, monkeypatch, organization, organization2, organization3):
+        """Test organization list with geo filtering in the database."""
+        monkeypatch.setattr(project_config.app, 'GEO_SEARCH_MODE', GeoSearchModeEnum.sql)
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'radius': 10
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        params['shape'] = 'square'
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        params['radius'] = 1
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 0
+
+    async def test_organization_list_polygon(self, organization, organization2, organization3):
+        """Test organization list in polygon."""
+        outer = [[37.6, 55.76], [37.7, 55.76], [37.7, 55.86], [37.6, 55.86]]
+        params = {
+            'shape': 'polygon',
+            'polygon': json.dumps(outer)
+        }
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 2
+
+        hole = [[37.65, 55.83], [37.67, 55.83], [37.67, 55.85], [37.65, 55.85]]
+        params['polygon'] = json.dumps([outer, hole])
+        response = await self.make_get(self.url, params)
+        assert len(response['items']) == 1
+
+    async def test_organization_list_round_trips(
+            self, organization, organization2, organization3, executed_statements
+    ):
+        """Test organization list loads only serialized columns and phones without buildings."""
+        for url in (self.url, f'{self.url}cursor/'):
+            executed_statements.clear()
+            response = await self.make_get(url)
+            assert len(response['items']) == 3
+            assert len(executed_statements) == 3
+            assert not any('buildings' in statement for statement in executed_statements)
+            assert 'create_date' not in executed_statements[1]
+
+    async def test_organization_list_flat_filters(
+            self, organization, organization2, organization3, building, activity1, activity111, executed_statements
+    ):
+        """Test combined organization list filters are flat EXISTS clauses ordered by selectivity."""
+        params = {
+            'building_uuid': str(building.uuid),
+            'activity_uuid': str(activity111.uuid),
+            'search_activity': activity1.name,
+            'search_name': organization.name,
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'radius': 15,
+        }
+        executed_statements.clear()
+        response = await self.make_get(self.url, params)
+        assert [item['uuid'] for item in response['items']] == [str(organization.uuid)]
+        statement = next(s for s in executed_statements if s.startswith('SELECT organizations.') and 'LIMIT' in s)
+        assert len(re.findall(r'FROM organizations\b', statement)) == 1
+        assert statement.count('EXISTS') == 2
+        where = statement[statement.index('WHERE'):]
+        positions = [
+            where.index('organizations.building_uuid = '), where.index('organizations.building_uuid IN'),
+            where.index('EXISTS'), where.index('lower(organizations.name) LIKE')
+        ]
+        assert positions == sorted(positions)
+
+    async def test_organization_list_multi_value(
+            self, organization, organization2, organization3, building, building2, activity111, activity112, activity2
+    ):
+        """Test organization list filters by lists of buildings and activities with any and all matching."""
+        await self.make_patch(
+            f'{self.url}{organization.uuid}/', {'activity_uuids': [str(activity111.uuid), str(activity2.uuid)]}
+        )
+        params = {'building_uuids': [str(building.uuid), str(building2.uuid)]}
+        response = await self.make_get(self.url, params)
+        assert {item['uuid'] for item in response['items']} == {str(organization.uuid), str(organization2.uuid)}
+        params = {'activity_uuids': [str(activity112.uuid), str(activity2.uuid)]}
+        response = await self.make_get(self.url, params)
+        assert {item['uuid'] for item in response['items']} == {
+            str(organization.uuid), str(organization2.uuid), str(organization3.uuid)
+        }
+        params = {'activity_uuids': [str(activity111.uuid), str(activity2.uuid)], 'activity_match': 'all'}
+        response = await self.make_get(self.url, params)
+        assert [item['uuid'] for item in response['items']] == [str(organization.uuid)]
+        params = {**params, 'building_uuids': [str(building2.uuid)]}
+        response = await self.make_get(self.url, params)
+        assert response['items'] == []
+        params = {'activity_uuids': [str(activity2.uuid), str(activity2.uuid)], 'activity_match': 'all'}
+        response = await self.make_get(self.url, params)
+        assert {item['uuid'] for item in response['items']} == {str(organization.uuid), str(organization3.uuid)}
+
+    async def test_organization_list_bitmaps(
+            self, organization, organization2, organization3, building, activity1, activity11, activity111, activity2,
+            executed_statements
+    ):
+        """Test organization list activity filters matching nothing by the bitmap index kept current by writes."""
+        params = {'search_activity': activity1.name, 'building_uuid': str(building.uuid)}
+        response = await self.make_get(self.url, params)
+        assert [item['uuid'] for item in response['items']] == [str(organization.uuid)]
+        statement = next(s for s in executed_statements if 'LIMIT' in s)
+        assert 'EXISTS' in statement
+        await self.make_patch(f'{self.url}{organization3.uuid}/', {'building_uuid': str(building.uuid)})
+        await self.make_patch(f'{self.url}{organization.uuid}/', {'activity_uuids': [str(activity2.uuid)]})
+        assert organization_bitmap_index.loaded
+        executed_statements.clear()
+        response = await self.make_get(self.url, params)
+        assert response['items'] == []
+        statement = next(s for s in executed_statements if 'LIMIT' in s)
+        assert '0 = 1' in statement
+        params = {'activity_uuid': str(activity2.uuid), 'building_uuid': str(building.uuid)}
+        response = await self.make_get(self.url, params)
+        assert {item['uuid'] for item in response['items']} == {str(organization.uuid), str(organization3.uuid)}
+        response = await self.make_get(self.url, {'search_activity': activity11.name})
+        assert [item['uuid'] for item in response['items']] == [str(organization2.uuid)]
+        ordinals = organization_bitmap_index.ordinals
+        assert organization_bitmap_index.buildings[building.uuid] == {
+            ordinals[organization.uuid], ordinals[organization3.uuid]
+        }
+
+    async def test_organization_list_bitmaps_other_process(
+            self, monkeypatch, get_override_async_session, organization, activity111
+    ):
+        """Test organization list rechecks activity filters in the database while the bitmap index lags behind."""
+        monkeypatch.setattr(project_config.app, 'CACHE_VERSION_CHECK_INTERVAL', 60.0)
+        params = {'activity_uuid': str(activity111.uuid)}
+        response = await self.make_get(self.url, params)
+        assert [item['uuid'] for item in response['items']] == [str(organization.uuid)]
+        session = get_override_async_session
+        async with session.begin():
+            await session.execute(
+                delete(OrganizationActivityDB).where(OrganizationActivityDB.organization_uuid == organization.uuid)
+            )
+        response = await self.make_get(self.url, params)
+        assert response['items'] == []
+
+    async def test_organization_list_bitmaps_ordinals(
+            self, get_override_async_session, organization, organization2, organization3
+    ):
+        """Test organization bitmap index assigns ordinals in building order on load."""
+        await organization_bitmap_index.ensure_loaded(get_override_async_session)
+        organizations = sorted((organization, organization2, organization3), key=lambda o: (o.building_uuid, o.uuid))
+        assert [organization_bitmap_index.ordinals[o.uuid] for o in organizations] == [0, 1, 2]
+
+    async def test_organization_list_search_name(self, get_override_async_session, building, activity1):
+        """Test organization list search by name is ordered by relevance, cursor list stays ordered by name."""
+        for index, name in enumerate(('A cafe bar', 'Zcafe', 'Cafe', 'Bakery')):
+            await create_organization(get_override_async_session, name, building.uuid, [f'8800555000{index}'], [])
+        response = await self.make_get(self.url, {'search_name': 'cafe'})
+        assert [item['name'] for item in response['items']] == ['Cafe', 'Zcafe', 'A cafe bar']
+        response = await self.make_get(f'{self.url}cursor/', {'search_name': 'cafe'})
+        assert [item['name'] for item in response['items']] == ['A cafe bar', 'Cafe', 'Zcafe']
+        response = await self.make_get(self.url, {'search_name': '%'})
+        assert response['items'] == []
+
     async def test_organization_list_400(self, organization, organization2, organization3):
         """Test organization list Bad request."""
         params = {
@@ -59,6 +309,16 @@ class TestOrganizationListCase(BaseTestCase):
         }
         await self.make_get(self.url, params, status_code=status.HTTP_400_BAD_REQUEST)
 
+        params = {
+            'shape': 'polygon'
+        }
+        await self.make_get(self.url, params, status_code=status.HTTP_400_BAD_REQUEST)
+
+        params = {
+            'polygon': '[[37.6, 55.76], [37.7, 55.76], [37.7, 55.86]]'
+        }
+        await self.make_get(self.url, params, status_code=status.HTTP_400_BAD_REQUEST)
+
     async def test_organization_list_401(self):
         """Test organization list Unauthorized."""
         await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
@@ -75,3 +335,9 @@ class TestOrganizationListCase(BaseTestCase):
             'radius': uuid.uuid4()
         }
         await self.make_get(self.url, params, status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
+
+        params = {
+            'shape': 'polygon',
+            'polygon': '[[37.6, 55.76], [37.7, 55.76]]'
+        }
+        await self.make_get(self.url, params, status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
@@ -0,0 +1,69 @@
+from starlette import status
+
+from src.base.base_test import BaseTestCase
+
+
+class TestOrganizationNearestCase(BaseTestCase):
+    """Organization nearest test suite."""
+    url = '/organizations/nearest/'
+
+    async def test_organization_nearest(self, organization, organization2, organization3):
+        """Test organization nearest."""
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+        }
+        response = await self.make_get(self.url, params)
+        assert [item['uuid'] for item in response] == [
+            str(organization2.uuid), str(organization3.uuid), str(organization.uuid)
+        ]
+        distances = [item['distance'] for item in response]
+        assert distances == sorted(distances)
+        assert 1 < distances[0] < 2
+
+        params['limit'] = 2
+        response = await self.make_get(self.url, params)
+        assert [item['uuid'] for item in response] == [str(organization2.uuid), str(organization3.uuid)]
+        phones = [{'uuid': str(phone.uuid), 'phone': phone.phone} for phone in organization2.phones]
+        assert response[0]['phones'] == phones
+
+        params = {
+            'latitude': '59.938784',
+            'longitude': '30.314997',
+            'limit': 1
+        }
+        response = await self.make_get(self.url, params)
+        assert [item['uuid'] for item in response] == [str(organization2.uuid)]
+
+    async def test_organization_nearest_401(self):
+        """Test organization nearest Unauthorized."""
+        await self.make_get(self.url, status_code=status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
+
+    async def test_organization_nearest_405(self):
+        """Test organization nearest Method not allowed."""
+        await self.make_put(self.url, {}, status_code=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_organization_nearest_422(self):
+        """Test organization nearest Unprocessable content."""
+        await self.make_get(self.url, {'latitude': '55.847336'}, status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+            'limit': 0
+        }
+        await self.make_get(self.url, params, status_code=status.HTTP_422_UNPROCESSABLE_CONTENT)
+
+    async def test_organization_nearest_round_trips(self, organization, organization2, organization3,
+                                                    executed_statements):
+        """Test organization nearest fetches organizations of all needed buildings in one query."""
+        params = {
+            'latitude': '55.847336',
+            'longitude': '37.635552',
+        }
+        await self.make_get(self.url, params)
+        executed_statements.clear()
+        response = await self.make_get(self.url, params)
+        assert len(response) == 3
+        queries = [statement for statement in executed_statements if 'FROM organizations' in statement]
+        assert len(queries) == 1
+        assert queries[0].count('?') == 3
@@ -0,0 +1,59 @@
+from starlette import status
+
+from src.base.base_test import BaseTestCase
+from src.config.settings import project_config
+from src.organizations.indexes import organization_name_index
+
+
+class TestOrganizationSuggestCase(BaseTestCase):
+    """Organization suggest test suite."""
+    url = '/organizations/suggest/'
+
+    async def test_organization_suggest(self, organization, organization2, organization3, executed_statements):
+        """Test organization suggest."""
+        response = await self.make_get(self.url, {'q': 'organization'})
+        assert [item['name'] for item in response] == ['Organization 1', 'Organization 2', 'Organization 3']
+        executed_statements.clear()
+        response = await self.make_get(self.url, {'q': 'ORGANIZATION 2'})
+        assert response == [{'uuid': str(organization2.uuid), 'name': organization2.name}]
+        assert len(executed_statements) == 1
+        response = await self.make_get(self.url, {'q': 'organization', 'limit': 2})
+        assert [item['name'] for item in response] == ['Organization 1', 'Organization 2']
+        response = await self.make_get(self.url, {'q': '1'})
+        assert response == []
+
+    async def test_organization_suggest_version_check_interval(self, monkeypatch, organization, executed_statements):
+        """Test organization suggest checks the shared version at most once per interval."""
+        monkeypatch.setattr(project_config.app, 'CACHE_VERSION_CHECK_INTERVAL', 60.0)
+        await self.make_get(self.url, {'q': 'organization'})
+        executed_statements.clear()
+        response = await self.make_get(self.url, {'q': 'organization'})
+        assert response == [{'uuid': str(organization.uuid), 'name': organization.name}]
+        assert executed_statements == []
+
+    async def test_organization_suggest_writes(self, organization, organization2, building, activity111):
+        """Test organization suggest follows writes of the process without reloading."""
+        await self.make_get(self.url, {'q': 'o'})
+        data = {
+            'name': 'Bakery',
+            'building_uuid': str(building.uuid),
+            'phones': ['88005553540'],
+            'activity_uuids': [str(activity111.uuid)],
+        }
+        await self.make_post('/organizations/', data, status.HTTP_201_CREATED)
+        await self.make_patch(f'/organizations/{organization.uuid}/', {'name': 'Bar'})
+        await self.make_delete(f'/organizations/{organization2.uuid}/')
+        assert organization_name_index.loaded
+        response = await self.make_get(self.url, {'q': 'b'})
+        assert [item['name'] for item in response] == ['Bakery', 'Bar']
+        response = await self.make_get(self.url, {'q': 'organization'})
+        assert response == []
+
+    async def test_organization_suggest_401(self):
+        """Test organization suggest Unauthorized."""
+        await self.make_get(self.url, {'q': 'o'}, status.HTTP_401_UNAUTHORIZED, send_auth_token=False)
+
+    async def test_organization_suggest_422(self):
+        """Test organization suggest Unprocessable content."""
+        await self.make_get(self.url, {'q': ''}, status.HTTP_422_UNPROCESSABLE_CONTENT)
+        await self.make_get(self.url, {'q': 'o', 'limit': 0}, status.HTTP_422_UNPROCESSABLE_CONTENT)
@@ -1,7 +1,9 @@
 import uuid
 
+from sqlalchemy import select
 from starlette import status
 
+from src import PhoneDB
 from src.base.base_test import BaseTestCase
 
 
@@ -55,6 +57,33 @@ class TestOrganizationUpdateCase(BaseTestCase):
         }
         assert response == result
 
+    async def test_organization_update_diff(self, get_override_async_session, organization, activity111, activity2):
+        """Test organization update touches only changed phones and activities."""
+        url = f'{self.url}/{organization.uuid}/'
+        phone = organization.phones[0]
+        data = {
+            'phones': [phone.phone, '88005553538', '88005553539'],
+            'activity_uuids': [str(activity111.uuid), str(activity2.uuid)]
+        }
+        response = await self.make_patch(url, data)
+        assert response == {
+            'uuid': str(organization.uuid),
+            'phones_inserted': 2,
+            'phones_deleted': 0,
+            'activities_inserted': 1,
+            'activities_deleted': 0,
+        }
+        data = {'phones': ['88005553538'], 'activity_uuids': [str(activity2.uuid)]}
+        response = await self.make_patch(url, data)
+        assert response['phones_inserted'] == 0
+        assert response['phones_deleted'] == 2
+        assert response['activities_inserted'] == 0
+        assert response['activities_deleted'] == 1
+        query = select(PhoneDB.phone).where(PhoneDB.organization_uuid == organization.uuid)
+        assert list(await get_override_async_session.scalars(query)) == ['88005553538']
+        response = await self.make_patch(url, {'name': 'New name'})
+        assert response['phones_inserted'] == response['phones_deleted'] == 0
+
     async def test_organization_update_401(self, organization):
         """Test organization update Unauthorized."""
         url = f'{self.url}/{organization.uuid}/'